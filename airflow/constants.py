@@ -5,3 +5,6 @@ TEST_TEAM_NAME = "chronon_test"  # Setting this to a team in your `teams.json` w
 GROUP_BY_BATCH_CONCURRENCY = 300  # Increase as required if many group_bys per team causing DAGs to fall behind
 JOIN_CONCURRENCY = 100  # Increase as required if large Joins causing DAGs to fall behind
 time_parts = ["ds", "ts", "hr"]  # The list of time-based partition column names used in your warehouse. These are used to set up partition sensors in DAGs.
+# Appended to the production folder for the manifest compile keeps of the materialized confs, e.g.
+# production_manifest.json. Duplicates ai.chronon.repo.MANIFEST_FILE_SUFFIX, which the DAGs don't import.
+MANIFEST_FILE_SUFFIX = "_manifest.json"
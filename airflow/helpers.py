@@ -304,17 +304,49 @@ def task_names(conf, mode, conf_type):
     )
 
 
+def conf_folders(repo, conf_type, mode):
+    """
+    Folders of the production confs of conf_type along with the conf files in them.
+
+    Every file of the production folder is listed. For the online only modes, group by confs that the manifest
+    compile keeps next to the production folder records as not online are left out without reading them, as long
+    as their file is unchanged since compile wrote it. Files missing from the manifest or modified since are kept.
+    """
+    production = os.path.join(repo, "production")
+    entries = {}
+    manifest_path = production + constants.MANIFEST_FILE_SUFFIX
+    if conf_type == "group_bys" and mode in ("upload", "streaming") and os.path.exists(manifest_path):
+        with open(manifest_path) as manifest_file:
+            entries = json.load(manifest_file).get("confs", {})
+    for root, dirs, files in os.walk(os.path.join(production, conf_type)):
+        yield root, [
+            name for name in files
+            if not known_offline(entries.get(os.path.relpath(os.path.join(root, name), production)),
+                                 os.path.join(root, name))
+        ]
+
+
+def known_offline(entry, path):
+    """
+    Whether the manifest entry of the file at path records a conf that is not online, with the modification time
+    and size the file still has.
+    """
+    if entry is None or entry.get("online", True) or "mtime_ns" not in entry:
+        return False
+    stat = os.stat(path)
+    return entry["mtime_ns"] == stat.st_mtime_ns and entry.get("size") == stat.st_size
+
+
 def walk_and_define_tasks(mode, conf_type, repo, dag_constructor, dags=None, silent=True):
     """
     Walk a folder and define a DAG for each conf in there.
     """
     logger = logging.getLogger()
-    base = os.path.join(repo, "production", conf_type)
     if not dags:
         dags = {}
     with open(os.path.join(repo, "teams.json")) as team_infile:
         team_conf = json.load(team_infile)
-    for root, dirs, files in os.walk(base):
+    for root, files in conf_folders(repo, conf_type, mode):
         for name in files:
             full_path = os.path.join(root, name)
             with open(full_path, 'r') as infile:
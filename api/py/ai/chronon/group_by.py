@@ -12,9 +12,9 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
-import inspect
 import json
 import logging
+import sys
 from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import ai.chronon.api.ttypes as ttypes
@@ -520,8 +520,9 @@ def GroupBy(
     deps = [dep for src in sources for dep in utils.get_dependencies(src, dependencies, lag=lag)]
 
     kwargs.update({"lag": lag})
-    # get caller's filename to assign team
-    team = inspect.stack()[1].filename.split("/")[-2]
+    # get caller's filename to assign team. Only the caller's frame is looked up, unlike inspect.stack() which
+    # builds the frame info, with source lines read from disk, of the whole stack.
+    team = sys._getframe(1).f_code.co_filename.split("/")[-2]
 
     column_tags = {}
     if aggregations:
@@ -13,7 +13,6 @@
 #     limitations under the License.
 
 import copy
-import gc
 import importlib
 import json
 import logging
@@ -57,19 +56,12 @@ def JoinPart(
         JoinPart specifies how the left side of a join, or the query in online setting, would join with the right side
         components like GroupBys.
     """
-    # used for reset for next run
-    import_copy = __builtins__["__import__"]
-    # get group_by's module info from garbage collector
-    gc.collect()
-    group_by_module_name = None
-    for ref in gc.get_referrers(group_by):
-        if "__name__" in ref and ref["__name__"].startswith("group_bys"):
-            group_by_module_name = ref["__name__"]
-            break
+    # get group_by's module info from the modules registered on import
+    group_by_module_name = eo.get_mod_name(group_by, "group_bys")
     if group_by_module_name:
-        logging.debug("group_by's module info from garbage collector {}".format(group_by_module_name))
+        logging.debug("group_by's module info from module registry {}".format(group_by_module_name))
         group_by_module = importlib.import_module(group_by_module_name)
-        __builtins__["__import__"] = eo.import_module_set_name(group_by_module, api.GroupBy)
+        eo.import_module_set_name(group_by_module, api.GroupBy)
     else:
         if not group_by.metaData.name:
             logging.error("No group_by file or custom group_by name found")
@@ -82,8 +74,6 @@ def JoinPart(
 
     join_part = api.JoinPart(groupBy=group_by, keyMapping=key_mapping, prefix=prefix)
     join_part.tags = tags
-    # reset before next run
-    __builtins__["__import__"] = import_copy
     return join_part
 
 
@@ -28,8 +28,9 @@ from ai.chronon.lineage.lineage_metadata import (
     LineageMetaData,
     TableType,
 )
+from ai.chronon.repo.manifest import RepoManifest
+from ai.chronon.repo.serializer import thrift_to_dict
 from ai.chronon.repo.validator import (
-    extract_json_confs,
     get_group_by_output_columns,
     get_join_output_columns,
     get_pre_derived_external_features,
@@ -66,6 +67,7 @@ class LineageParser:
         self.metadata: LineageMetaData = LineageMetaData()
         self.parsed_staging_query_tables = set()
         self.schema_provider = schema_provider
+        self.manifests: Dict[str, RepoManifest] = {}
 
     def parse_lineage(self, base_path: str, config_filter: Optional[Set[str]] = None) -> LineageMetaData:
         """
@@ -104,18 +106,19 @@ class LineageParser:
         :param config_ttype: Expected type of config objects.
         :param config_filter: Optional list of config names to include.
         """
-        path = os.path.join(self.base_path, config_path)
-        config_type = config_path.split("/")[-1]
-        configs = []
-        for root, dirs, files in os.walk(path):
-            if root.endswith(config_path):
-                continue
-            configs.extend(extract_json_confs(config_ttype, root))
+        output_root, config_type = os.path.split(config_path)
+        manifest = self.get_manifest(output_root)
+        # configs at the top of the folder are not owned by any team.
+        entries = [entry for entry in manifest.confs(config_ttype) if len(entry["path"].split(os.sep)) > 2]
+        # the manifest lets filtered out configs be skipped without decoding them.
+        configs = [
+            manifest.load_conf(entry)
+            for entry in entries
+            if not config_filter or entry["name"] in config_filter
+        ]
 
         for index, config in enumerate(configs):
             if isinstance(config, config_ttype):
-                if config_filter and config.metaData.name not in config_filter:
-                    continue
                 try:
                     logger.info(f"({index}/{len(configs)}): Parse {config_type} {config.metaData.name} ...")
                     parser(config)
@@ -126,12 +129,21 @@ class LineageParser:
                     )
 
         logger.info(
-            f"Total {len(configs)} configs for {config_type}."
+            f"Total {len(entries)} configs for {config_type}."
             f" Unparsed = {len(self.metadata.unparsed_configs[config_type])}."
         )
         for name in self.metadata.unparsed_configs[config_type]:
             logger.info(f"Unparsed configs: {name}")
 
+    def get_manifest(self, output_root: str) -> RepoManifest:
+        """
+        Manifest of the configs materialized under the output root, refreshed once per parser.
+        """
+        path = os.path.join(self.base_path, output_root)
+        if path not in self.manifests:
+            self.manifests[path] = RepoManifest(path).refresh()
+        return self.manifests[path]
+
     @staticmethod
     def build_select_sql(table: str, selects: List[Tuple[Any, Any]], filter_expr: Optional[Any] = None) -> exp.Select:
         """
@@ -315,7 +327,7 @@ class LineageParser:
             return output_table_name(obj, full_name=True)
         else:
             sanitized_table_name = sanitize(obj.metaData.name)
-            team = self.get_team(obj.metaData)
+            team = self.get_team(thrift_to_dict(obj.metaData))
             if "namespace" in self.team_conf[team]:
                 db = self.team_conf[team]["namespace"]
             else:
@@ -16,3 +16,7 @@ GROUP_BY_FOLDER_NAME = "group_bys"
 STAGING_QUERY_FOLDER_NAME = "staging_queries"
 # TODO - make team part of thrift API?
 TEAMS_FILE_PATH = "teams.json"
+# Relative to the chronon root.
+COMPILE_CACHE_FILE_PATH = ".compile_cache/compile_cache.json"
+# Appended to the output root, e.g. production_manifest.json.
+MANIFEST_FILE_SUFFIX = "_manifest.json"
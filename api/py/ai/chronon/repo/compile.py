@@ -17,12 +17,19 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import contextlib
+import cProfile
+import io
 import json
 import logging
+import multiprocessing
 import os
 import pprint
+import subprocess
 import textwrap
-from typing import List, Optional, Tuple, Type, Union
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Type, Union
 
 import ai.chronon.api.ttypes as api
 import ai.chronon.repo.extract_objects as eo
@@ -34,10 +41,22 @@ from ai.chronon.repo import (
     JOIN_FOLDER_NAME,
     STAGING_QUERY_FOLDER_NAME,
     TEAMS_FILE_PATH,
+    compile_profiler,
     dependency_tracker,
     teams,
 )
-from ai.chronon.repo.serializer import thrift_simple_json_protected
+from ai.chronon.repo.compile_cache import CompileCache, hash_bytes, hash_file
+from ai.chronon.repo.compile_watcher import CompileWatcher
+from ai.chronon.repo.import_graph import (
+    ImportGraph,
+    get_local_imports,
+    get_module_name,
+    get_referenced_names,
+    module_file,
+)
+from ai.chronon.repo.manifest import RepoManifest
+from ai.chronon.repo.sandbox import SandboxedExtractor, SandboxLimits
+from ai.chronon.repo.serializer import copy_thrift, json2thrift, thrift_simple_json_protected
 from ai.chronon.repo.validator import (
     ChrononRepoValidator,
     get_group_by_output_columns,
@@ -54,6 +73,9 @@ FOLDER_NAME_TO_CLASS = {
 
 DEFAULT_TEAM_NAME = "default"
 
+# names a group_by file refers to when it defines a group_by with a join source.
+_JOIN_SOURCE_NAMES = {"JoinSource", "joinSource"}
+
 
 def get_folder_name_from_class_name(class_name):
     return {v.__name__: k for k, v in FOLDER_NAME_TO_CLASS.items()}[class_name]
@@ -65,8 +87,8 @@ def get_folder_name_from_class_name(class_name):
     "--input_path",
     "--conf",
     "input_path",
-    help="Relative Path to the root chronon folder, which contains the objects to be serialized",
-    required=True,
+    help="Relative Path to the root chronon folder, which contains the objects to be serialized. "
+    "Required unless --changed-since is set.",
 )
 @click.option(
     "--output_root",
@@ -81,7 +103,104 @@ def get_folder_name_from_class_name(class_name):
     help="Print out the list of tables that are materialized per job modes in this conf.",
     is_flag=True,
 )
-def extract_and_convert(chronon_root, input_path, output_root, debug, force_overwrite, feature_display, table_display):
+@click.option(
+    "--workers",
+    help="Number of processes used to extract, validate and serialize confs when the input path is a folder.",
+    type=int,
+    default=1,
+    show_default=True,
+)
+@click.option(
+    "--incremental",
+    help="Skip confs whose file, imported modules and teams.json did not change since the last compile "
+    "and reuse their materialized output.",
+    is_flag=True,
+)
+@click.option(
+    "--isolate",
+    help="Import each python file in its own process, so that files which are slow or use too much memory to "
+    "import are reported and skipped instead of stalling the compile. Up to --workers files are imported at once.",
+    is_flag=True,
+)
+@click.option(
+    "--isolate-timeout",
+    help="Seconds a python file may take to be imported in --isolate mode.",
+    type=float,
+    default=60,
+    show_default=True,
+)
+@click.option(
+    "--isolate-max-rss-mb",
+    help="MB of memory importing a python file may use in --isolate mode. Only enforced on Linux.",
+    type=float,
+)
+@click.option(
+    "--changed-since",
+    help="Git ref. Only compile the confs affected by the files changed since then: confs transitively importing "
+    "them and confs depending on those in the materialized repo. Limited to --input_path when set.",
+)
+@click.option(
+    "--all",
+    "all_confs",
+    help="Compile every staging query, group_by and join under the chronon root in a single process, in dependency "
+    "order: staging queries, group_bys, joins and then group_bys built on joins.",
+    is_flag=True,
+)
+@click.option(
+    "--watch",
+    help="Keep running and recompile the confs affected by every change to the python files under the chronon root, "
+    "keeping unchanged modules loaded. Limited to --input_path when set, which is compiled first.",
+    is_flag=True,
+)
+@click.option(
+    "--poll-interval",
+    help="Seconds between two scans of the chronon root for changes in --watch mode.",
+    type=float,
+    default=0.2,
+    show_default=True,
+)
+@click.option(
+    "--profile",
+    help="Record the wall and CPU time of each compile phase, by conf and by python file, "
+    "and print the slowest ones.",
+    is_flag=True,
+)
+@click.option(
+    "--profile-output",
+    help="Path of the JSON report written in --profile mode.",
+    default="compile_profile.json",
+    show_default=True,
+)
+@click.option(
+    "--profile-top", help="Number of slowest confs and files printed in --profile mode.", default=10, show_default=True
+)
+@click.option(
+    "--profile-cprofile",
+    help="Also dump cProfile stats of the compile process to this path in --profile mode, "
+    "to be read with pstats or snakeviz.",
+)
+def extract_and_convert(
+    chronon_root,
+    input_path,
+    output_root,
+    debug,
+    force_overwrite,
+    feature_display,
+    table_display,
+    workers,
+    incremental,
+    isolate,
+    isolate_timeout,
+    isolate_max_rss_mb,
+    changed_since,
+    all_confs,
+    watch,
+    poll_interval,
+    profile,
+    profile_output,
+    profile_top,
+    profile_cprofile,
+):
     """
     CLI tool to convert Python chronon GroupBy's, Joins and Staging queries into their thrift representation.
     The materialized objects are what will be submitted to spark jobs - driven by airflow, or by manual user testing.
@@ -93,6 +212,129 @@ def extract_and_convert(chronon_root, input_path, output_root, debug, force_over
     _print_highlighted("Using chronon root path", chronon_root)
     chronon_root_path = os.path.expanduser(chronon_root)
     utils.chronon_root_path = chronon_root_path
+    sandbox_limits = SandboxLimits(isolate_timeout, isolate_max_rss_mb, workers) if isolate else None
+    if all_confs and (changed_since or input_path):
+        raise click.UsageError("--all can't be combined with --input_path or --changed-since.")
+    if not (changed_since or input_path or all_confs or watch):
+        raise click.UsageError("Missing option '--input_path' / '--conf'.")
+    with _profiling(profile, profile_output, profile_top, profile_cprofile):
+        try:
+            if changed_since:
+                changed_files = _get_changed_files(chronon_root_path, changed_since)
+                affected_files = _get_affected_files(
+                    chronon_root_path, output_root, changed_files, input_path, log_level
+                )
+                _compile_in_dependency_order(
+                    chronon_root_path,
+                    affected_files,
+                    output_root,
+                    force_overwrite,
+                    feature_display,
+                    table_display,
+                    workers,
+                    incremental,
+                    log_level,
+                    sandbox_limits=sandbox_limits,
+                )
+            elif all_confs:
+                _compile_in_dependency_order(
+                    chronon_root_path,
+                    {
+                        folder: eo.get_python_files(os.path.join(chronon_root_path, folder))
+                        for folder in [STAGING_QUERY_FOLDER_NAME, GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME]
+                        if os.path.isdir(os.path.join(chronon_root_path, folder))
+                    },
+                    output_root,
+                    force_overwrite,
+                    feature_display,
+                    table_display,
+                    workers,
+                    incremental,
+                    log_level,
+                    sandbox_limits=sandbox_limits,
+                )
+            elif input_path:
+                _compile_input_path(
+                    chronon_root_path,
+                    input_path,
+                    output_root,
+                    force_overwrite,
+                    feature_display,
+                    table_display,
+                    workers,
+                    incremental,
+                    log_level,
+                    sandbox_limits=sandbox_limits,
+                )
+        except Exception as e:
+            if not watch:
+                raise
+            # keep watching, the next change may fix the confs.
+            _print_error("Compile failed", f"{type(e).__name__}: {e}")
+    if watch:
+        _watch(
+            chronon_root_path,
+            input_path,
+            output_root,
+            force_overwrite,
+            feature_display,
+            table_display,
+            poll_interval,
+            log_level,
+        )
+
+
+@contextlib.contextmanager
+def _profiling(profile: bool, output_path: str, top_n: int, cprofile_path: Optional[str]):
+    """
+    Profiles the compile run in the block when profile is set, then writes and summarizes the report.
+    """
+    if not profile:
+        yield
+        return
+    profiler = compile_profiler.start()
+    cprofiler = cProfile.Profile() if cprofile_path else None
+    if cprofiler:
+        cprofiler.enable()
+    try:
+        yield
+    finally:
+        if cprofiler:
+            cprofiler.disable()
+            cprofiler.dump_stats(cprofile_path)
+        compile_profiler.stop()
+        report = profiler.write(output_path)
+        _print_profile(report, top_n)
+        _print_highlighted("Profile written to", output_path)
+        if cprofiler:
+            _print_highlighted("cProfile stats written to", cprofile_path)
+
+
+def _print_profile(report: dict, top_n: int) -> None:
+    total = report["total"]
+    _print_highlighted("Total", f"wall {total['wall']:.3f}s, cpu {total['cpu']:.3f}s")
+    print("Phases")
+    for name, timing in sorted(report["phases"].items(), key=lambda item: -item[1]["wall"]):
+        _print_highlighted(name, f"wall {timing['wall']:.3f}s, cpu {timing['cpu']:.3f}s, {timing['count']} calls")
+    for section, header in [("confs", "Slowest Confs"), ("files", "Slowest Files To Import")]:
+        if report[section]:
+            print(header)
+        for name, timing in compile_profiler.top(report[section], top_n):
+            _print_highlighted(f"{timing['wall']:.3f}s", name)
+
+
+def _compile_input_path(
+    chronon_root_path: str,
+    input_path: str,
+    output_root: str,
+    force_overwrite: bool,
+    feature_display: bool,
+    table_display: bool,
+    workers: int,
+    incremental: bool,
+    log_level=logging.INFO,
+    sandbox_limits: Optional[SandboxLimits] = None,
+) -> None:
     path_split = input_path.split("/")
     obj_folder_name = path_split[0]
     obj_class = FOLDER_NAME_TO_CLASS[obj_folder_name]
@@ -100,31 +342,291 @@ def extract_and_convert(chronon_root, input_path, output_root, debug, force_over
     _print_highlighted(f"Input {obj_folder_name} from", full_input_path)
     assert os.path.exists(full_input_path), f"Input Path: {full_input_path} doesn't exist"
     if os.path.isdir(full_input_path):
-        results = eo.from_folder(chronon_root_path, full_input_path, obj_class, log_level=log_level)
+        python_files = eo.get_python_files(full_input_path)
     elif os.path.isfile(full_input_path):
         assert full_input_path.endswith(".py"), f"Input Path: {input_path} isn't a python file"
-        results = eo.from_file(chronon_root_path, full_input_path, obj_class, log_level=log_level)
+        python_files = [full_input_path]
     else:
         raise Exception(f"Input Path: {full_input_path}, isn't a file or a folder")
-    validator = ChrononRepoValidator(chronon_root_path, output_root, log_level=log_level)
+    _compile_files(
+        chronon_root_path,
+        obj_class,
+        python_files,
+        os.path.isdir(full_input_path),
+        output_root,
+        force_overwrite,
+        feature_display,
+        table_display,
+        workers,
+        incremental,
+        log_level,
+        sandbox_limits=sandbox_limits,
+    )
+
+
+def _compile_in_dependency_order(
+    chronon_root_path: str,
+    python_files_by_folder: Dict[str, List[str]],
+    output_root: str,
+    force_overwrite: bool,
+    feature_display: bool,
+    table_display: bool,
+    workers: int,
+    incremental: bool,
+    log_level=logging.INFO,
+    sandbox_limits: Optional[SandboxLimits] = None,
+) -> None:
+    """
+    Compiles conf files of several folders in a single pass sharing the validator, the dependency graph and the
+    imported modules: staging queries first, then group_bys, joins and last the group_bys built on joins.
+    """
+    full_output_root = os.path.join(chronon_root_path, output_root)
+    with compile_profiler.phase("load"):
+        validator = ChrononRepoValidator(chronon_root_path, output_root, log_level=log_level)
+        entity_dependency_tracker = dependency_tracker.ChrononEntityDependencyTracker(
+            chronon_root_path=full_output_root,
+            log_level=log_level,
+            manifest=validator.manifest,
+        )
+    run_files = {os.path.abspath(f) for python_files in python_files_by_folder.values() for f in python_files}
+    group_by_files = python_files_by_folder.get(GROUP_BY_FOLDER_NAME, [])
+    chained_group_by_files = _get_chained_group_by_files(chronon_root_path, group_by_files, log_level)
+    passes = [
+        (STAGING_QUERY_FOLDER_NAME, STAGING_QUERY_FOLDER_NAME, python_files_by_folder.get(STAGING_QUERY_FOLDER_NAME)),
+        (GROUP_BY_FOLDER_NAME, GROUP_BY_FOLDER_NAME, [f for f in group_by_files if f not in chained_group_by_files]),
+        (JOIN_FOLDER_NAME, JOIN_FOLDER_NAME, python_files_by_folder.get(JOIN_FOLDER_NAME)),
+        (f"chained {GROUP_BY_FOLDER_NAME}", GROUP_BY_FOLDER_NAME, chained_group_by_files),
+    ]
+    for label, obj_folder_name, python_files in passes:
+        if obj_folder_name not in python_files_by_folder:
+            continue
+        _print_highlighted(f"Compiling {label}", len(python_files))
+        if not python_files:
+            continue
+        # make the confs materialized by the previous passes visible to the validation of this one.
+        validator.load_objs(refresh=False)
+        _compile_files(
+            chronon_root_path,
+            FOLDER_NAME_TO_CLASS[obj_folder_name],
+            python_files,
+            True,
+            output_root,
+            force_overwrite,
+            feature_display,
+            table_display,
+            workers,
+            incremental,
+            log_level,
+            validator=validator,
+            entity_dependency_tracker=entity_dependency_tracker,
+            run_files=run_files,
+            sandbox_limits=sandbox_limits,
+            # compile mutates the objects it materializes, e.g. with team metadata, and the confs of a pass embed
+            # the objects of the other passes. Compiling copies keeps each pass identical to a separate compile.
+            copy_objs=True,
+        )
+
+
+def _get_chained_group_by_files(chronon_root_path: str, python_files: List[str], log_level=logging.INFO) -> List[str]:
+    """
+    Finds the group_bys with join sources statically, so that the group_by modules are only executed once they
+    are compiled. A file is chained if it, or a helper module it imports from outside the conf folders, refers to
+    join sources.
+
+    returns:
+        the group_by files defining group_bys with join sources, which have to be compiled after the joins.
+    """
+    root = os.path.abspath(chronon_root_path)
+    conf_folders = tuple(os.path.join(root, folder) + os.sep for folder in FOLDER_NAME_TO_CLASS)
+    chained = []
+    for f in python_files:
+        try:
+            helpers = [
+                path
+                for path in get_local_imports(chronon_root_path, f)
+                if not os.path.abspath(path).startswith(conf_folders)
+            ]
+            names = set().union(*(get_referenced_names(path) for path in [f] + helpers))
+        except (OSError, SyntaxError, ValueError):
+            # reported when the file is compiled.
+            continue
+        if names & _JOIN_SOURCE_NAMES:
+            chained.append(f)
+    _print_debug_info(chained, "Chained GroupBy Files", log_level)
+    return chained
+
+
+def _watch(
+    chronon_root_path: str,
+    input_path: Optional[str],
+    output_root: str,
+    force_overwrite: bool,
+    feature_display: bool,
+    table_display: bool,
+    poll_interval: float,
+    log_level=logging.INFO,
+) -> None:
+    """
+    Recompiles the confs affected by each change until interrupted. Confs are compiled in this process so that
+    the modules they share, and the libraries compile depends on, are only imported once.
+    """
+    watcher = CompileWatcher(chronon_root_path, output_root, log_level)
+    if not input_path:
+        # pay for the imports of the repo upfront rather than on the first change.
+        scope = [
+            os.path.join(chronon_root_path, folder)
+            for folder in FOLDER_NAME_TO_CLASS
+            if os.path.isdir(os.path.join(chronon_root_path, folder))
+        ]
+        watcher.warm_up(f for folder in scope for f in eo.get_python_files(folder))
+    _print_highlighted("Watching for changes in", watcher.chronon_root_path)
+    try:
+        while True:
+            _recompile_changes(
+                watcher,
+                watcher.wait_for_changes(poll_interval),
+                input_path,
+                output_root,
+                force_overwrite,
+                feature_display,
+                table_display,
+                log_level,
+            )
+    except KeyboardInterrupt:
+        print("Stopped watching")
+
+
+def _recompile_changes(
+    watcher: CompileWatcher,
+    changed_files: List[str],
+    input_path: Optional[str],
+    output_root: str,
+    force_overwrite: bool,
+    feature_display: bool,
+    table_display: bool,
+    log_level=logging.INFO,
+) -> Dict[str, List[str]]:
+    """
+    Reloads the modules affected by the changed files and materializes their confs again. Failures are reported
+    without stopping the watch.
+
+    returns:
+        the recompiled conf python files by conf folder.
+    """
+    start = time.time()
+    chronon_root_path = watcher.chronon_root_path
+    _print_highlighted("Changed", ", ".join(os.path.relpath(f, chronon_root_path) for f in changed_files))
+    affected_files = _get_affected_files(
+        chronon_root_path, output_root, changed_files, input_path, log_level, watcher.import_graph
+    )
+    watcher.unload(changed_files, [f for files in affected_files.values() for f in files])
+    try:
+        _compile_in_dependency_order(
+            chronon_root_path,
+            affected_files,
+            output_root,
+            force_overwrite,
+            feature_display,
+            table_display,
+            1,
+            False,
+            log_level,
+        )
+    except Exception as e:
+        _print_error("Compile failed", f"{type(e).__name__}: {e}")
+    _print_highlighted("Recompiled in", f"{time.time() - start:.3f}s")
+    return affected_files
+
+
+def _compile_files(
+    chronon_root_path: str,
+    obj_class: type,
+    python_files: List[str],
+    from_folder: bool,
+    output_root: str,
+    force_overwrite: bool,
+    feature_display: bool,
+    table_display: bool,
+    workers: int,
+    incremental: bool,
+    log_level=logging.INFO,
+    validator: Optional[ChrononRepoValidator] = None,
+    entity_dependency_tracker: Optional[dependency_tracker.ChrononEntityDependencyTracker] = None,
+    run_files: Optional[Set[str]] = None,
+    sandbox_limits: Optional[SandboxLimits] = None,
+    copy_objs: bool = False,
+) -> None:
+    """
+    Materializes the objects of obj_class defined in the python files. When from_folder is set, files that fail to
+    be extracted are reported and skipped instead of failing the compile.
+
+    The validator and the dependency tracker can be shared with other compiles of the same process. Confs defined
+    in run_files, which are compiled by the same run, are not materialized again as dependencies. With
+    sandbox_limits, the files are imported in separate processes and the ones failing to be are skipped. With
+    copy_objs, copies of the extracted objects are materialized, leaving the imported conf modules as defined for
+    the other compiles of the process.
+    """
+    if validator is None:
+        with compile_profiler.phase("load"):
+            validator = ChrononRepoValidator(chronon_root_path, output_root, log_level=log_level)
     extra_online_or_gb_backfill_enabled_group_bys = {}
     extra_dependent_group_bys_to_materialize = {}
     extra_dependent_joins_to_materialize = {}
     num_written_objs = 0
+    # written, unchanged or skipped objects, including the extra ones materialized for this compile.
+    write_counts = Counter()
     full_output_root = os.path.join(chronon_root_path, output_root)
     teams_path = os.path.join(chronon_root_path, TEAMS_FILE_PATH)
-    entity_dependency_tracker = dependency_tracker.ChrononEntityDependencyTracker(
-        chronon_root_path=full_output_root,
-        log_level=log_level,
-    )
+    if entity_dependency_tracker is None:
+        with compile_profiler.phase("load"):
+            entity_dependency_tracker = dependency_tracker.ChrononEntityDependencyTracker(
+                chronon_root_path=full_output_root,
+                log_level=log_level,
+                manifest=validator.manifest,
+            )
 
-    _print_debug_info(results.keys(), f"Extracted Entities Of Type {obj_class.__name__}", log_level)
+    compile_cache = CompileCache(chronon_root_path, output_root, obj_class, log_level) if incremental else None
+    if compile_cache:
+        python_files = [f for f in python_files if not compile_cache.is_fresh(f)]
+
+    if sandbox_limits is not None:
+        extractor = SandboxedExtractor(chronon_root_path, obj_class, sandbox_limits, log_level)
+        results = extractor.extract(python_files)
+        _print_extraction_failures(chronon_root_path, extractor, len(python_files))
+        if extractor.failures and not from_folder:
+            raise Exception(f"Failed to extract {python_files[0]}: {extractor.failures[0].message}")
+        compiled_objs = _compile_objs(
+            results, obj_class, full_output_root, validator, teams_path, force_overwrite, log_level, copy_objs
+        )
+    elif from_folder and workers > 1:
+        compiled_objs = _compile_in_parallel(
+            chronon_root_path, python_files, obj_class, output_root, workers, force_overwrite, log_level, copy_objs
+        )
+    else:
+        if from_folder:
+            results = eo.from_files(chronon_root_path, python_files, obj_class, log_level=log_level)
+        elif python_files:
+            results = eo.from_file(chronon_root_path, python_files[0], obj_class, log_level=log_level)
+        else:
+            results = {}
+        _print_debug_info(results.keys(), f"Extracted Entities Of Type {obj_class.__name__}", log_level)
+        compiled_objs = _compile_objs(
+            results, obj_class, full_output_root, validator, teams_path, force_overwrite, log_level, copy_objs
+        )
 
-    for name, obj in results.items():
-        team_name = name.split(".")[0]
-        _set_team_level_metadata(obj, teams_path, team_name)
-        _set_templated_values(obj, obj_class, teams_path, team_name)
-        if _write_obj(full_output_root, validator, name, obj, log_level, force_overwrite, force_overwrite):
+    # name -> (output file, serialized object), or None when the object was not written.
+    compiled_outputs = {}
+    for name, obj, serialized in compiled_objs:
+        compiled_outputs[name] = None
+        if serialized is None:
+            write_counts["skipped"] += 1
+        else:
+            output_file = _write_serialized_obj(
+                full_output_root, name, obj, serialized, validator.manifest, write_counts
+            )
+            with compile_profiler.phase("dependencies", conf=name):
+                entity_dependency_tracker.update(obj)
+            compiled_outputs[name] = (output_file, serialized)
             num_written_objs += 1
 
             if feature_display:
@@ -164,9 +666,10 @@ def extract_and_convert(chronon_root, input_path, output_root, debug, force_over
                         " Fix the following: {}".format(obj.metaData.name, group_bys_not_online)
                     )
 
-            new_group_bys, new_joins = _handle_dependent_configurations(
-                chronon_root_path, entity_dependency_tracker, full_output_root, name, obj, obj_class, log_level
-            )
+            with compile_profiler.phase("dependencies", conf=name):
+                new_group_bys, new_joins = _handle_dependent_configurations(
+                    chronon_root_path, entity_dependency_tracker, full_output_root, name, obj, obj_class, log_level
+                )
 
             _handle_deprecation_warning(obj, obj_class, new_group_bys, new_joins)
 
@@ -174,6 +677,18 @@ def extract_and_convert(chronon_root, input_path, output_root, debug, force_over
             extra_dependent_group_bys_to_materialize.update(new_group_bys)
             extra_dependent_joins_to_materialize.update(new_joins)
 
+    if run_files:
+        extra_dependent_group_bys_to_materialize = {
+            name: obj
+            for name, obj in extra_dependent_group_bys_to_materialize.items()
+            if not _is_defined_in(chronon_root_path, name, GroupBy, run_files)
+        }
+        extra_dependent_joins_to_materialize = {
+            name: obj
+            for name, obj in extra_dependent_joins_to_materialize.items()
+            if not _is_defined_in(chronon_root_path, name, Join, run_files)
+        }
+
     if not force_overwrite:
         dependencies = {}
         dependencies.update({**extra_dependent_group_bys_to_materialize, **extra_dependent_joins_to_materialize})
@@ -192,6 +707,8 @@ def extract_and_convert(chronon_root, input_path, output_root, debug, force_over
             teams_path=teams_path,
             validator=validator,
             log_level=log_level,
+            write_counts=write_counts,
+            copy_objs=copy_objs,
         )
     if extra_dependent_joins_to_materialize:
         _handle_extra_conf_objects_to_materialize(
@@ -202,9 +719,115 @@ def extract_and_convert(chronon_root, input_path, output_root, debug, force_over
             validator=validator,
             log_level=log_level,
             is_gb=False,
+            write_counts=write_counts,
+            copy_objs=copy_objs,
         )
     if num_written_objs > 0:
         print(f"Successfully wrote {num_written_objs} {(obj_class).__name__} objects to {full_output_root}")
+    if write_counts:
+        _print_highlighted(
+            "Materialized objects",
+            f"{write_counts['written']} written, {write_counts['unchanged']} unchanged, "
+            f"{write_counts['skipped']} skipped",
+        )
+    with compile_profiler.phase("save"):
+        validator.manifest.save()
+        if compile_cache:
+            _update_compile_cache(compile_cache, chronon_root_path, python_files, compiled_outputs)
+    if compile_cache:
+        _print_highlighted("Compile cache", f"{compile_cache.hits} hits, {compile_cache.misses} misses")
+
+
+def _print_extraction_failures(chronon_root_path: str, extractor: SandboxedExtractor, num_files: int) -> None:
+    _print_highlighted("Isolated extraction", f"{num_files - len(extractor.failures)} of {num_files} files extracted")
+    for failure in extractor.failures:
+        memory = f", {failure.rss_mb:.0f}MB" if failure.rss_mb is not None else ""
+        _print_error(
+            f"Extraction {failure.reason}",
+            f"{os.path.relpath(failure.file_path, chronon_root_path)} after {failure.elapsed:.2f}s{memory}",
+        )
+
+
+def _get_changed_files(chronon_root_path: str, ref: str) -> List[str]:
+    """
+    Files under the chronon root that differ from the git ref in the working tree, including untracked files.
+    """
+    changed = set()
+    for command in [
+        ["git", "diff", "--name-only", "--relative", ref, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard"],
+    ]:
+        output = subprocess.check_output(command, cwd=chronon_root_path).decode("utf-8")
+        changed.update(os.path.abspath(os.path.join(chronon_root_path, line)) for line in output.splitlines() if line)
+    return sorted(changed)
+
+
+def _get_affected_files(
+    chronon_root_path: str,
+    output_root: str,
+    changed_files: List[str],
+    input_path: Optional[str],
+    log_level=logging.INFO,
+    import_graph: Optional[ImportGraph] = None,
+) -> Dict[str, List[str]]:
+    """
+    returns:
+        conf python files affected by the changed files, by conf folder in the order they should be compiled:
+        files importing a changed file, directly or not, and files defining the confs that depend on the confs
+        of those in the materialized repo.
+    """
+    changed_files = [os.path.abspath(f) for f in changed_files]
+    _print_debug_info([os.path.relpath(f, chronon_root_path) for f in changed_files], "Changed Files", log_level)
+    conf_files = {
+        folder: eo.get_python_files(os.path.join(chronon_root_path, folder))
+        for folder in [STAGING_QUERY_FOLDER_NAME, GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME]
+        if os.path.isdir(os.path.join(chronon_root_path, folder))
+    }
+    if os.path.abspath(os.path.join(chronon_root_path, TEAMS_FILE_PATH)) in changed_files:
+        # team level metadata is set on every conf.
+        affected = {os.path.abspath(f) for files in conf_files.values() for f in files}
+    else:
+        affected = set((import_graph or ImportGraph(chronon_root_path)).get_importers(changed_files))
+
+    tracker = dependency_tracker.ChrononEntityDependencyTracker(
+        os.path.join(chronon_root_path, output_root), log_level=log_level
+    )
+    confs_by_module = {}
+    for entry in tracker.manifest.entries.values():
+        confs_by_module.setdefault((entry["type"], entry["name"].rsplit(".", 1)[0]), []).append(entry)
+    for folder, files in conf_files.items():
+        for f in [f for f in files if os.path.abspath(f) in affected]:
+            # same qualifier as the object names assigned by `extract_objects.from_file`.
+            module = get_module_name(chronon_root_path, f).partition(".")[2]
+            for entry in confs_by_module.get((FOLDER_NAME_TO_CLASS[folder].__name__, module), []):
+                for class_name, name in tracker.graph.transitive_downstream((entry["type"], entry["name"])):
+                    downstream_folder = get_folder_name_from_class_name(class_name)
+                    downstream_file = module_file(chronon_root_path, f"{downstream_folder}.{name.rsplit('.', 1)[0]}")
+                    if downstream_file:
+                        affected.add(os.path.abspath(downstream_file))
+
+    scope = os.path.abspath(os.path.join(chronon_root_path, input_path or ""))
+    affected = {f for f in affected if f == scope or f.startswith(os.path.join(scope, ""))}
+    return {folder: [f for f in files if os.path.abspath(f) in affected] for folder, files in conf_files.items()}
+
+
+def _update_compile_cache(
+    compile_cache: CompileCache, chronon_root_path: str, python_files: List[str], compiled_outputs: dict
+) -> None:
+    """
+    Caches the compiled files whose objects were all written. Files without objects are never cached, since
+    they can't be told apart from files that failed to be extracted.
+    """
+    outputs_by_module = {}
+    for name, output in compiled_outputs.items():
+        outputs_by_module.setdefault(name.rsplit(".", 1)[0], []).append(output)
+    for f in python_files:
+        # same qualifier as the object names assigned by `extract_objects.from_file`, without the object name.
+        module_name = f[len(chronon_root_path.rstrip("/")) + 1 : -3].replace("/", ".").partition(".")[2]
+        outputs = outputs_by_module.get(module_name)
+        if outputs and all(output is not None for output in outputs):
+            compile_cache.record(f, dict(outputs))
+    compile_cache.save()
 
 
 def _handle_dependent_configurations(
@@ -274,6 +897,13 @@ def _get_relative_materialized_file_path(full_output_root: str, name: str, obj:
     return output_file_path
 
 
+def _is_defined_in(
+    chronon_root_path: str, name: str, obj_class: Type[Union[Join, GroupBy]], python_files: Set[str]
+) -> bool:
+    conf_result = _get_conf_file_path(name, obj_class)
+    return conf_result is not None and os.path.abspath(os.path.join(chronon_root_path, conf_result[1])) in python_files
+
+
 def _get_conf_file_path(downstream: str, downstream_class: Type[Union[Join, GroupBy]]) -> Optional[Tuple[str, str]]:
     parts = downstream.split(".")
 
@@ -388,13 +1018,19 @@ def _handle_extra_conf_objects_to_materialize(
     validator: ChrononRepoValidator,
     log_level=logging.INFO,
     is_gb=True,
+    write_counts: Optional[Counter] = None,
+    copy_objs: bool = False,
 ) -> None:
     num_written_objs = 0
     # load materialized joins to validate the additional conf objects against.
-    validator.load_objs()
+    with compile_profiler.phase("load"):
+        validator.load_objs()
     for name, obj in conf_objs.items():
         team_name = name.split(".")[0]
+        if copy_objs:
+            obj = copy_thrift(obj)
         _set_team_level_metadata(obj, teams_path, team_name)
+        _set_templated_values(obj, GroupBy if is_gb else Join, teams_path, team_name)
         if _write_obj(
             full_output_root,
             validator,
@@ -403,6 +1039,7 @@ def _handle_extra_conf_objects_to_materialize(
             log_level,
             force_compile=True,
             force_overwrite=force_overwrite,
+            write_counts=write_counts,
         ):
             num_written_objs += 1
     print(f"Successfully wrote {num_written_objs} {'GroupBy' if is_gb else 'Join'} objects to {full_output_root}")
@@ -451,33 +1088,88 @@ def _write_obj(
     log_level: int,
     force_compile: bool = False,
     force_overwrite: bool = False,
+    write_counts: Optional[Counter] = None,
 ) -> bool:
     """
-    Returns True if the object is successfully written.
+    Returns True if the object is successfully written, or already materialized with the same content.
+    """
+    serialized = _serialize_obj(full_output_root, validator, name, obj, log_level, force_compile, force_overwrite)
+    if serialized is None:
+        if write_counts is not None:
+            write_counts["skipped"] += 1
+        return False
+    _write_serialized_obj(full_output_root, name, obj, serialized, validator.manifest, write_counts)
+    validator.add_obj(obj)
+    return True
+
+
+def _serialize_obj(
+    full_output_root: str,
+    validator: ChrononRepoValidator,
+    name: str,
+    obj: object,
+    log_level: int,
+    force_compile: bool = False,
+    force_overwrite: bool = False,
+) -> Optional[str]:
+    """
+    Runs the materialization checks for the object.
+
+    Returns the serialized object if it should be written, None otherwise.
     """
     file_name, obj_class, output_file = _construct_output_file_name(full_output_root, name, obj)
     class_name = obj_class.__name__
     team_name = name.split(".")[0]
     _print_highlighted(f"{class_name} Team", team_name)
     _print_highlighted(f"{class_name} Name", file_name)
-    skip_reasons = validator.can_skip_materialize(obj)
+    with compile_profiler.phase("skip_check", conf=name):
+        skip_reasons = validator.can_skip_materialize(obj)
     if not force_compile and skip_reasons:
         reasons = ", ".join(skip_reasons)
         _print_warning(f"Skipping {class_name} {file_name}: {reasons}")
         if os.path.exists(output_file):
             _print_warning(f"old file exists for skipped config: {output_file}")
-        return False
-    validation_errors = validator.validate_obj(obj)
+        return None
+    with compile_profiler.phase("validate", conf=name):
+        validation_errors = validator.validate_obj(obj)
     if validation_errors:
         _print_error(f"Could not write {class_name} {file_name}", ", ".join(validation_errors))
-        return False
+        return None
     if force_overwrite:
         _print_warning(f"Force overwrite {class_name} {file_name}")
-    elif not validator.safe_to_overwrite(obj):
-        _print_warning(f"Cannot overwrite {class_name} {file_name} with existing online conf")
-        return False
-    _write_obj_as_json(file_name, obj, output_file, obj_class)
-    return True
+    else:
+        with compile_profiler.phase("overwrite_check", conf=name):
+            safe_to_overwrite = validator.safe_to_overwrite(obj)
+        if not safe_to_overwrite:
+            _print_warning(f"Cannot overwrite {class_name} {file_name} with existing online conf")
+            return None
+    assert hasattr(obj, "name") or hasattr(
+        obj, "metaData"
+    ), f"Can't serialize objects without the name attribute for object {file_name}"
+    with compile_profiler.phase("serialize", conf=name):
+        return thrift_simple_json_protected(obj, obj_class)
+
+
+def _write_serialized_obj(
+    full_output_root: str,
+    name: str,
+    obj: object,
+    serialized: str,
+    manifest: Optional[RepoManifest] = None,
+    write_counts: Optional[Counter] = None,
+) -> str:
+    """
+    Returns the path of the written file.
+    """
+    file_name, obj_class, output_file = _construct_output_file_name(full_output_root, name, obj)
+    with compile_profiler.phase("write", conf=name):
+        written = _write_obj_as_json(file_name, serialized, output_file, obj_class)
+    if write_counts is not None:
+        write_counts["written" if written else "unchanged"] += 1
+    if manifest is not None:
+        with compile_profiler.phase("manifest", conf=name):
+            manifest.update(obj, output_file, serialized)
+    return output_file
 
 
 def _construct_output_file_name(full_output_root: str, name: str, obj: object) -> Tuple[str, Type, str]:
@@ -491,18 +1183,283 @@ def _construct_output_file_name(full_output_root: str, name: str, obj: object) -
     return file_name, obj_class, output_file
 
 
-def _write_obj_as_json(name: str, obj: object, output_file: str, obj_class: type):
+def _write_obj_as_json(name: str, serialized: str, output_file: str, obj_class: type) -> bool:
+    """
+    Writes the serialized object unless the file already has the same content, so that its mtime is only bumped
+    on real changes. The content is written to a temporary file first and renamed over the output file, so that
+    readers never see a partially written conf.
+
+    Returns True if the file was written.
+    """
     class_name = obj_class.__name__
     output_folder = os.path.dirname(output_file)
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
     assert os.path.isdir(output_folder), f"{output_folder} isn't a folder."
-    assert hasattr(obj, "name") or hasattr(
-        obj, "metaData"
-    ), f"Can't serialize objects without the name attribute for object {name}"
-    with open(output_file, "w") as f:
-        _print_highlighted(f"Writing {class_name} to", output_file)
-        f.write(thrift_simple_json_protected(obj, obj_class))
+    if os.path.isfile(output_file) and hash_file(output_file) == hash_bytes(serialized.encode("utf-8")):
+        _print_highlighted(f"Unchanged {class_name} at", output_file)
+        return False
+    # hidden, so that tools listing the materialized confs ignore it.
+    tmp_file = os.path.join(output_folder, f".{os.path.basename(output_file)}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_file, "w") as f:
+            _print_highlighted(f"Writing {class_name} to", output_file)
+            f.write(serialized)
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return True
+
+
+def _compile_objs(
+    results: dict,
+    obj_class: type,
+    full_output_root: str,
+    validator: ChrononRepoValidator,
+    teams_path: str,
+    force_overwrite: bool,
+    log_level=logging.INFO,
+    copy_objs: bool = False,
+) -> Iterator[Tuple[str, object, Optional[str]]]:
+    """
+    Lazily sets team level metadata on the extracted objects, or on their copies with copy_objs, validates and
+    serializes them.
+
+    Yields (name, obj, serialized) where serialized is None if the object should not be written.
+    """
+    for name, obj in results.items():
+        team_name = name.split(".")[0]
+        with compile_profiler.phase("metadata", conf=name):
+            if copy_objs:
+                obj = copy_thrift(obj)
+            _set_team_level_metadata(obj, teams_path, team_name)
+            _set_templated_values(obj, obj_class, teams_path, team_name)
+        serialized = _serialize_obj(full_output_root, validator, name, obj, log_level, force_overwrite, force_overwrite)
+        yield name, obj, serialized
+
+
+# Per process state of the compile workers, set up once by `_init_compile_worker`.
+_worker_state = {}
+
+
+def _init_compile_worker(
+    chronon_root_path: str,
+    output_root: str,
+    obj_class: type,
+    force_overwrite: bool,
+    log_level,
+    profile: bool = False,
+    copy_objs: bool = False,
+):
+    utils.chronon_root_path = chronon_root_path
+    if profile:
+        compile_profiler.start()
+    _worker_state.update(
+        chronon_root_path=chronon_root_path,
+        full_output_root=os.path.join(chronon_root_path, output_root),
+        teams_path=os.path.join(chronon_root_path, TEAMS_FILE_PATH),
+        validator=ChrononRepoValidator(chronon_root_path, output_root, log_level=log_level),
+        obj_class=obj_class,
+        force_overwrite=force_overwrite,
+        log_level=log_level,
+        copy_objs=copy_objs,
+    )
+
+
+class _RecordingHandler(logging.Handler):
+    """
+    Keeps the log records of a compile worker, so that the coordinator can handle them along with the output.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        # tracebacks and arguments aren't picklable, keep them formatted.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.msg = record.getMessage()
+        record.args = None
+        self.records.append(record)
+
+
+@contextlib.contextmanager
+def _captured_output():
+    """
+    Captures everything printed or logged within the context, as a (output, log records) pair.
+    """
+    root_logger = logging.getLogger()
+    handlers = root_logger.handlers
+    recorder = _RecordingHandler()
+    root_logger.handlers = [recorder]
+    captured = ["", recorder.records]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            yield captured
+    finally:
+        root_logger.handlers = handlers
+        captured[0] = output.getvalue()
+
+
+def _replay_output(output: str, records: list):
+    print(output, end="")
+    for record in records:
+        logging.getLogger(record.name).handle(record)
+
+
+def _compile_files_in_worker(file_paths: List[str]) -> Tuple[List[tuple], list]:
+    """
+    Extracts, validates and serializes all the objects of a group of files sharing modules inside a compile worker.
+    Like a serial compile, all the files are extracted before any object is compiled, as objects of a file may
+    be changed by the extraction or the compile of the other files.
+
+    Returns for each file the output of its extraction and the (name, serialized, output) triples of its objects,
+    in the order a serial compile handles them, along with the profiler records of the group. Outputs are
+    everything printed or logged, so that the coordinator can replay them deterministically. The exception of
+    an object failing to compile takes the place of its serialization, and ends the objects of the group.
+    """
+    state = _worker_state
+    names_by_file = {}
+    extraction_outputs = {}
+    results = {}
+    for file_path in file_paths:
+        with _captured_output() as extraction_output:
+            try:
+                extracted = eo.from_file(state["chronon_root_path"], file_path, state["obj_class"], state["log_level"])
+            except Exception as e:
+                # Same behavior as `from_files`: broken files are reported and do not fail the whole compile.
+                logging.error(f"Failed to extract: {file_path}")
+                logging.exception(e)
+                extracted = {}
+        extraction_outputs[file_path] = extraction_output
+        names_by_file[file_path] = [name for name in extracted if name not in results]
+        results.update(extracted)
+    compiled_objs = _compile_objs(
+        results,
+        state["obj_class"],
+        state["full_output_root"],
+        state["validator"],
+        state["teams_path"],
+        state["force_overwrite"],
+        state["log_level"],
+        state["copy_objs"],
+    )
+    compiled = {}
+    failure = None
+    while failure is None:
+        with _captured_output() as obj_output:
+            try:
+                item = next(compiled_objs, None)
+            except Exception as e:
+                item = None
+                failure = e
+        if failure is not None:
+            # like a serial compile, stop at the first object failing to compile, which is raised by the coordinator.
+            next_name = next((name for name in results if name not in compiled), None)
+            compiled[next_name] = (failure, obj_output)
+        elif item is None:
+            break
+        else:
+            name, _, serialized = item
+            compiled[name] = (serialized, obj_output)
+    files = [
+        (file_path, extraction_outputs[file_path], [(name, *compiled[name]) for name in names if name in compiled])
+        for file_path, names in names_by_file.items()
+    ]
+    profiler = compile_profiler.stop()
+    if profiler is None:
+        return files, []
+    compile_profiler.start()
+    return files, profiler.records()
+
+
+def _group_files_by_shared_imports(chronon_root_path: str, python_files: List[str]) -> List[List[str]]:
+    """
+    Groups the python files which import, directly or not, the same python files under the chronon root or each
+    other, as they share the state of these modules when compiled in the same process.
+
+    returns:
+        the groups, each listing its files in the order of python_files.
+    """
+    parents = {}
+
+    def find(node):
+        parents.setdefault(node, node)
+        while parents[node] != node:
+            parents[node] = parents[parents[node]]
+            node = parents[node]
+        return node
+
+    for f in python_files:
+        find(f)
+        try:
+            local_imports = get_local_imports(chronon_root_path, f)
+        except (OSError, SyntaxError, ValueError):
+            # the file fails to be extracted on its own.
+            continue
+        for imported in local_imports:
+            parents[find(imported)] = find(f)
+    groups = {}
+    for f in python_files:
+        groups.setdefault(find(f), []).append(f)
+    return list(groups.values())
+
+
+def _compile_in_parallel(
+    chronon_root_path: str,
+    python_files: List[str],
+    obj_class: type,
+    output_root: str,
+    workers: int,
+    force_overwrite: bool,
+    log_level=logging.INFO,
+    copy_objs: bool = False,
+) -> Iterator[Tuple[str, object, Optional[str]]]:
+    """
+    Spreads extraction, validation and serialization of the files across a process pool. Files sharing modules
+    are compiled by the same worker, in the same order as a serial compile, so that they see the same state.
+
+    Workers hand back serialized objects; the coordinator decodes them and yields them in the same order
+    as a serial compile would, so that writes and dependency bookkeeping stay in a single process.
+    """
+    groups = _group_files_by_shared_imports(chronon_root_path, python_files)
+    with multiprocessing.Pool(
+        processes=workers,
+        initializer=_init_compile_worker,
+        initargs=(
+            chronon_root_path,
+            output_root,
+            obj_class,
+            force_overwrite,
+            log_level,
+            compile_profiler.active() is not None,
+            copy_objs,
+        ),
+    ) as pool:
+        compiled_groups = pool.map(_compile_files_in_worker, groups, chunksize=1)
+    compiled_files = {}
+    for files, records in compiled_groups:
+        for file_path, extraction_output, compiled in files:
+            compiled_files[file_path] = (extraction_output, compiled)
+        if compile_profiler.active() is not None:
+            compile_profiler.active().merge(records)
+    # a serial compile extracts all the files before compiling any object.
+    for file_path in python_files:
+        _replay_output(*compiled_files[file_path][0])
+    for file_path in python_files:
+        for name, serialized, output in compiled_files[file_path][1]:
+            _replay_output(*output)
+            if isinstance(serialized, Exception):
+                raise serialized
+            if serialized is None:
+                yield name, None, None
+            else:
+                with compile_profiler.phase("decode", conf=name):
+                    obj = json2thrift(serialized, obj_class)
+                yield name, obj, serialized
 
 
 def _print_highlighted(left, right):
@@ -0,0 +1,155 @@
+"""Persistent content-hash cache that lets compile skip configs whose inputs did not change.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+import ai.chronon
+from ai.chronon.logger import get_logger
+from ai.chronon.repo import COMPILE_CACHE_FILE_PATH, TEAMS_FILE_PATH
+from ai.chronon.repo.import_graph import get_local_imports
+
+# Bump when the layout of the cache file or the meaning of its keys changes.
+CACHE_VERSION = 1
+
+
+def hash_bytes(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_file(path: str) -> Optional[str]:
+    if not os.path.isfile(path):
+        return None
+    with open(path, "rb") as f:
+        return hash_bytes(f.read())
+
+
+def _library_fingerprint() -> str:
+    """
+    Hash of the chronon python library itself, so that upgrading it invalidates every entry.
+    """
+    library_root = os.path.dirname(ai.chronon.__file__)
+    digest = hashlib.sha256()
+    for sub_root, sub_dirs, sub_files in os.walk(library_root):
+        sub_dirs.sort()
+        for f in sorted(sub_files):
+            if f.endswith(".py"):
+                path = os.path.join(sub_root, f)
+                digest.update(os.path.relpath(path, library_root).encode("utf-8"))
+                digest.update(hash_file(path).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CompileCache(object):
+    """
+    Cache of compiled config files, stored as json under the chronon root.
+
+    Each entry is keyed by the content hash of a config file, of the python modules under the chronon root
+    it imports, of teams.json and of the chronon library. It records the materialized files produced for the
+    config along with their content hashes, so that a hit is only served while those files are untouched.
+    """
+
+    def __init__(self, chronon_root_path: str, output_root: str, obj_class: type, log_level=logging.INFO):
+        self.logger = get_logger(log_level)
+        self.chronon_root_path = chronon_root_path
+        self.output_root = output_root
+        self.obj_class = obj_class
+        self.cache_path = os.path.join(chronon_root_path, COMPILE_CACHE_FILE_PATH)
+        self.hits = 0
+        self.misses = 0
+        self._file_hashes = {}
+        self._keys = {}
+        self._common_key = "\n".join(
+            [
+                str(CACHE_VERSION),
+                obj_class.__name__,
+                output_root,
+                str(hash_file(os.path.join(chronon_root_path, TEAMS_FILE_PATH))),
+                _library_fingerprint(),
+            ]
+        )
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if not os.path.isfile(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                content = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable compile cache {self.cache_path}: {e}")
+            return {}
+        if content.get("version") != CACHE_VERSION:
+            return {}
+        return content.get("entries", {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.chronon_root_path)
+
+    def _hash(self, path: str) -> Optional[str]:
+        if path not in self._file_hashes:
+            self._file_hashes[path] = hash_file(path)
+        return self._file_hashes[path]
+
+    def key(self, file_path: str) -> str:
+        if file_path not in self._keys:
+            digest = hashlib.sha256(self._common_key.encode("utf-8"))
+            for path in [file_path] + get_local_imports(self.chronon_root_path, file_path):
+                digest.update(f"\n{self._relative(path)}:{self._hash(path)}".encode("utf-8"))
+            self._keys[file_path] = digest.hexdigest()
+        return self._keys[file_path]
+
+    def is_fresh(self, file_path: str) -> bool:
+        """
+        Checks whether the materialized output of the config file can be reused, and counts the hit or miss.
+        """
+        entry = self.entries.get(self._relative(file_path))
+        fresh = (
+            entry is not None
+            and entry["key"] == self.key(file_path)
+            and all(
+                hash_file(os.path.join(self.chronon_root_path, output)) == content_hash
+                for output, content_hash in entry["outputs"].items()
+            )
+        )
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return fresh
+
+    def record(self, file_path: str, outputs: Dict[str, str]):
+        """
+        Records the materialized files, mapped to their serialized content, produced for the config file.
+        """
+        self.entries[self._relative(file_path)] = {
+            "key": self.key(file_path),
+            "outputs": {
+                self._relative(output_file): hash_bytes(serialized.encode("utf-8"))
+                for output_file, serialized in outputs.items()
+            },
+        }
@@ -0,0 +1,154 @@
+"""Wall and CPU time spent by compile, by phase, by conf and by python file.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import contextlib
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# (wall seconds, cpu seconds, count)
+Timing = List[float]
+
+# The profiler of the running compile, if profiling is enabled. Set by `start`.
+_active = None
+
+
+def _new_timing() -> Timing:
+    return [0.0, 0.0, 0]
+
+
+def _add(timing: Timing, wall: float, cpu: float, count: int = 1):
+    timing[0] += wall
+    timing[1] += cpu
+    timing[2] += count
+
+
+def _to_json(timing: Timing) -> dict:
+    return {"wall": round(timing[0], 6), "cpu": round(timing[1], 6), "count": int(timing[2])}
+
+
+class CompileProfiler(object):
+    """
+    Accumulates the time spent in each phase of compile. Time is attributed to a conf, by its name, or to a
+    python file, for the phases which run before the confs are known, such as importing them.
+
+    CPU time is the time of the current process, so it also covers the other threads of the process and excludes
+    the time spent in compile workers, whose timings are merged separately.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, Timing] = defaultdict(_new_timing)
+        self.confs: Dict[str, Dict[str, Timing]] = defaultdict(lambda: defaultdict(_new_timing))
+        self.files: Dict[str, Dict[str, Timing]] = defaultdict(lambda: defaultdict(_new_timing))
+        self._start = (time.perf_counter(), time.process_time())
+
+    @contextlib.contextmanager
+    def phase(self, name: str, conf: Optional[str] = None, file: Optional[str] = None):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall, time.process_time() - cpu, conf, file)
+
+    def record(self, name: str, wall: float, cpu: float, conf: Optional[str] = None, file: Optional[str] = None):
+        _add(self.phases[name], wall, cpu)
+        if conf is not None:
+            _add(self.confs[conf][name], wall, cpu)
+        if file is not None:
+            _add(self.files[file][name], wall, cpu)
+
+    def records(self) -> List[Tuple[str, float, float, Optional[str], Optional[str]]]:
+        """
+        returns:
+            the timings attributed to confs and files, in a form that can be merged into another profiler.
+        """
+        result = []
+        for key, by_item in [("conf", self.confs), ("file", self.files)]:
+            for item, phases in by_item.items():
+                for name, (wall, cpu, _) in phases.items():
+                    result.append((name, wall, cpu, item if key == "conf" else None, item if key == "file" else None))
+        return result
+
+    def merge(self, records: List[Tuple[str, float, float, Optional[str], Optional[str]]]):
+        for name, wall, cpu, conf, file in records:
+            self.record(name, wall, cpu, conf, file)
+
+    @staticmethod
+    def _totals(by_item: Dict[str, Dict[str, Timing]]) -> Dict[str, dict]:
+        result = {}
+        for item, phases in by_item.items():
+            total = _new_timing()
+            for timing in phases.values():
+                _add(total, timing[0], timing[1], 0)
+            result[item] = {
+                "wall": round(total[0], 6),
+                "cpu": round(total[1], 6),
+                "phases": {name: _to_json(timing) for name, timing in sorted(phases.items())},
+            }
+        return result
+
+    def report(self) -> dict:
+        return {
+            "total": {
+                "wall": round(time.perf_counter() - self._start[0], 6),
+                "cpu": round(time.process_time() - self._start[1], 6),
+            },
+            "phases": {name: _to_json(timing) for name, timing in sorted(self.phases.items())},
+            "confs": self._totals(self.confs),
+            "files": self._totals(self.files),
+        }
+
+    def write(self, path: str) -> dict:
+        report = self.report()
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return report
+
+
+def top(items: Dict[str, dict], n: int) -> List[Tuple[str, dict]]:
+    """
+    returns:
+        the n items of a report section with the highest wall time.
+    """
+    return sorted(items.items(), key=lambda item: (-item[1]["wall"], item[0]))[:n]
+
+
+def start() -> CompileProfiler:
+    global _active
+    _active = CompileProfiler()
+    return _active
+
+
+def stop() -> Optional[CompileProfiler]:
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def active() -> Optional[CompileProfiler]:
+    return _active
+
+
+def phase(name: str, conf: Optional[str] = None, file: Optional[str] = None):
+    """
+    Times the block as a phase of the running compile, if it is being profiled.
+    """
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.phase(name, conf, file)
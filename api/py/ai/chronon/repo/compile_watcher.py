@@ -0,0 +1,115 @@
+"""Tracks the python files of a chronon root between compiles of a long running compile --watch process.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Tuple
+
+import ai.chronon.repo.extract_objects as eo
+from ai.chronon.logger import get_logger
+from ai.chronon.repo import TEAMS_FILE_PATH, teams
+from ai.chronon.repo.import_graph import ImportGraph, get_module_name
+
+
+class CompileWatcher(object):
+    """
+    Watches the python files under the chronon root, and teams.json, by polling their modification time and size.
+
+    Modules stay loaded between compiles: `unload` only drops the modules of the modified files and of the files
+    importing them, directly or not, so that the next compile executes just those again.
+    """
+
+    def __init__(self, chronon_root_path: str, output_root: str, log_level=logging.INFO):
+        self.logger = get_logger(log_level)
+        self.chronon_root_path = os.path.abspath(chronon_root_path)
+        self.output_root_path = os.path.join(self.chronon_root_path, output_root)
+        self.teams_path = os.path.join(self.chronon_root_path, TEAMS_FILE_PATH)
+        self.import_graph = ImportGraph(self.chronon_root_path)
+        self._stats = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for sub_root, sub_dirs, sub_files in os.walk(self.chronon_root_path):
+            sub_dirs[:] = [
+                d
+                for d in sub_dirs
+                if not d.startswith(".") and d != "__pycache__" and os.path.join(sub_root, d) != self.output_root_path
+            ]
+            for f in sub_files:
+                path = os.path.join(sub_root, f)
+                if f.endswith(".py") or path == self.teams_path:
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def poll(self) -> List[str]:
+        """
+        returns:
+            sorted paths of the files modified, added or deleted since the previous poll.
+        """
+        stats = self._scan()
+        changed = sorted(path for path in set(stats) | set(self._stats) if stats.get(path) != self._stats.get(path))
+        self._stats = stats
+        self.import_graph.update(changed)
+        return changed
+
+    def wait_for_changes(self, poll_interval: float) -> List[str]:
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+            time.sleep(poll_interval)
+
+    def warm_up(self, file_paths: Iterable[str]):
+        """
+        Imports the modules of the files ahead of the first change. Errors are reported once the files compile.
+        """
+        for path in file_paths:
+            try:
+                importlib.import_module(get_module_name(self.chronon_root_path, os.path.abspath(path)))
+            except Exception as e:
+                self.logger.debug(f"Could not import {path}: {e}")
+
+    def unload(self, changed_files: List[str], affected_files: Iterable[str]) -> List[str]:
+        """
+        Drops the modules of the changed files, of their importers and of the affected files from `sys.modules`.
+
+        returns:
+            sorted names of the unloaded modules.
+        """
+        if self.teams_path in changed_files:
+            teams.loaded_jsons.clear()
+        for path in changed_files:
+            # bytecode only records the source mtime in seconds, so it can't tell apart quick successive edits.
+            if path.endswith(".py") and os.path.isfile(importlib.util.cache_from_source(path)):
+                os.remove(importlib.util.cache_from_source(path))
+        files = set(self.import_graph.get_importers(changed_files))
+        # deleted files are not part of their own importers.
+        files.update(os.path.abspath(f) for f in list(changed_files) + list(affected_files) if f.endswith(".py"))
+        module_names = sorted(
+            name for name in (get_module_name(self.chronon_root_path, f) for f in files) if name in sys.modules
+        )
+        eo.unload_modules(module_names)
+        importlib.invalidate_caches()
+        return module_names
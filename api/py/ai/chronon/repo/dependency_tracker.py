@@ -16,18 +16,101 @@
 #     limitations under the License.
 import logging
 import os
-from typing import List
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
 
-from ai.chronon.api.ttypes import GroupBy, Join
+from ai.chronon.api.ttypes import GroupBy, Join, StagingQuery
 from ai.chronon.logger import get_logger
-from ai.chronon.repo import GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME
+from ai.chronon.repo.manifest import RepoManifest
 from ai.chronon.repo.validator import extract_json_confs
 
 
+# (class name, conf name) of a materialized conf.
+Node = Tuple[str, str]
+CLASSES = {obj_class.__name__: obj_class for obj_class in (GroupBy, Join, StagingQuery)}
+
+
+class DependencyGraph(object):
+    """
+    Reverse dependency graph of the materialized confs, built once from the manifest.
+
+    Edges point from a conf to the confs consuming it: GroupBy -> Join through join parts, Join -> GroupBy
+    (or chained Join) through join sources and StagingQuery -> any conf reading its output table.
+    """
+
+    def __init__(self, manifest: RepoManifest):
+        # node -> nodes it directly depends on, to drop stale edges when a conf is updated.
+        self._upstream: Dict[Node, Set[Node]] = {}
+        self._downstream: Dict[Node, Set[Node]] = defaultdict(set)
+        # node -> tables read / written by it, and table -> nodes reading it.
+        self._input_tables: Dict[Node, List[str]] = {}
+        self._output_tables: Dict[Node, List[str]] = {}
+        self._readers: Dict[str, Set[Node]] = defaultdict(set)
+        for entry in manifest.entries.values():
+            self.add(entry)
+
+    def add(self, entry: dict):
+        """
+        Adds the manifest entry of a conf to the graph, replacing the edges of a previous version of it.
+        """
+        node = (entry["type"], entry["name"])
+        for upstream in self._upstream.get(node, ()):
+            self._downstream[upstream].discard(node)
+        for table in self._input_tables.get(node, ()):
+            self._readers[table].discard(node)
+        upstream = {(GroupBy.__name__, name) for name in entry["group_bys"]}
+        upstream.update((Join.__name__, name) for name in entry["joins"])
+        self._upstream[node] = upstream
+        for upstream_node in upstream:
+            self._downstream[upstream_node].add(node)
+        self._input_tables[node] = entry["input_tables"]
+        for table in entry["input_tables"]:
+            self._readers[table].add(node)
+        self._output_tables[node] = entry["output_tables"] if entry["type"] == StagingQuery.__name__ else []
+
+    def downstream(self, node: Node) -> List[Node]:
+        """
+        returns:
+            the confs directly consuming the conf, sorted.
+        """
+        consumers = set(self._downstream.get(node, ()))
+        for table in self._output_tables.get(node, ()):
+            consumers.update(self._readers.get(table, ()))
+        consumers.discard(node)
+        return sorted(consumers)
+
+    def transitive_downstream(self, node: Node) -> List[Node]:
+        """
+        returns:
+            all the confs depending on the conf, directly or not, sorted.
+        """
+        seen = set()
+        stack = [node]
+        while stack:
+            for consumer in self.downstream(stack.pop()):
+                if consumer not in seen:
+                    seen.add(consumer)
+                    stack.append(consumer)
+        seen.discard(node)
+        return sorted(seen)
+
+
 class ChrononEntityDependencyTracker(object):
-    def __init__(self, chronon_root_path: str, log_level=logging.INFO):
+    def __init__(self, chronon_root_path: str, log_level=logging.INFO, manifest: Optional[RepoManifest] = None):
+        """
+        chronon_root_path is the output root holding the materialized confs. Downstream lookups are answered from
+        a dependency graph built once from its manifest. Callers writing confs keep it up to date with `update`.
+        """
         self.logger = get_logger(log_level)
         self.chronon_root_path = chronon_root_path
+        self.manifest = manifest or RepoManifest(chronon_root_path, log_level=log_level).refresh()
+        self.graph = DependencyGraph(self.manifest)
+
+    def update(self, obj: object):
+        """
+        Refreshes the edges of a conf that was just materialized.
+        """
+        self.graph.add(self.manifest.find(type(obj), obj.metaData.name))
 
     def extract_conf(self, obj_class: type, path: str) -> object:
         obj = extract_json_confs(obj_class, os.path.join(self.chronon_root_path, path))
@@ -37,52 +120,46 @@ class ChrononEntityDependencyTracker(object):
             raise Exception(f"Multiple {obj_class} found in {path}")
         return obj[0]
 
-    def get_join_downstream(self, conf_path: str) -> List[object]:
-        join = self.extract_conf(Join, conf_path)
-        join_name = join.metaData.name
-        names_set = set()
-        downstream = list()
-        group_bys = extract_json_confs(GroupBy, os.path.join(self.chronon_root_path, GROUP_BY_FOLDER_NAME))
-        for group_by in group_bys:
-            for source in group_by.sources:
-                if (
-                    source.joinSource
-                    and source.joinSource.join.metaData.name == join_name
-                    and group_by.metaData.name not in names_set
-                ):
-                    names_set.add(group_by.metaData.name)
-                    downstream.append(group_by)
-        return downstream
+    def _get_node(self, obj_class: type, conf_path: str) -> Node:
+        entry = self.manifest.get(conf_path)
+        if entry is not None and entry["type"] == obj_class.__name__:
+            return entry["type"], entry["name"]
+        return obj_class.__name__, self.extract_conf(obj_class, conf_path).metaData.name
 
-    def get_group_by_downstream(self, conf_path: str) -> List[object]:
-        group_by = self.extract_conf(GroupBy, conf_path)
-        group_by_name = group_by.metaData.name
-        names_set = set()
-        downstream = list()
-        joins = extract_json_confs(Join, os.path.join(self.chronon_root_path, JOIN_FOLDER_NAME))
-        for join in joins:
-            for join_part in join.joinParts:
-                if join_part.groupBy.metaData.name == group_by_name and join.metaData.name not in names_set:
-                    names_set.add(join.metaData.name)
-                    downstream.append(join)
-        return downstream
-
-    def get_downstream(self, conf_path: str) -> List[object]:
+    def _get_downstream_entries(self, conf_path: str, transitive: bool = False) -> List[dict]:
         if "joins" in conf_path:
-            downstream = self.get_join_downstream(conf_path)
+            node = self._get_node(Join, conf_path)
         elif "group_bys" in conf_path:
-            downstream = self.get_group_by_downstream(conf_path)
-        # TODO: Implement the downstream check for staging queries
+            node = self._get_node(GroupBy, conf_path)
         elif "staging_queries" in conf_path:
-            self.logger.info("Staging queries downstream check not supported yet.")
-            downstream = set()
+            node = self._get_node(StagingQuery, conf_path)
         else:
             raise Exception(f"Invalid conf path: {conf_path}")
-        return downstream
+        nodes = self.graph.transitive_downstream(node) if transitive else self.graph.downstream(node)
+        return [self.manifest.find(CLASSES[class_name], name) for class_name, name in nodes]
+
+    def _get_direct_downstream_entries(self, conf_path: str) -> List[dict]:
+        entries = self._get_downstream_entries(conf_path)
+        if "joins" in conf_path:
+            # only the group_bys using the join as a join source are materialized along with it, not chained joins.
+            entries = [entry for entry in entries if entry["type"] == GroupBy.__name__]
+        return entries
+
+    def get_join_downstream(self, conf_path: str) -> List[object]:
+        return [self.manifest.load_conf(entry) for entry in self._get_direct_downstream_entries(conf_path)]
+
+    def get_group_by_downstream(self, conf_path: str) -> List[object]:
+        return [self.manifest.load_conf(entry) for entry in self._get_direct_downstream_entries(conf_path)]
+
+    def get_downstream(self, conf_path: str) -> List[object]:
+        return [self.manifest.load_conf(entry) for entry in self._get_direct_downstream_entries(conf_path)]
 
     def get_downstream_names(self, conf_path: str) -> List[str]:
-        downstream = self.get_downstream(conf_path)
-        downstream_name = list()
-        for obj in downstream:
-            downstream_name.append(obj.metaData.name)
-        return downstream_name
+        return [entry["name"] for entry in self._get_direct_downstream_entries(conf_path)]
+
+    def get_transitive_downstream_names(self, conf_path: str) -> List[str]:
+        """
+        returns:
+            names of all the confs impacted by a change of the conf, directly or through other confs.
+        """
+        return [entry["name"] for entry in self._get_downstream_entries(conf_path, transitive=True)]
@@ -13,13 +13,123 @@
 #     limitations under the License.
 
 import glob
+import importlib.abc
 import importlib.machinery
 import importlib.util
 import logging
 import os
+import sys
 
-from ai.chronon.api.ttypes import GroupBy, Join
+from ai.chronon.api.ttypes import GroupBy, Join, StagingQuery
 from ai.chronon.logger import get_logger
+from ai.chronon.repo import GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME, STAGING_QUERY_FOLDER_NAME, compile_profiler
+
+CONF_MODULE_PREFIXES = (GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME, STAGING_QUERY_FOLDER_NAME)
+CONF_CLASSES = (GroupBy, Join, StagingQuery)
+
+# module prefix -> id(obj) -> (obj, name of the module which owns the obj).
+# The obj is kept alongside its owner so that ids can't be recycled while registered.
+_module_owners = {prefix: {} for prefix in CONF_MODULE_PREFIXES}
+_registered_modules = set()
+
+
+def _register_module(module):
+    """Records the ownership of all the conf objects in a fully executed conf module."""
+    prefix = module.__name__.split(".")[0]
+    owners = _module_owners[prefix]
+    for obj in list(module.__dict__.values()):
+        if isinstance(obj, CONF_CLASSES):
+            # modules importing an object are executed after the module defining it, so the first owner wins.
+            owners.setdefault(id(obj), (obj, module.__name__))
+    _registered_modules.add(module.__name__)
+
+
+def unload_modules(module_names):
+    """
+    Drops the modules from `sys.modules` and forgets the conf objects they own, so that they are executed again
+    the next time they are imported.
+    """
+    module_names = {name for name in module_names if name in sys.modules}
+    for name in module_names:
+        module = sys.modules.pop(name)
+        # `from package import module` reuses the attribute of the package as long as it is set.
+        parent, _, child = name.rpartition(".")
+        if parent in sys.modules and getattr(sys.modules[parent], child, None) is module:
+            delattr(sys.modules[parent], child)
+    for owners in _module_owners.values():
+        for obj_id in [obj_id for obj_id, (_, owner) in owners.items() if owner in module_names]:
+            del owners[obj_id]
+    _registered_modules.difference_update(module_names)
+
+
+def unload_conf_modules():
+    """
+    Drops all the group_bys, joins and staging_queries modules, leaving the modules they import loaded.
+    """
+    unload_modules([name for name in list(sys.modules) if name.split(".")[0] in CONF_MODULE_PREFIXES])
+
+
+class _RegisteringLoader(importlib.abc.Loader):
+    def __init__(self, loader):
+        self.loader = loader
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.loader.exec_module(module)
+        _register_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ConfModuleFinder(importlib.abc.MetaPathFinder):
+    """
+    Import hook for the group_bys, joins and staging_queries modules of a chronon repo that registers
+    which module owns each conf object once the module is imported.
+    """
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname.split(".")[0] not in CONF_MODULE_PREFIXES:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if spec is not None and spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _RegisteringLoader(spec.loader)
+        return spec
+
+
+def install_import_hook():
+    if not any(isinstance(finder, ConfModuleFinder) for finder in sys.meta_path):
+        sys.meta_path.insert(0, ConfModuleFinder())
+
+
+def _find_unregistered_owner(obj, mod_prefix: str):
+    """
+    Fallback for modules the hook did not see: modules imported before it was installed, which get registered
+    now, and modules still being executed, which are searched directly.
+    """
+    for module_name, module in list(sys.modules.items()):
+        if module_name in _registered_modules or module_name.split(".")[0] != mod_prefix or module is None:
+            continue
+        if getattr(getattr(module, "__spec__", None), "_initializing", False):
+            if any(value is obj for value in list(module.__dict__.values())):
+                return module_name
+        else:
+            _register_module(module)
+    owner = _module_owners[mod_prefix].get(id(obj))
+    return owner[1] if owner and owner[0] is obj else None
+
+
+def get_mod_name(obj, mod_prefix: str):
+    """
+    returns:
+        name of the `mod_prefix` module (group_bys, joins or staging_queries) which owns the object, if any.
+    """
+    owner = _module_owners[mod_prefix].get(id(obj))
+    if owner and owner[0] is obj:
+        return owner[1]
+    return _find_unregistered_owner(obj, mod_prefix)
 
 
 def from_folder(root_path: str, full_path: str, cls: type, log_level=logging.INFO):
@@ -27,10 +137,23 @@ def from_folder(root_path: str, full_path: str, cls: type, log_level=logging.INF
     Recursively consumes a folder, and constructs a map
     Creates a map of object qualifier to
     """
+    return from_files(root_path, get_python_files(full_path), cls, log_level)
+
+
+def get_python_files(full_path: str):
+    """
+    Lists the python files under a folder recursively, in the order they are compiled.
+    """
     if full_path.endswith("/"):
         full_path = full_path[:-1]
+    return glob.glob(os.path.join(full_path, "**/*.py"), recursive=True)
 
-    python_files = glob.glob(os.path.join(full_path, "**/*.py"), recursive=True)
+
+def from_files(root_path: str, python_files, cls: type, log_level=logging.INFO):
+    """
+    Constructs a map of object qualifier to object for the given python files.
+    Files which fail to be extracted are logged and skipped.
+    """
     result = {}
     for f in python_files:
         try:
@@ -67,7 +190,8 @@ def from_file(root_path: str, file_path: str, cls: type, log_level=logging.INFO)
     # strips `.py` on the right side and finally replaces the slash sign to dot
     # eg: the output would be `team_name.python_script_name`
     mod_qualifier = file_path[len(root_path.rstrip("/")) + 1 : -3].replace("/", ".")
-    mod = importlib.import_module(mod_qualifier)
+    with compile_profiler.phase("import", file=os.path.relpath(file_path, root_path)):
+        mod = importlib.import_module(mod_qualifier)
 
     # get inline group_bys
     inline_group_bys = [k for k in mod.__dict__.values() if isinstance(k, GroupBy)] if cls == Join else None
@@ -81,3 +205,6 @@ def from_file(root_path: str, file_path: str, cls: type, log_level=logging.INFO)
     for obj in [o for o in mod.__dict__.values() if isinstance(o, cls)]:
         result[obj.metaData.name] = obj
     return result
+
+
+install_import_hook()
@@ -0,0 +1,176 @@
+"""Static import graph of the python files under the chronon root, built from their syntax trees.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import ast
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def module_file(chronon_root_path: str, module_name: str) -> Optional[str]:
+    """
+    Resolves a module name to a python file under the chronon root, if it is defined there.
+    """
+    base = os.path.join(chronon_root_path, *module_name.split("."))
+    for candidate in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _imported_module_names(file_path: str, module_name: str) -> Set[str]:
+    """
+    Statically collects the names of the modules a python file may import, including parent packages.
+    """
+    with open(file_path, "r") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+    package = module_name.rsplit(".", 1)[0] if "." in module_name else ""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            candidates = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                anchor = package.split(".") if package else []
+                anchor = anchor[: len(anchor) - (node.level - 1)] if node.level > 1 else anchor
+                base = ".".join([part for part in anchor + [base] if part])
+            # `from a import b` may either import the module `a.b` or the attribute `b` of `a`.
+            candidates = [base] + [f"{base}.{alias.name}" if base else alias.name for alias in node.names]
+        else:
+            continue
+        for candidate in candidates:
+            parts = candidate.split(".")
+            names.update(".".join(parts[: i + 1]) for i in range(len(parts)) if parts[0])
+    return names
+
+
+def get_referenced_names(file_path: str) -> Set[str]:
+    """
+    returns:
+        the names, attributes and keyword arguments a python file refers to, found without executing it.
+    """
+    with open(file_path, "r") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            names.add(node.attr)
+        elif isinstance(node, ast.keyword) and node.arg:
+            names.add(node.arg)
+        elif isinstance(node, ast.alias):
+            names.add(node.asname or node.name.split(".")[-1])
+    return names
+
+
+def get_module_name(chronon_root_path: str, file_path: str) -> str:
+    """
+    returns:
+        name of the module defined by a python file under the chronon root.
+    """
+    name = os.path.relpath(file_path, chronon_root_path)[: -len(".py")].replace(os.sep, ".")
+    return name[: -len(".__init__")] if name.endswith(".__init__") else name
+
+
+def get_local_imports(chronon_root_path: str, file_path: str) -> List[str]:
+    """
+    returns:
+        sorted paths of all the python files under the chronon root that the file transitively imports,
+        excluding the file itself.
+    """
+    root = chronon_root_path.rstrip("/")
+    seen = set()
+    stack = [file_path]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        for name in _imported_module_names(current, get_module_name(root, current)):
+            imported_file = module_file(root, name)
+            if imported_file and imported_file not in seen:
+                stack.append(imported_file)
+    seen.discard(file_path)
+    return sorted(seen)
+
+
+class ImportGraph(object):
+    """
+    Which python files under the chronon root import which modules, found without executing any of them.
+    """
+
+    def __init__(self, chronon_root_path: str):
+        self.chronon_root_path = chronon_root_path.rstrip("/")
+        # module name -> python files importing it, whether the module still exists or not.
+        self._importers: Dict[str, Set[str]] = defaultdict(set)
+        # python file -> module names it imports.
+        self._imports: Dict[str, Set[str]] = {}
+        for sub_root, sub_dirs, sub_files in os.walk(self.chronon_root_path):
+            sub_dirs[:] = sorted(d for d in sub_dirs if not d.startswith(".") and d != "__pycache__")
+            for f in sub_files:
+                if f.endswith(".py"):
+                    self._add(os.path.join(sub_root, f))
+
+    def _add(self, file_path: str):
+        try:
+            imported = _imported_module_names(file_path, get_module_name(self.chronon_root_path, file_path))
+        except (SyntaxError, ValueError):
+            # compiling the file will report the error.
+            imported = set()
+        self._imports[file_path] = imported
+        for name in imported:
+            self._importers[name].add(file_path)
+
+    def update(self, file_paths: Iterable[str]):
+        """
+        Parses the given python files again, after they were modified, added or deleted.
+        """
+        root = os.path.abspath(self.chronon_root_path)
+        for path in file_paths:
+            if not path.endswith(".py"):
+                continue
+            # files are keyed the way os.walk found them under the root.
+            file_path = os.path.join(self.chronon_root_path, os.path.relpath(os.path.abspath(path), root))
+            for name in self._imports.pop(file_path, ()):
+                self._importers[name].discard(file_path)
+            if os.path.isfile(file_path):
+                self._add(file_path)
+
+    def get_importers(self, file_paths: Iterable[str]) -> List[str]:
+        """
+        returns:
+            sorted python files that transitively import any of the files, along with the files themselves.
+            Deleted files are accepted, so that the files still importing them are found.
+        """
+        file_paths = [os.path.abspath(path) for path in file_paths if path.endswith(".py")]
+        root = os.path.abspath(self.chronon_root_path)
+        result = {path for path in file_paths if os.path.isfile(path)}
+        stack = [get_module_name(root, path) for path in file_paths]
+        seen = set()
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            for importer in self._importers.get(name, ()):
+                importer = os.path.abspath(importer)
+                if importer not in result:
+                    result.add(importer)
+                    stack.append(get_module_name(root, importer))
+        return sorted(result)
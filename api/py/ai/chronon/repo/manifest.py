@@ -0,0 +1,271 @@
+"""Persistent index of the materialized confs, kept next to the output root by compile.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+import ai.chronon.utils as utils
+from ai.chronon.api.ttypes import GroupBy, Join, StagingQuery
+from ai.chronon.logger import get_logger
+from ai.chronon.repo import GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME, MANIFEST_FILE_SUFFIX, STAGING_QUERY_FOLDER_NAME
+from ai.chronon.repo.compile_cache import hash_bytes
+from ai.chronon.repo.serializer import file2thrift, json2thrift
+from ai.chronon.utils import FeatureDisplayKeys
+
+# Bump when the layout of the manifest or the meaning of its fields changes.
+MANIFEST_VERSION = 3
+
+FOLDER_NAME_TO_CLASS = {
+    GROUP_BY_FOLDER_NAME: GroupBy,
+    JOIN_FOLDER_NAME: Join,
+    STAGING_QUERY_FOLDER_NAME: StagingQuery,
+}
+
+
+def manifest_path(output_root_path: str) -> str:
+    """
+    returns:
+        path of the manifest of the materialized confs under output_root_path, e.g. production_manifest.json
+        next to the production folder.
+    """
+    return os.path.normpath(output_root_path) + MANIFEST_FILE_SUFFIX
+
+
+def _output_columns(conf: object) -> List[str]:
+    # imported here since the validator itself loads the materialized confs through the manifest.
+    from ai.chronon.repo.validator import get_group_by_output_columns, get_join_output_columns
+
+    if isinstance(conf, GroupBy):
+        return sorted(get_group_by_output_columns(conf))
+    elif isinstance(conf, Join):
+        return sorted(get_join_output_columns(conf)[FeatureDisplayKeys.OUTPUT_COLUMNS])
+    return []
+
+
+def _input_tables(conf: object) -> List[str]:
+    """
+    Tables read by the conf itself. Join sources are tracked as references to the join instead.
+    """
+    if isinstance(conf, GroupBy):
+        return [utils.get_table(source) for source in conf.sources or [] if not source.joinSource]
+    elif isinstance(conf, Join):
+        return [utils.get_table(conf.left)] if conf.left and not conf.left.joinSource else []
+    # the query of a staging query is opaque, its dependencies name the tables it waits for.
+    return [json.loads(dependency)["spec"].split("/")[0] for dependency in conf.metaData.dependencies or []]
+
+
+def file_stat(path: str) -> dict:
+    """
+    Modification time and size of a materialized conf, recorded in its entry so that readers which can't afford to
+    hash the files, like the airflow helpers, can tell whether the file changed since the entry was written.
+    Empty for a file that doesn't exist, which readers then always treat as changed.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def build_entry(conf: object, conf_path: str, content_hash: str, log_level=logging.INFO) -> dict:
+    """
+    Summarizes a materialized conf. conf_path is relative to the output root, e.g. joins/team/conf.v1.
+    """
+    group_bys, joins = [], []
+    if isinstance(conf, Join):
+        group_bys = [jp.groupBy.metaData.name for jp in conf.joinParts or [] if jp.groupBy and jp.groupBy.metaData]
+        if conf.left and conf.left.joinSource:
+            joins.append(conf.left.joinSource.join.metaData.name)
+    elif isinstance(conf, GroupBy):
+        joins = [source.joinSource.join.metaData.name for source in conf.sources or [] if source.joinSource]
+    try:
+        output_tables = sorted(utils.get_related_table_names(conf, skip_join_parts=False))
+    except Exception as e:
+        get_logger(log_level).debug(f"Could not derive the output tables of {conf_path}: {e}")
+        output_tables = []
+    try:
+        input_tables = sorted(set(_input_tables(conf)))
+    except Exception as e:
+        get_logger(log_level).debug(f"Could not derive the input tables of {conf_path}: {e}")
+        input_tables = []
+    try:
+        output_columns = _output_columns(conf)
+    except Exception as e:
+        get_logger(log_level).debug(f"Could not derive the output columns of {conf_path}: {e}")
+        output_columns = []
+    return {
+        "name": conf.metaData.name,
+        "type": type(conf).__name__,
+        "team": conf.metaData.team or conf.metaData.name.split(".")[0],
+        "path": conf_path,
+        "hash": content_hash,
+        "online": bool(conf.metaData.online),
+        "production": bool(conf.metaData.production),
+        "group_bys": sorted(set(group_bys)),
+        "joins": sorted(set(joins)),
+        "input_tables": input_tables,
+        "output_tables": output_tables,
+        "output_columns": output_columns,
+    }
+
+
+class RepoManifest(object):
+    """
+    Index of the confs materialized under an output root, stored as json next to it.
+
+    Compile updates an entry for every conf it writes. Readers call `refresh`, which only decodes the confs whose
+    content hash changed since the manifest was written, and then answer their queries from the entries,
+    decoding individual confs with `load_conf` when they need the full object.
+    """
+
+    def __init__(self, output_root_path: str, log_level=logging.INFO):
+        self.logger = get_logger(log_level)
+        self.log_level = log_level
+        self.output_root_path = output_root_path
+        self.path = manifest_path(output_root_path)
+        self.entries: Dict[str, dict] = {}
+        # content of the confs as of the last refresh or update, so that readers don't read the files twice.
+        self.contents: Dict[str, str] = {}
+        self._names: Dict[tuple, str] = {}
+        self._dirty = False
+        for entry in self._load().values():
+            self._put(entry)
+
+    def _load(self) -> Dict[str, dict]:
+        if not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                content = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return {}
+        if content.get("version") != MANIFEST_VERSION:
+            return {}
+        return content.get("confs", {})
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "confs": self.entries}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def _put(self, entry: dict):
+        previous = self.entries.get(entry["path"])
+        if previous is not None:
+            self._names.pop((previous["type"], previous["name"]), None)
+        self.entries[entry["path"]] = entry
+        self._names[(entry["type"], entry["name"])] = entry["path"]
+
+    def _remove(self, conf_path: str):
+        entry = self.entries.pop(conf_path)
+        self.contents.pop(conf_path, None)
+        if self._names.get((entry["type"], entry["name"])) == conf_path:
+            del self._names[(entry["type"], entry["name"])]
+        self._dirty = True
+
+    def _conf_paths(self) -> List[str]:
+        conf_paths = []
+        for folder in FOLDER_NAME_TO_CLASS:
+            for sub_root, sub_dirs, sub_files in os.walk(os.path.join(self.output_root_path, folder)):
+                sub_dirs.sort()
+                for f in sorted(sub_files):
+                    if not f.startswith("."):  # ignore hidden files - such as .DS_Store
+                        conf_paths.append(os.path.relpath(os.path.join(sub_root, f), self.output_root_path))
+        return conf_paths
+
+    def refresh(self) -> "RepoManifest":
+        """
+        Brings the entries in sync with the files under the output root, decoding only new or modified confs.
+        """
+        conf_paths = self._conf_paths()
+        for conf_path in set(self.entries) - set(conf_paths):
+            self._remove(conf_path)
+        for conf_path in conf_paths:
+            with open(os.path.join(self.output_root_path, conf_path), "r") as f:
+                content = f.read()
+            content_hash = hash_bytes(content.encode("utf-8"))
+            entry = self.entries.get(conf_path)
+            if entry is not None and entry["hash"] == content_hash:
+                self.contents[conf_path] = content
+                stat = file_stat(os.path.join(self.output_root_path, conf_path))
+                if any(entry.get(key) != value for key, value in stat.items()):
+                    # rewritten with the same content.
+                    entry.update(stat)
+                    self._dirty = True
+                continue
+            obj_class = FOLDER_NAME_TO_CLASS[conf_path.split(os.sep, 1)[0]]
+            try:
+                conf = json2thrift(content, obj_class)
+            except Exception as e:
+                self.logger.warning(f"Skipping unreadable conf {conf_path} in manifest: {e}")
+                conf = None
+            if conf is None or conf.metaData is None or not conf.metaData.name:
+                if entry is not None:
+                    self._remove(conf_path)
+                continue
+            entry = build_entry(conf, conf_path, content_hash, self.log_level)
+            entry.update(file_stat(os.path.join(self.output_root_path, conf_path)))
+            self._put(entry)
+            self.contents[conf_path] = content
+            self._dirty = True
+        return self
+
+    def update(self, conf: object, output_file: str, serialized: str) -> dict:
+        """
+        Records a conf that was just written to output_file with the serialized content.
+
+        returns:
+            the new entry of the conf.
+        """
+        conf_path = os.path.relpath(output_file, self.output_root_path)
+        entry = build_entry(conf, conf_path, hash_bytes(serialized.encode("utf-8")), self.log_level)
+        entry.update(file_stat(output_file))
+        self._put(entry)
+        self.contents[conf_path] = serialized
+        self._dirty = True
+        return entry
+
+    def get(self, conf_path: str) -> Optional[dict]:
+        """
+        returns:
+            the entry of the conf at conf_path, relative to the output root.
+        """
+        return self.entries.get(os.path.normpath(conf_path))
+
+    def find(self, obj_class: type, name: str) -> Optional[dict]:
+        conf_path = self._names.get((obj_class.__name__, name))
+        return self.entries[conf_path] if conf_path else None
+
+    def confs(self, obj_class: type) -> List[dict]:
+        """
+        returns:
+            entries of the given type, ordered by path.
+        """
+        return [self.entries[p] for p in sorted(self.entries) if self.entries[p]["type"] == obj_class.__name__]
+
+    def load_conf(self, entry: dict) -> object:
+        obj_class = FOLDER_NAME_TO_CLASS[entry["path"].split(os.sep, 1)[0]]
+        if entry["path"] in self.contents:
+            return json2thrift(self.contents[entry["path"]], obj_class)
+        return file2thrift(os.path.join(self.output_root_path, entry["path"]), obj_class)
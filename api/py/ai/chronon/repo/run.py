@@ -18,16 +18,30 @@ run.py needs to only depend in python standard library to simplify execution req
 #     limitations under the License.
 
 import argparse
+import concurrent.futures
+import contextlib
+import glob
+import hashlib
+import importlib
 import json
 import logging
-import multiprocessing
+import math
 import os
 import re
 import subprocess
+import sys
+import threading
 import time
+import urllib.error
+import urllib.request
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 ONLINE_ARGS = "--online-jar={online_jar} --online-class={online_class} "
 OFFLINE_ARGS = "--conf-path={conf_path} --end-date={ds} "
 ONLINE_WRITE_ARGS = "--conf-path={conf_path} " + ONLINE_ARGS
@@ -116,6 +130,31 @@ UNIVERSAL_ROUTES = ["info"]
 APP_NAME_TEMPLATE = "chronon_{conf_type}_{mode}_{context}_{name}"
 RENDER_INFO_DEFAULT_SCRIPT = "scripts/render_info.py"
 
+# Checksums maven repositories publish next to artifacts, in order of preference.
+JAR_CHECKSUM_ALGORITHMS = ["sha1", "md5"]
+JAR_CACHE_ENTRY_SUFFIX = ".cache.json"
+# Seconds after a verification of a downloaded jar during which the remote is not checked again.
+DEFAULT_JAR_CHECK_INTERVAL = 3600
+JAR_CONNECT_TIMEOUT = 10
+JAR_CHUNK_SIZE = 1 << 20
+VERSION_CACHE_FILE = "chronon_versions.json"
+# Seconds a version resolved from maven-metadata.xml is reused for.
+DEFAULT_VERSION_CACHE_TTL = 3600
+DEFAULT_BACKFILL_RETRIES = 2
+DEFAULT_BACKFILL_RETRY_BACKOFF = 60
+DEFAULT_BACKFILL_LEDGER_DIR = "/tmp/chronon_backfill_ledgers"
+DEFAULT_BATCH_PARALLELISM = 4
+DEFAULT_FETCH_BATCH_SIZE = 1
+FETCH_LATENCY_PERCENTILES = [50, 90, 99]
+# Suffixes of the output tables of the modes backfilling partitions, after the output table of the conf.
+MODE_TABLE_SUFFIXES = {
+    "backfill": [""],
+    "stats-summary": ["_daily_stats"],
+    "consistency-metrics-compute": ["_consistency"],
+    "log-flattener": ["_logged"],
+    "label-join": ["_labeled"],
+}
+
 
 def retry_decorator(retries=3, backoff=20):
     def wrapper(func):
@@ -146,43 +185,230 @@ def custom_json(conf):
     return {}
 
 
-def check_call(cmd):
+def check_call(cmd, env=None):
     print("Running command: " + cmd)
-    return subprocess.check_call(cmd.split(), bufsize=0)
+    return subprocess.check_call(cmd.split(), bufsize=0, env=env)
 
 
-def check_output(cmd):
+def check_output(cmd, env=None):
     print("Running command: " + cmd)
-    return subprocess.check_output(cmd.split(), stderr=subprocess.STDOUT, bufsize=0).strip()
+    return subprocess.check_output(cmd.split(), stderr=subprocess.STDOUT, bufsize=0, env=env).strip()
+
+
+def _read_url(url, timeout=JAR_CONNECT_TIMEOUT):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+def remote_checksum(url):
+    """
+    Checksum published next to an artifact by maven repositories.
+
+    returns:
+        (hash algorithm, hex digest), None if the repository publishes no checksum for the url.
+    """
+    for algorithm in JAR_CHECKSUM_ALGORITHMS:
+        try:
+            content = _read_url("{}.{}".format(url, algorithm)).decode("utf-8").split()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                continue
+            raise
+        if content:
+            return algorithm, content[0].lower()
+    return None
+
+
+def file_checksum(path, algorithm):
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(JAR_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """
+    Exclusive lock on `path`, held by one process of the host at a time. Not locked where fcntl is unavailable.
+    """
+    with open(path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def jar_cache_dir():
+    return os.environ.get("CHRONON_JAR_CACHE_DIR", "/tmp")
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, obj):
+    """Replaces the file at once, so that concurrent readers see either the previous or the new content."""
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp_path, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def _read_jar_cache_entry(path):
+    return _read_json(path + JAR_CACHE_ENTRY_SUFFIX)
+
+
+def _write_jar_cache_entry(url, path, algorithm, checksum):
+    stat = os.stat(path)
+    entry = {
+        "url": url,
+        "algorithm": algorithm,
+        "checksum": checksum,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "checked_at": time.time(),
+    }
+    _write_json(path + JAR_CACHE_ENTRY_SUFFIX, entry)
+    return entry
+
+
+def _is_unmodified(entry, url, path):
+    """Whether the jar at path is the one the cache entry verified for the url."""
+    if not entry or entry.get("url") != url or not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    return entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+
+
+def _download_verified(url, path, algorithm=None, expected=None):
+    """
+    Downloads url next to path and moves it in place once its checksum matches, so a concurrent reader never sees
+    a partial jar.
+
+    returns:
+        hex digest of the downloaded file.
+    """
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    digest = hashlib.new(algorithm or JAR_CHECKSUM_ALGORITHMS[0])
+    print("Downloading {} to {}".format(url, path))
+    try:
+        with urllib.request.urlopen(url, timeout=JAR_CONNECT_TIMEOUT) as response, open(tmp_path, "wb") as f:
+            for chunk in iter(lambda: response.read(JAR_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                f.write(chunk)
+        if expected is not None and digest.hexdigest() != expected:
+            raise ValueError(
+                "Checksum mismatch for {}: expected {} {}, got {}".format(url, algorithm, expected, digest.hexdigest())
+            )
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return digest.hexdigest()
 
 
 def download_only_once(url, path, skip_download=False):
+    """
+    Makes sure the jar at path is the one published at url, downloading it only if it is missing or differs.
+
+    The jar is verified against the checksum the repository publishes next to it, and the verification is
+    recorded next to the jar. Within CHRONON_JAR_CHECK_INTERVAL seconds of the last verification the remote is not
+    contacted at all. Tasks running on the same host take turns through a lock file, so only one of them downloads.
+    """
     if skip_download:
         print("Skipping download of " + path)
         return
-    should_download = True
     path = path.strip()
-    if os.path.exists(path):
-        content_output = check_output("curl -sI " + url).decode("utf-8")
-        content_length = re.search("(content-length:\\s)(\\d+)", content_output.lower())
-        remote_size = int(content_length.group().split()[-1])
-        local_size = int(check_output("wc -c " + path).split()[0])
-        print(
-            """Files sizes of {url} vs. {path}
-    Remote size: {remote_size}
-    Local size : {local_size}""".format(
-                **locals()
-            )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    check_interval = float(os.environ.get("CHRONON_JAR_CHECK_INTERVAL", DEFAULT_JAR_CHECK_INTERVAL))
+    with file_lock(path + ".lock"):
+        entry = _read_jar_cache_entry(path)
+        unmodified = _is_unmodified(entry, url, path)
+        if unmodified and time.time() - entry["checked_at"] < check_interval:
+            print("Using jar verified {:.0f}s ago at: {}".format(time.time() - entry["checked_at"], path))
+            return
+        try:
+            checksum = remote_checksum(url)
+        except (urllib.error.URLError, OSError) as e:
+            if unmodified:
+                print("Could not reach {} ({}). Using the jar verified before at: {}".format(url, e, path))
+                return
+            raise
+        if checksum is None:
+            print("No checksum published for {}. Downloading without verification..".format(url))
+            _write_jar_cache_entry(url, path, JAR_CHECKSUM_ALGORITHMS[0], _download_verified(url, path))
+            return
+        algorithm, expected = checksum
+        if unmodified and entry.get("algorithm") == algorithm:
+            local = entry["checksum"]
+        elif os.path.exists(path):
+            local = file_checksum(path, algorithm)
+        else:
+            print("No file at: " + path + ". Downloading..")
+            local = None
+        if local == expected:
+            print("Checksum {} {} matches the jar at: {}".format(algorithm, expected, path))
+        else:
+            if local is not None:
+                print("Different file from remote at local: " + path + ". Re-downloading..")
+            _download_verified(url, path, algorithm, expected)
+        _write_jar_cache_entry(url, path, algorithm, expected)
+
+
+def latest_version(metadata_content, release_tag=None):
+    """Latest version listed by a maven-metadata.xml, restricted to the versions of the release tag if set."""
+    meta_tree = ET.fromstring(metadata_content)
+    versions = [
+        node.text
+        for node in meta_tree.findall("./versioning/versions/")
+        if re.search(
+            r"^\d+\.\d+\.\d+{}$".format("\_{}\d*".format(release_tag) if release_tag else ""),
+            node.text,
         )
-        if local_size == remote_size:
-            print("Sizes match. Assuming its already downloaded.")
-            should_download = False
-        if should_download:
-            print("Different file from remote at local: " + path + ". Re-downloading..")
-            check_call("curl {} -o {} --connect-timeout 10".format(url, path))
-    else:
-        print("No file at: " + path + ". Downloading..")
-        check_call("curl {} -o {} --connect-timeout 10".format(url, path))
+    ]
+    return versions[-1]
+
+
+def resolve_latest_version(base_url, release_tag=None):
+    """
+    Latest version of the artifact at base_url, which carries the maven prefix, jar type and scala version.
+
+    Resolved versions are cached for CHRONON_VERSION_CACHE_TTL seconds, so that parallel invocations fetch
+    maven-metadata.xml once. A cached version past its TTL is still used if the repository can't be reached.
+    """
+    ttl = float(os.environ.get("CHRONON_VERSION_CACHE_TTL", DEFAULT_VERSION_CACHE_TTL))
+    os.makedirs(jar_cache_dir(), exist_ok=True)
+    cache_path = os.path.join(jar_cache_dir(), VERSION_CACHE_FILE)
+    key = "{}|{}".format(base_url, release_tag or "")
+    with file_lock(cache_path + ".lock"):
+        cache = _read_json(cache_path) or {}
+        entry = cache.get(key)
+        age = time.time() - entry["resolved_at"] if entry else None
+        if entry and age < ttl:
+            print("Using version {} (source: cache, resolved {:.0f}s ago)".format(entry["version"], age))
+            return entry["version"]
+        try:
+            version = latest_version(_read_url("{}/maven-metadata.xml".format(base_url)), release_tag)
+        except (urllib.error.URLError, OSError, ET.ParseError) as e:
+            if entry is None:
+                raise
+            print(
+                "Could not resolve the latest version from {} ({}). Using version {} (source: cache, resolved "
+                "{:.0f}s ago)".format(base_url, e, entry["version"], age)
+            )
+            return entry["version"]
+        cache[key] = {"version": version, "resolved_at": time.time()}
+        _write_json(cache_path, cache)
+    print("Using version {} (source: network, {}/maven-metadata.xml)".format(version, base_url))
+    return version
 
 
 @retry_decorator(retries=3, backoff=50)
@@ -207,31 +433,31 @@ def download_jar(
         if version == "latest":
             version = None
         if version is None:
-            metadata_content = check_output("curl -s {}/maven-metadata.xml".format(base_url))
-            meta_tree = ET.fromstring(metadata_content)
-            versions = [
-                node.text
-                for node in meta_tree.findall("./versioning/versions/")
-                if re.search(
-                    r"^\d+\.\d+\.\d+{}$".format("\_{}\d*".format(release_tag) if release_tag else ""),
-                    node.text,
-                )
-            ]
-            version = versions[-1]
+            version = resolve_latest_version(base_url, release_tag)
+        else:
+            print("Using version {} (source: override)".format(version))
         jar_url = "{base_url}/{version}/spark_{jar_type}_{scala_version}-{version}-assembly.jar".format(
             base_url=base_url,
             version=version,
             scala_version=scala_version,
             jar_type=jar_type,
         )
-        jar_path = os.path.join("/tmp", jar_url.split("/")[-1])
+        # the jar name carries its type, scala version and version.
+        jar_path = os.path.join(jar_cache_dir(), jar_url.split("/")[-1])
         download_only_once(jar_url, jar_path, skip_download)
     return jar_path
 
 
 def set_runtime_env(args):
     """
-    Setting the runtime environment variables.
+    Sets the runtime environment variables of `get_runtime_env` in os.environ.
+    """
+    os.environ.update(get_runtime_env(args))
+
+
+def get_runtime_env(args, environ=None, teams_json=None, verbose=True):
+    """
+    Getting the runtime environment variables.
     These are extracted from the common env, the team env and the common env.
     In order to use the environment variables defined in the configs as overrides for the args in the cli this method
     needs to be run before the runner and jar downloads.
@@ -244,7 +470,14 @@ def set_runtime_env(args):
         - team's prod environment for each mode set on teams.json
         - default team environment per context and mode set on teams.json
         - Common Environment set in teams.json
+
+    environ: the existing environment variables, default to os.environ, which is not modified.
+    teams_json: the parsed teams.json of the repo, read from the repo if not given.
+
+    returns:
+        the variables to set, which are not in the existing environment.
     """
+    environ = os.environ if environ is None else environ
     environment = {
         "common_env": {},
         "conf_env": {},
@@ -260,9 +493,10 @@ def set_runtime_env(args):
         effective_mode = "streaming"
     if args.repo:
         teams_file = os.path.join(args.repo, "teams.json")
-        if os.path.exists(teams_file):
+        if teams_json is None and os.path.exists(teams_file):
             with open(teams_file, "r") as infile:
                 teams_json = json.load(infile)
+        if teams_json is not None:
             environment["common_env"] = teams_json.get("default", {}).get("common_env", {})
             if args.conf and effective_mode:
                 try:
@@ -337,30 +571,42 @@ def set_runtime_env(args):
         "common_env",
         "cli_args",
     ]
-    print("Setting env variables:")
-    for key in os.environ:
-        if any([key in environment[set_key] for set_key in order]):
-            print(f"From <environment> found {key}={os.environ[key]}")
+    if verbose:
+        print("Setting env variables:")
+        for key in environ:
+            if any([key in environment[set_key] for set_key in order]):
+                print(f"From <environment> found {key}={environ[key]}")
+    runtime_env = {}
     for set_key in order:
         for key, value in environment[set_key].items():
-            if key not in os.environ and value is not None:
-                print(f"From <{set_key}> setting {key}={value}")
-                os.environ[key] = value
+            if key not in environ and key not in runtime_env and value is not None:
+                if verbose:
+                    print(f"From <{set_key}> setting {key}={value}")
+                runtime_env[key] = value
+    return runtime_env
 
 
 class Runner:
-    def __init__(self, args, jar_path):
+    def __init__(self, args, jar_path, env=None):
+        """
+        env: environment variables of the commands, instead of os.environ, which is then left unchanged.
+        """
+        self.env = env
         self.repo = args.repo
         self.conf = args.conf
         self.sub_help = args.sub_help
         self.mode = args.mode
         self.online_jar = args.online_jar
         valid_jar = args.online_jar and os.path.exists(args.online_jar)
+        self.fetch_server = getattr(args, "fetch_server", False)
+        self.fetch_requests = getattr(args, "fetch_requests", None)
+        self.fetch_batch_size = int(getattr(args, "fetch_batch_size", None) or DEFAULT_FETCH_BATCH_SIZE)
+        self.local_kv = getattr(args, "local_kv", None)
         # fetch online jar if necessary
-        if (self.mode in ONLINE_MODES) and (not args.sub_help) and not valid_jar:
+        if (self.mode in ONLINE_MODES) and (not args.sub_help) and not valid_jar and not self.local_kv:
             print("Downloading online_jar")
-            self.online_jar = check_output("{}".format(args.online_jar_fetch)).decode("utf-8")
-            os.environ["CHRONON_ONLINE_JAR"] = self.online_jar
+            self.online_jar = check_output("{}".format(args.online_jar_fetch), env=env).decode("utf-8")
+            (os.environ if env is None else env)["CHRONON_ONLINE_JAR"] = self.online_jar
             print("Downloaded jar to {}".format(self.online_jar))
 
         if self.conf:
@@ -382,6 +628,18 @@ class Runner:
         self.ds = args.end_ds if hasattr(args, "end_ds") and args.end_ds else args.ds
         self.start_ds = args.start_ds if hasattr(args, "start_ds") and args.start_ds else None
         self.parallelism = int(args.parallelism) if hasattr(args, "parallelism") and args.parallelism else 1
+        self.chunk_days = int(args.chunk_days) if getattr(args, "chunk_days", None) else None
+        self.retries = int(args.retries) if getattr(args, "retries", None) is not None else DEFAULT_BACKFILL_RETRIES
+        self.retry_backoff = (
+            float(args.retry_backoff)
+            if getattr(args, "retry_backoff", None) is not None
+            else DEFAULT_BACKFILL_RETRY_BACKOFF
+        )
+        self.ledger = getattr(args, "ledger", None)
+        self.missing_only = getattr(args, "missing_only", False)
+        self.partition_provider = getattr(args, "partition_provider", None) or "local"
+        self.weighted_split = getattr(args, "weighted_split", False)
+        self.volume_estimates = getattr(args, "volume_estimates", None) or "local"
         self.jar_path = jar_path
         self.args = args.args if args.args else ""
         self.online_class = args.online_class
@@ -399,6 +657,9 @@ class Runner:
 
     def run(self):
         command_list = []
+        if self.mode == "fetch" and self.fetch_server and not self.sub_help:
+            self._run_fetch_server()
+            return
         if self.mode == "info":
             command_list.append(
                 "python3 {script} --conf {conf} --ds {ds} --repo {repo}".format(
@@ -419,7 +680,7 @@ class Runner:
                 print("Checking to see if a streaming job by the name {} already exists".format(self.app_name))
                 running_apps = []
                 try:
-                    running_apps = check_output("{}".format(self.list_apps_cmd)).decode("utf-8").split("\n")
+                    running_apps = self._check_output("{}".format(self.list_apps_cmd)).decode("utf-8").split("\n")
                 except subprocess.CalledProcessError as e:
                     print("Failed to retrieve running apps. Error:")
                     print(e.output.decode("utf-8"))
@@ -448,53 +709,172 @@ class Runner:
                         assert len(filtered_apps) == 1, "More than one found, please kill them all"
                         print("All good. No need to start a new app.")
                         return
-                command = (
-                    "bash {script} --class ai.chronon.spark.Driver {jar} {subcommand} {args} {additional_args}"
-                ).format(
-                    script=self.spark_submit,
-                    jar=self.jar_path,
-                    subcommand=ROUTES[self.conf_type][self.mode],
-                    args=self._gen_final_args(),
-                    additional_args=os.environ.get("CHRONON_CONFIG_ADDITIONAL_ARGS", ""),
-                )
-                command_list.append(command)
+                command_list.append(self._spark_command(self._gen_final_args()))
             else:
                 # offline mode
-                if self.parallelism > 1:
+                if self.chunk_days or self.parallelism > 1 or self.missing_only:
                     assert self.start_ds is not None and self.ds is not None, (
-                        "To use parallelism, please specify --start-ds and --end-ds to "
+                        "To use parallelism, chunks or missing partitions, please specify --start-ds and --end-ds to "
                         "break down into multiple backfill jobs"
                     )
-                    date_ranges = split_date_range(self.start_ds, self.ds, self.parallelism)
-                    for start_ds, end_ds in date_ranges:
-                        command = (
-                            "bash {script} --class ai.chronon.spark.Driver {jar} {subcommand} {args} {additional_args}"
-                        ).format(
-                            script=self.spark_submit,
-                            jar=self.jar_path,
-                            subcommand=ROUTES[self.conf_type][self.mode],
-                            args=self._gen_final_args(start_ds=start_ds, end_ds=end_ds),
-                            additional_args=os.environ.get("CHRONON_CONFIG_ADDITIONAL_ARGS", ""),
-                        )
-                        command_list.append(command)
-                else:
-                    command = (
-                        "bash {script} --class ai.chronon.spark.Driver {jar} {subcommand} {args} {additional_args}"
-                    ).format(
-                        script=self.spark_submit,
-                        jar=self.jar_path,
-                        subcommand=ROUTES[self.conf_type][self.mode],
-                        args=self._gen_final_args(self.start_ds),
-                        additional_args=os.environ.get("CHRONON_CONFIG_ADDITIONAL_ARGS", ""),
+                    assert not (self.weighted_split and (self.chunk_days or self.missing_only)), (
+                        "--weighted-split splits the range by --parallelism, it can't be combined with --chunk-days "
+                        "or --missing-only"
                     )
-                    command_list.append(command)
-        if len(command_list) > 1:
-            # parallel backfill mode
-            with multiprocessing.Pool(processes=int(self.parallelism)) as pool:
-                logging.info("Running args list {} with pool size {}".format(command_list, self.parallelism))
-                pool.map(check_call, command_list)
-        elif len(command_list) == 1:
-            check_call(command_list[0])
+                    self._run_range_backfill()
+                    return
+                command_list.append(self._spark_command(self._gen_final_args(self.start_ds)))
+        if len(command_list) == 1:
+            self._check_call(command_list[0])
+
+    def _fetch_server_command(self):
+        if self.local_kv:
+            return "{python} {script} --serve-local-kv {kv} {conf} {args}".format(
+                python=sys.executable,
+                script=os.path.abspath(__file__),
+                kv=self.local_kv,
+                conf="--conf " + self.conf if self.conf else "",
+                args=self.args,
+            )
+        return "java -cp {jar} ai.chronon.spark.Driver fetch {args} --serve".format(
+            jar=self.jar_path, args=self._gen_final_args()
+        )
+
+    def _run_fetch_server(self):
+        """
+        Fetches the keys of the request lines through a single fetch process, printing a json line per response
+        then the latency percentiles.
+        """
+        requests = sys.stdin if self.fetch_requests in (None, "-") else open(self.fetch_requests)
+        try:
+            with FetchServer(self._fetch_server_command(), env=self.env) as server:
+                for keys in key_batches(requests, self.fetch_batch_size):
+                    print(json.dumps(server.fetch(keys)), flush=True)
+        finally:
+            if requests is not sys.stdin:
+                requests.close()
+        print(
+            "Fetched {} keys in {} requests, {} with errors. Latency ms: {}".format(
+                server.keys,
+                len(server.latencies),
+                server.errors,
+                ", ".join(
+                    "{} {:.1f}".format(name, value) for name, value in latency_percentiles(server.latencies).items()
+                ),
+            )
+        )
+
+    def _getenv(self, key, default=None):
+        return (os.environ if self.env is None else self.env).get(key, default)
+
+    def _check_call(self, cmd):
+        return check_call(cmd) if self.env is None else check_call(cmd, env=self.env)
+
+    def _check_output(self, cmd):
+        return check_output(cmd) if self.env is None else check_output(cmd, env=self.env)
+
+    def _spark_command(self, args):
+        return ("bash {script} --class ai.chronon.spark.Driver {jar} {subcommand} {args} {additional_args}").format(
+            script=self.spark_submit,
+            jar=self.jar_path,
+            subcommand=ROUTES[self.conf_type][self.mode],
+            args=args,
+            additional_args=self._getenv("CHRONON_CONFIG_ADDITIONAL_ARGS", ""),
+        )
+
+    def _ledger_path(self):
+        if self.ledger:
+            return self.ledger
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", "{}.{}".format(self.conf, self.mode))
+        return os.path.join(self._getenv("CHRONON_BACKFILL_LEDGER_DIR", DEFAULT_BACKFILL_LEDGER_DIR), name + ".jsonl")
+
+    def _missing_days(self, days):
+        """The days of the range missing from an output table of the conf, for the provider listing partitions."""
+        with open(os.path.join(self.repo, self.conf)) as conf_file:
+            tables = mode_output_tables(json.load(conf_file), self.mode)
+        provider = load_partition_provider(self.partition_provider, self.env)
+        existing = None
+        for table in tables:
+            partitions = set(provider.partitions(table))
+            existing = partitions if existing is None else existing & partitions
+        missing = set(days) - (existing or set())
+        print(
+            "{} out of {} days missing from {} from {} to {}".format(
+                len(missing), len(days), ", ".join(tables), self.start_ds, self.ds
+            )
+        )
+        return missing
+
+    def _weighted_date_ranges(self):
+        """Splits the range in parallelism chunks of about the same input volume, as estimated by the provider."""
+        with open(os.path.join(self.repo, self.conf)) as conf_file:
+            tables = input_tables(json.load(conf_file))
+        days = days_in_range(self.start_ds, self.ds)
+        weights = estimate_day_volumes(tables, days, load_volume_provider(self.volume_estimates, self.env))
+        date_ranges = split_date_range_weighted(days, weights, self.parallelism)
+        total = sum(weights) or 1
+        print("Expected load of the chunks, from the volume of {}:".format(", ".join(tables) or "no input table"))
+        position = 0
+        for start_ds, end_ds in date_ranges:
+            size = days.index(end_ds) - days.index(start_ds) + 1
+            load = sum(weights[position : position + size])
+            position += size
+            print(
+                "    {} to {}: {:>4} days, load {:>16.0f} ({:5.1f}%)".format(
+                    start_ds, end_ds, size, load, 100 * load / total
+                )
+            )
+        return date_ranges
+
+    def _run_range_backfill(self):
+        """
+        Backfills the range from start_ds to ds in chunks of chunk_days, or in parallelism equal chunks without
+        chunk_days. With chunk_days the completed chunks are recorded in a ledger and skipped by the next runs. With
+        missing_only the days whose output partitions exist are skipped, and the ranges of missing days are
+        backfilled each on its own, or in chunks of chunk_days.
+        """
+        ledger = None
+        if self.chunk_days or self.missing_only:
+            days = set(days_in_range(self.start_ds, self.ds))
+            if self.missing_only:
+                days = self._missing_days(days)
+            if self.chunk_days:
+                # the arguments of the chunks but their dates, and not the jar, so a new version resumes the backfill.
+                fingerprint = " ".join(
+                    [
+                        ROUTES[self.conf_type][self.mode],
+                        self._gen_final_args(start_ds="{start_ds}", end_ds="{end_ds}"),
+                        self._getenv("CHRONON_CONFIG_ADDITIONAL_ARGS", ""),
+                    ]
+                )
+                ledger = BackfillLedger(self._ledger_path(), fingerprint)
+                days -= ledger.completed_days()
+            date_ranges = [
+                chunk
+                for start_ds, end_ds in collapse_days(days)
+                for chunk in (
+                    split_date_range_by_days(start_ds, end_ds, self.chunk_days)
+                    if self.chunk_days
+                    else [(start_ds, end_ds)]
+                )
+            ]
+            print(
+                "{} ranges to backfill from {} to {}{}".format(
+                    len(date_ranges),
+                    self.start_ds,
+                    self.ds,
+                    ", ledger: {}".format(ledger.path) if ledger is not None else "",
+                )
+            )
+        elif self.weighted_split:
+            date_ranges = self._weighted_date_ranges()
+        else:
+            date_ranges = split_date_range(self.start_ds, self.ds, self.parallelism)
+        commands = [
+            (start_ds, end_ds, self._spark_command(self._gen_final_args(start_ds=start_ds, end_ds=end_ds)))
+            for start_ds, end_ds in date_ranges
+        ]
+        run_backfill_chunks(commands, self.parallelism, self.retries, self.retry_backoff, ledger, self._check_call)
 
     def _gen_final_args(self, start_ds=None, end_ds=None):
         base_args = MODE_ARGS[self.mode].format(
@@ -532,31 +912,599 @@ def split_date_range(start_date, end_date, parallelism):
     return date_ranges
 
 
-def set_defaults(parser):
-    """Set default values based on environment"""
-    chronon_repo_path = os.environ.get("CHRONON_REPO_PATH", ".")
+def days_in_range(start_date, end_date):
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+
+
+def collapse_days(days):
+    """Contiguous (start, end) date ranges covering the days."""
+    ranges = []
+    for day in sorted(days):
+        if ranges:
+            previous_end = datetime.strptime(ranges[-1][1], "%Y-%m-%d")
+            if datetime.strptime(day, "%Y-%m-%d") - previous_end == timedelta(days=1):
+                ranges[-1] = (ranges[-1][0], day)
+                continue
+        ranges.append((day, day))
+    return ranges
+
+
+def split_date_range_by_days(start_date, end_date, step_days):
+    """Consecutive date ranges of step_days days, the last one possibly shorter."""
+    days = days_in_range(start_date, end_date)
+    if not days:
+        raise ValueError("Start date should be earlier than end date")
+    return [(days[i], days[min(i + step_days, len(days)) - 1]) for i in range(0, len(days), step_days)]
+
+
+def mode_output_tables(conf, mode):
+    """
+    Tables a mode writes the partitions of for a materialized conf, named like `utils.get_modes_tables`.
+    """
+    if mode not in MODE_TABLE_SUFFIXES:
+        raise ValueError(
+            "Missing partitions can't be planned for mode {}, only for {}".format(mode, ", ".join(MODE_TABLE_SUFFIXES))
+        )
+    meta_data = conf["metaData"]
+    if not meta_data.get("outputNamespace"):
+        # a table without its namespace has no partitions, every day would be taken for missing.
+        raise ValueError(
+            "Missing partitions can't be planned for {}, it has no outputNamespace".format(meta_data["name"])
+        )
+    table_name = re.sub("[^a-zA-Z0-9_]", "_", meta_data["name"])
+    return ["{}.{}{}".format(meta_data["outputNamespace"], table_name, suffix) for suffix in MODE_TABLE_SUFFIXES[mode]]
+
+
+class LocalPartitionProvider:
+    """
+    Partitions of the tables of a local warehouse: the `<partition column>=<ds>` sub directories of
+    `<root>/<namespace>.db/<table>`, as spark lays out its local warehouse, or the lines of a
+    `<root>/<namespace>.<table>.partitions` file. The volume of a partition is the size of its files.
+    """
+
+    def __init__(self, root=None, partition_column=None, environ=None):
+        """
+        environ: environment variables the defaults are read from, default to os.environ.
+        """
+        environ = os.environ if environ is None else environ
+        self.root = root or environ.get("CHRONON_WAREHOUSE_PATH", "spark-warehouse")
+        self.partition_column = partition_column or environ.get("PARTITION_COLUMN", "ds")
+
+    def partitions(self, table):
+        namespace, table_name = table.split(".", 1)
+        listing = os.path.join(self.root, "{}.partitions".format(table))
+        if os.path.isfile(listing):
+            with open(listing) as f:
+                return [line.strip() for line in f if line.strip()]
+        table_path = os.path.join(self.root, "{}.db".format(namespace), table_name)
+        prefix = self.partition_column + "="
+        if not os.path.isdir(table_path):
+            return []
+        # other partition columns, like hr, are nested under ds.
+        return [d[len(prefix):] for d in os.listdir(table_path) if d.startswith(prefix)]
+
+    def day_volumes(self, table):
+        namespace, table_name = table.split(".", 1)
+        table_path = os.path.join(self.root, "{}.db".format(namespace), table_name)
+        volumes = {}
+        for ds in self.partitions(table):
+            size = 0
+            for sub_root, _, sub_files in os.walk(os.path.join(table_path, "{}={}".format(self.partition_column, ds))):
+                size += sum(os.path.getsize(os.path.join(sub_root, f)) for f in sub_files)
+            volumes[ds] = size
+        return volumes
+
+
+def load_partition_provider(spec, environ=None):
+    """
+    Provider of the existing partitions of a table, with a `partitions(table)` method returning their ds values.
+
+    spec: `local` or `local:<warehouse path>` for `LocalPartitionProvider`, or `<module>:<callable>` returning
+        a provider, e.g. a client of the metastore.
+    environ: environment variables of the local provider, default to os.environ.
+    """
+    name, _, argument = spec.partition(":")
+    if name == "local":
+        return LocalPartitionProvider(argument or None, environ=environ)
+    if not argument:
+        raise ValueError("Invalid partition provider {}, expected local or <module>:<callable>".format(spec))
+    return getattr(importlib.import_module(name), argument)()
+
+
+def input_tables(conf):
+    """Tables a conf depends on, from the specs of its materialized dependencies."""
+    tables = []
+    for dependency in conf["metaData"].get("dependencies") or []:
+        spec = json.loads(dependency)["spec"] if dependency.startswith("{") else dependency
+        table = spec.split("/")[0]
+        if table not in tables:
+            tables.append(table)
+    return tables
+
+
+class StatsVolumeProvider:
+    """
+    Row counts of the partitions of tables, from a stand-in of a stats table: `<root>/<table>.stats.jsonl` files of
+    one {"ds": ..., "row_count": ...} row per partition.
+    """
+
+    def __init__(self, root=None, environ=None):
+        environ = os.environ if environ is None else environ
+        self.root = root or environ.get("CHRONON_WAREHOUSE_PATH", "spark-warehouse")
+
+    def day_volumes(self, table):
+        path = os.path.join(self.root, "{}.stats.jsonl".format(table))
+        if not os.path.isfile(path):
+            return {}
+        volumes = {}
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    volumes[row["ds"]] = row["row_count"]
+        return volumes
+
+
+class JsonVolumeProvider:
+    """
+    Volumes given in a json file, either {ds: volume} for all the tables or {table: {ds: volume}}.
+    """
+
+    def __init__(self, path):
+        with open(path) as f:
+            self.volumes = json.load(f)
+
+    def day_volumes(self, table):
+        if all(isinstance(value, dict) for value in self.volumes.values()):
+            return self.volumes.get(table, {})
+        return self.volumes
+
+
+def load_volume_provider(spec, environ=None):
+    """
+    Provider of the volume of each day of a table, with a `day_volumes(table)` method returning {ds: volume}.
+
+    spec: `local` or `local:<warehouse path>` for the size of the partition files of `LocalPartitionProvider`,
+        `stats` or `stats:<path>` for `StatsVolumeProvider`, `json:<path>` for `JsonVolumeProvider`, or
+        `<module>:<callable>` returning a provider.
+    environ: environment variables of the local and stats providers, default to os.environ.
+    """
+    name, _, argument = spec.partition(":")
+    if name == "stats":
+        return StatsVolumeProvider(argument or None, environ=environ)
+    if name == "json":
+        return JsonVolumeProvider(argument)
+    return load_partition_provider(spec, environ)
+
+
+def estimate_day_volumes(tables, days, provider):
+    """
+    Volume of each day, summed over the tables. Days without an estimate weigh as the average day with one.
+    """
+    volumes = [0.0] * len(days)
+    known = [False] * len(days)
+    for table in tables:
+        day_volumes = provider.day_volumes(table)
+        for i, day in enumerate(days):
+            if day in day_volumes:
+                volumes[i] += float(day_volumes[day])
+                known[i] = True
+    known_volumes = [volume for volume, is_known in zip(volumes, known) if is_known]
+    default = sum(known_volumes) / len(known_volumes) if known_volumes else 1.0
+    return [volume if is_known else default for volume, is_known in zip(volumes, known)]
+
+
+def split_date_range_weighted(days, weights, parallelism):
+    """
+    Splits consecutive days in parallelism contiguous ranges, minimizing the largest total weight of a range.
+    """
+    if parallelism > len(days):
+        raise ValueError("Parallelism should be less than or equal to total days")
+
+    def pack(capacity):
+        # start index of the ranges packing the days greedily under the capacity.
+        starts, load = [0], 0.0
+        for i, weight in enumerate(weights):
+            if load + weight > capacity and i > starts[-1]:
+                starts.append(i)
+                load = 0.0
+            load += weight
+        return starts
+
+    low, high = max(weights), float(sum(weights))
+    for _ in range(64):
+        middle = (low + high) / 2
+        if len(pack(middle)) <= parallelism:
+            high = middle
+        else:
+            low = middle
+    starts = pack(high)
+    # uses all the parallelism by halving the heaviest ranges, which doesn't increase the largest weight.
+    while len(starts) < parallelism:
+        ends = starts[1:] + [len(days)]
+        _, start, end = max((sum(weights[b:e]), b, e) for b, e in zip(starts, ends) if e - b > 1)
+        split = min(range(start + 1, end), key=lambda k: max(sum(weights[start:k]), sum(weights[k:end])))
+        starts = sorted(starts + [split])
+    return [(days[b], days[e - 1]) for b, e in zip(starts, starts[1:] + [len(days)])]
+
+
+class BackfillLedger:
+    """
+    Date ranges completed by a range backfill, appended as json lines to a local file as the chunks succeed.
+
+    Entries are tagged with a fingerprint of the backfill command, so that a backfill with other arguments doesn't
+    consider the ranges of this one complete.
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+        self._lock = threading.Lock()
+
+    def completed_days(self):
+        days = set()
+        if not os.path.exists(self.path):
+            return days
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a line partially written by an interrupted run.
+                    continue
+                if entry.get("fingerprint") == self.fingerprint:
+                    days.update(days_in_range(entry["start_ds"], entry["end_ds"]))
+        return days
+
+    def record(self, start_ds, end_ds):
+        entry = {"fingerprint": self.fingerprint, "start_ds": start_ds, "end_ds": end_ds, "completed_at": time.time()}
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def run_backfill_chunks(commands, concurrency, retries, backoff, ledger=None, call=None):
+    """
+    Runs the backfill command of each chunk, at most `concurrency` at a time, from a queue. A failing chunk is
+    retried after backoff, 2 * backoff, ... seconds without holding back the other chunks. Completed chunks are
+    recorded in the ledger.
+
+    commands: list of (start_ds, end_ds, command).
+    call: runs a command, default to check_call.
+    raises: RuntimeError listing the chunks still failing after the retries, once all the chunks ran.
+    """
+
+    def run_chunk(start_ds, end_ds, command):
+        for attempt in range(retries + 1):
+            try:
+                (call or check_call)(command)
+                break
+            except subprocess.CalledProcessError as e:
+                if attempt == retries:
+                    raise
+                sleep_time = backoff * 2**attempt
+                print(
+                    "Chunk {} to {} failed with exit code {}. Retry {} out of {} in {}s".format(
+                        start_ds, end_ds, e.returncode, attempt + 1, retries, sleep_time
+                    )
+                )
+                time.sleep(sleep_time)
+        if ledger is not None:
+            ledger.record(start_ds, end_ds)
+
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(run_chunk, *command): command for command in commands}
+        for future in concurrent.futures.as_completed(futures):
+            start_ds, end_ds, _ = futures[future]
+            if future.exception() is not None:
+                failed.append((start_ds, end_ds))
+                print("Chunk {} to {} failed: {}".format(start_ds, end_ds, future.exception()))
+            else:
+                print("Chunk {} to {} completed".format(start_ds, end_ds))
+    print("Backfilled {} out of {} chunks".format(len(commands) - len(failed), len(commands)))
+    if failed:
+        message = "Backfill failed for the ranges {}.".format(
+            ", ".join("{} to {}".format(*date_range) for date_range in sorted(failed))
+        )
+        if ledger is not None:
+            message += " Run again to backfill only the missing ranges."
+        raise RuntimeError(message)
+
+
+class FetchServer:
+    """
+    A long lived fetch process, answering each json request line written to its stdin with a json line on its stdout,
+    like `Driver fetch --serve` or `serve_local_kv`. Other lines of its stdout, like logs, are passed to stderr.
+
+    A request is {"id": ..., "keys": [<key map>, ...]} with optional "name", "type" and "atMillis", a response is
+    {"id": ..., "responses": [{"keys": ..., "values": ...}, ...], "latencyMs": ...}, or has an "error".
+    """
+
+    def __init__(self, command, env=None):
+        print("Running command: " + command)
+        self.process = subprocess.Popen(
+            command.split(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+            universal_newlines=True,
+            bufsize=1,
+        )
+        # round trip milliseconds of each request.
+        self.latencies = []
+        self.keys = 0
+        self.errors = 0
+        self._last_id = 0
+
+    def fetch(self, keys, name=None, fetch_type=None, at_millis=None):
+        """
+        Fetches the values of a batch of key maps in a single request.
+
+        returns: the response of the fetch process.
+        """
+        self._last_id += 1
+        request = {"id": self._last_id, "keys": keys}
+        for field, value in [("name", name), ("type", fetch_type), ("atMillis", at_millis)]:
+            if value is not None:
+                request[field] = value
+        start = time.time()
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError("The fetch process exited with code {}".format(self.process.wait()))
+            try:
+                response = json.loads(line)
+            except ValueError:
+                response = None
+            if isinstance(response, dict) and response.get("id") == request["id"]:
+                break
+            sys.stderr.write(line)
+        self.latencies.append((time.time() - start) * 1000)
+        self.keys += len(keys)
+        if response.get("error") or any(r.get("error") for r in response.get("responses", [])):
+            self.errors += 1
+        return response
+
+    def close(self, timeout=10):
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def latency_percentiles(latencies, percentiles=FETCH_LATENCY_PERCENTILES):
+    """Nearest rank percentiles of the latencies, by name like p50, with the max."""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    result = {"p{}".format(p): ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] for p in percentiles}
+    result["max"] = ordered[-1]
+    return result
+
+
+def key_batches(lines, batch_size):
+    """
+    Batches of key maps from json lines. Lines of a key map are batched by batch_size, a line of a list of key maps
+    is a batch of its own.
+    """
+    batch = []
+    for line in lines:
+        if not line.strip():
+            continue
+        keys = json.loads(line)
+        if isinstance(keys, list):
+            if batch:
+                yield batch
+                batch = []
+            yield keys
+            continue
+        batch.append(keys)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _kv_key(keys):
+    # key values are compared as strings, as they may be typed differently in the file and in the requests.
+    return json.dumps({key: str(value) for key, value in keys.items()}, sort_keys=True)
+
+
+def serve_local_kv(path, infile, outfile, name=None):
+    """
+    Answers fetch requests like `Driver fetch --serve` from a json file held in memory, to try out fetches without
+    an online store. The file maps join or group_by names to lists of {"keys": {...}, "values": {...}}. Keys
+    missing from the file get null values.
+
+    name: of the requests without one.
+    """
+    with open(path) as f:
+        store = {
+            conf_name: {_kv_key(row["keys"]): row["values"] for row in rows} for conf_name, rows in json.load(f).items()
+        }
+    for line in infile:
+        if not line.strip():
+            continue
+        start = time.time()
+        response = {}
+        try:
+            request = json.loads(line)
+            response["id"] = request.get("id")
+            request_name = request.get("name", name)
+            if request_name not in store:
+                raise KeyError("No data for {}".format(request_name))
+            values = store[request_name]
+            response["responses"] = [{"keys": keys, "values": values.get(_kv_key(keys))} for keys in request["keys"]]
+        except Exception as e:
+            response["error"] = "{}: {}".format(type(e).__name__, e)
+        response["latencyMs"] = (time.time() - start) * 1000
+        outfile.write(json.dumps(response) + "\n")
+        outfile.flush()
+
+
+def set_defaults(parser, environ=None):
+    """Set default values based on environment, default to os.environ"""
+    environ = os.environ if environ is None else environ
+    chronon_repo_path = environ.get("CHRONON_REPO_PATH", ".")
     today = datetime.today().strftime("%Y-%m-%d")
     parser.set_defaults(
         mode="backfill",
         ds=today,
-        app_name=os.environ.get("APP_NAME"),
-        online_jar=os.environ.get("CHRONON_ONLINE_JAR"),
+        app_name=environ.get("APP_NAME"),
+        online_jar=environ.get("CHRONON_ONLINE_JAR"),
         repo=chronon_repo_path,
-        online_class=os.environ.get("CHRONON_ONLINE_CLASS"),
-        version=os.environ.get("VERSION"),
-        spark_version=os.environ.get("SPARK_VERSION", "3.1.1"),
+        online_class=environ.get("CHRONON_ONLINE_CLASS"),
+        version=environ.get("VERSION"),
+        spark_version=environ.get("SPARK_VERSION", "3.1.1"),
         spark_submit_path=os.path.join(chronon_repo_path, "scripts/spark_submit.sh"),
         spark_streaming_submit_path=os.path.join(chronon_repo_path, "scripts/spark_streaming.sh"),
         online_jar_fetch=os.path.join(chronon_repo_path, "scripts/fetch_online_jar.py"),
         conf_type="group_bys",
-        online_args=os.environ.get("CHRONON_ONLINE_ARGS", ""),
-        chronon_jar=os.environ.get("CHRONON_DRIVER_JAR"),
+        online_args=environ.get("CHRONON_ONLINE_ARGS", ""),
+        chronon_jar=environ.get("CHRONON_DRIVER_JAR"),
         list_apps="python3 " + os.path.join(chronon_repo_path, "scripts/yarn_list.py"),
         render_info=os.path.join(chronon_repo_path, RENDER_INFO_DEFAULT_SCRIPT),
     )
 
 
-if __name__ == "__main__":
+def resolve_jar(args, jars=None):
+    """
+    Path of the chronon jar for the args, downloaded if needed. Resolutions are shared through the jars dict.
+    """
+    if args.chronon_jar:
+        return args.chronon_jar
+    key = (
+        args.version,
+        "embedded" if args.mode in MODES_USING_EMBEDDED else "uber",
+        args.release_tag,
+        os.environ.get("SPARK_VERSION", args.spark_version),
+    )
+    if jars is None or key not in jars:
+        jar_path = download_jar(key[0], jar_type=key[1], release_tag=key[2], spark_version=key[3])
+        if jars is None:
+            return jar_path
+        jars[key] = jar_path
+    return jars[key]
+
+
+def expand_confs(repo, patterns):
+    """
+    Conf paths relative to the repo, from paths or glob patterns relative to the repo, or from @<file> listing
+    them one per line.
+    """
+    confs = []
+    for pattern in patterns:
+        if pattern.startswith("@"):
+            with open(pattern[1:]) as f:
+                confs.extend(expand_confs(repo, [line.strip() for line in f if line.strip()]))
+            continue
+        matches = sorted(glob.glob(os.path.join(repo, pattern), recursive=True))
+        if not matches and not glob.has_magic(pattern):
+            # reported as a failure of the conf.
+            matches = [os.path.join(repo, pattern)]
+        confs.extend(os.path.relpath(match, repo) for match in matches if not os.path.isdir(match))
+    return list(dict.fromkeys(confs))
+
+
+def _without_option(argv, option):
+    """argv without the option and its values."""
+    result, skipping = [], False
+    for arg in argv:
+        if arg == option:
+            skipping = True
+        elif skipping and not arg.startswith("-"):
+            continue
+        elif not arg.startswith(option + "="):
+            skipping = False
+            result.append(arg)
+    return result
+
+
+def run_batch(parser, argv, confs, concurrency):
+    """
+    Runs the mode of the argv for each of the confs, at most concurrency at a time.
+
+    The environment of each conf is resolved as for a single conf, from teams.json read once, but passed to its
+    commands instead of being set in os.environ. Confs needing the same jar share its resolution.
+
+    returns:
+        list of (conf, status, seconds, error) in the order of the confs, status being ok or failed.
+    """
+    base_argv = _without_option(argv, "--confs")
+    environ = dict(os.environ)
+    teams_json = None
+    jars = {}
+    results = {}
+    runners = []
+    for conf in confs:
+        start = time.time()
+        try:
+            conf_argv = base_argv + ["--conf", conf]
+            set_defaults(parser, environ)
+            pre_parse_args, _ = parser.parse_known_args(conf_argv)
+            if not os.path.isfile(os.path.join(pre_parse_args.repo, conf)):
+                raise ValueError("No conf at {}".format(os.path.join(pre_parse_args.repo, conf)))
+            teams_file = os.path.join(pre_parse_args.repo, "teams.json")
+            if teams_json is None and os.path.exists(teams_file):
+                with open(teams_file) as infile:
+                    teams_json = json.load(infile)
+            env = dict(environ)
+            env.update(get_runtime_env(pre_parse_args, environ, teams_json, verbose=False))
+            set_defaults(parser, env)
+            args, unknown_args = parser.parse_known_args(conf_argv)
+            extra_args = (" " + args.online_args) if args.mode in ONLINE_MODES else ""
+            args.args = " ".join(unknown_args) + extra_args
+            runner = Runner(args, os.path.expanduser(resolve_jar(args, jars)), env)
+            # an online jar fetched for the first conf serves the others.
+            if runner.online_jar and "CHRONON_ONLINE_JAR" not in environ:
+                environ["CHRONON_ONLINE_JAR"] = runner.online_jar
+            runners.append((conf, runner, start))
+        except Exception as e:
+            logging.exception(e)
+            results[conf] = (conf, "failed", time.time() - start, "{}: {}".format(type(e).__name__, e))
+    # set_defaults of the next parse must not see the environment of the last conf.
+    set_defaults(parser)
+
+    def run_conf(conf, runner, start):
+        try:
+            runner.run()
+            return conf, "ok", time.time() - start, None
+        except Exception as e:
+            logging.exception(e)
+            return conf, "failed", time.time() - start, "{}: {}".format(type(e).__name__, e)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for result in executor.map(lambda item: run_conf(*item), runners):
+            results[result[0]] = result
+    summary = [results[conf] for conf in confs]
+    failed = [result for result in summary if result[1] != "ok"]
+    print("Batch of {}: {} succeeded, {} failed out of {} confs".format(
+        " ".join(base_argv), len(summary) - len(failed), len(failed), len(summary)
+    ))
+    for conf, status, seconds, error in summary:
+        print("    {:<7}{:>9.1f}s  {}{}".format(status, seconds, conf, ": " + error if error else ""))
+    return summary
+
+
+def build_parser():
+    """Parser of the arguments of run.py"""
     parser = argparse.ArgumentParser(description="Submit various kinds of chronon jobs")
     parser.add_argument(
         "--conf",
@@ -569,6 +1517,18 @@ if __name__ == "__main__":
         default="dev",
         help="Running environment - default to be dev",
     )
+    parser.add_argument(
+        "--confs",
+        nargs="+",
+        help="batch mode: run the mode for each of these confs, given as paths or glob patterns relative to the "
+        "repo, or as @<file> listing them one per line. Prints a summary of the results.",
+    )
+    parser.add_argument(
+        "--batch-parallelism",
+        type=int,
+        default=DEFAULT_BATCH_PARALLELISM,
+        help="number of confs of a batch running at the same time. Default to {}".format(DEFAULT_BATCH_PARALLELISM),
+    )
     parser.add_argument("--mode", choices=MODE_ARGS.keys())
     parser.add_argument("--ds", help="the end partition to backfill the data")
     parser.add_argument("--app-name", help="app name. Default to {}".format(APP_NAME_TEMPLATE))
@@ -584,6 +1544,54 @@ if __name__ == "__main__":
         help="break down the backfill range into this number of tasks in parallel. "
         "Please use it along with --start-ds and --end-ds and only in manual mode",
     )
+    parser.add_argument(
+        "--chunk-days",
+        help="backfill the range from --start-ds to --end-ds in chunks of this number of days, at most --parallelism "
+        "at a time. Completed chunks are recorded in a ledger and skipped when the backfill runs again.",
+    )
+    parser.add_argument(
+        "--retries",
+        help="number of retries of a failing chunk of a range backfill. Default to {}".format(
+            DEFAULT_BACKFILL_RETRIES
+        ),
+    )
+    parser.add_argument(
+        "--retry-backoff",
+        help="seconds before the first retry of a failing chunk, doubling with each retry. Default to {}".format(
+            DEFAULT_BACKFILL_RETRY_BACKOFF
+        ),
+    )
+    parser.add_argument(
+        "--ledger",
+        help="path of the ledger of the completed chunks. Default to a file per conf and mode under {}".format(
+            DEFAULT_BACKFILL_LEDGER_DIR
+        ),
+    )
+    parser.add_argument(
+        "--missing-only",
+        action="store_true",
+        help="only backfill the days from --start-ds to --end-ds missing from the output table of the conf, "
+        "in contiguous ranges.",
+    )
+    parser.add_argument(
+        "--partition-provider",
+        help="lists the existing partitions for --missing-only. local:<path> lists a local spark warehouse, default "
+        "to $CHRONON_WAREHOUSE_PATH or spark-warehouse. <module>:<callable> builds a provider with a "
+        "partitions(table) method, e.g. for a metastore. Default to local.",
+    )
+    parser.add_argument(
+        "--weighted-split",
+        action="store_true",
+        help="with --parallelism, split the range in chunks of about the same input volume instead of the same "
+        "number of days, and report the expected load of each chunk.",
+    )
+    parser.add_argument(
+        "--volume-estimates",
+        help="volume of each day for --weighted-split. local:<path> sums the partition files of the input tables in "
+        "a local warehouse, stats:<path> reads <table>.stats.jsonl row counts, json:<path> reads {ds: volume} or "
+        "{table: {ds: volume}}, <module>:<callable> builds a provider with a day_volumes(table) method. "
+        "Default to local.",
+    )
     parser.add_argument("--repo", help="Path to chronon repo")
     parser.add_argument(
         "--online-jar",
@@ -615,6 +1623,28 @@ if __name__ == "__main__":
         "--online-args",
         help="Basic arguments that need to be supplied to all online modes",
     )
+    parser.add_argument(
+        "--fetch-server",
+        action="store_true",
+        help="fetch mode: start a single fetch process and send it the keys of --fetch-requests, then report the "
+        "latency percentiles. Faster than a fetch per key.",
+    )
+    parser.add_argument(
+        "--fetch-requests",
+        help="file of json lines, each a key map or a list of key maps fetched in one request. Default to stdin",
+    )
+    parser.add_argument(
+        "--fetch-batch-size",
+        type=int,
+        default=DEFAULT_FETCH_BATCH_SIZE,
+        help="number of key map lines fetched in one request. Default to {}".format(DEFAULT_FETCH_BATCH_SIZE),
+    )
+    parser.add_argument(
+        "--local-kv",
+        help="with --fetch-server, answer the fetches from this json file of join or group_by names to lists of "
+        '{"keys": {...}, "values": {...}} instead of the online store',
+    )
+    parser.add_argument("--serve-local-kv", help=argparse.SUPPRESS)
     parser.add_argument("--chronon-jar", help="Path to chronon OS jar")
     parser.add_argument("--release-tag", help="Use the latest jar for a particular tag.")
     parser.add_argument("--list-apps", help="command/script to list running jobs on the scheduler")
@@ -623,23 +1653,35 @@ if __name__ == "__main__":
         help="Path to script rendering additional information of the given config. "
         + "Only applicable when mode is set to info",
     )
+    return parser
+
+
+if __name__ == "__main__":
+    parser = build_parser()
     set_defaults(parser)
-    pre_parse_args, _ = parser.parse_known_args()
+    pre_parse_args, unknown_args = parser.parse_known_args()
+    if pre_parse_args.serve_local_kv:
+        # the fetch process of --local-kv, named after --name like `Driver fetch`, or the conf.
+        name_parser = argparse.ArgumentParser(add_help=False)
+        name_parser.add_argument("--name")
+        name = name_parser.parse_known_args(unknown_args)[0].name
+        if name is None and pre_parse_args.conf:
+            name = "/".join(pre_parse_args.conf.split("/")[-3:])
+        serve_local_kv(pre_parse_args.serve_local_kv, sys.stdin, sys.stdout, name)
+        sys.exit(0)
+    if pre_parse_args.confs:
+        assert not pre_parse_args.conf, "Use either --conf or --confs"
+        batch = run_batch(
+            parser,
+            sys.argv[1:],
+            expand_confs(pre_parse_args.repo, pre_parse_args.confs),
+            pre_parse_args.batch_parallelism,
+        )
+        sys.exit(1 if any(status != "ok" for _, status, _, _ in batch) else 0)
     # We do a pre-parse to extract conf, mode, etc and set environment variables and re parse default values.
     set_runtime_env(pre_parse_args)
     set_defaults(parser)
     args, unknown_args = parser.parse_known_args()
-    jar_type = "embedded" if args.mode in MODES_USING_EMBEDDED else "uber"
     extra_args = (" " + args.online_args) if args.mode in ONLINE_MODES else ""
     args.args = " ".join(unknown_args) + extra_args
-    jar_path = (
-        args.chronon_jar
-        if args.chronon_jar
-        else download_jar(
-            args.version,
-            jar_type=jar_type,
-            release_tag=args.release_tag,
-            spark_version=os.environ.get("SPARK_VERSION", args.spark_version),
-        )
-    )
-    Runner(args, os.path.expanduser(jar_path)).run()
+    Runner(args, os.path.expanduser(resolve_jar(args))).run()
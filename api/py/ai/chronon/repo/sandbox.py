@@ -0,0 +1,207 @@
+"""Extraction of conf objects in separate processes, with time and memory limits per python file.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import ai.chronon.repo.extract_objects as eo
+from ai.chronon.logger import get_logger
+from ai.chronon.repo import compile_profiler
+from ai.chronon.repo.serializer import copy_thrift
+
+# Seconds between two checks of the running extractions.
+POLL_INTERVAL = 0.05
+
+
+@dataclass
+class SandboxLimits:
+    # seconds a python file may take to be imported.
+    timeout: Optional[float] = None
+    # MB of resident memory a python file may add to the process importing it. Only enforced where /proc exists.
+    max_rss_mb: Optional[float] = None
+    # number of files imported at the same time.
+    workers: int = 1
+
+
+@dataclass
+class ExtractionFailure:
+    file_path: str
+    # one of timeout, memory, error or crash.
+    reason: str
+    elapsed: float
+    rss_mb: Optional[float] = None
+    message: str = ""
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _extract_in_child(conn, root_path: str, file_path: str, cls: type, log_level):
+    cpu = time.process_time()
+    try:
+        results = eo.from_file(root_path, file_path, cls, log_level)
+        # copies keep the values as they are, invalid ones included, so that compile validates them like the
+        # objects it extracts itself. Unlike the objects, they hold no arbitrary iterables and can be pickled.
+        payload = pickle.dumps([(name, copy_thrift(obj)) for name, obj in results.items()])
+        message = ("ok", payload)
+    except BaseException:
+        message = ("error", traceback.format_exc())
+    conn.send(message + (time.process_time() - cpu,))
+    conn.close()
+
+
+class _Extraction(object):
+    def __init__(self, context, root_path: str, file_path: str, cls: type, log_level):
+        self.file_path = file_path
+        self.conn, child_conn = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=_extract_in_child, args=(child_conn, root_path, file_path, cls, log_level), daemon=True
+        )
+        # memory of the compile process, shared with forked children, which the limit does not account for.
+        self.base_rss_mb = _rss_mb(os.getpid()) or 0.0
+        self.start = time.perf_counter()
+        self.process.start()
+        child_conn.close()
+        self.peak_rss_mb = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def added_rss_mb(self) -> Optional[float]:
+        rss = _rss_mb(self.process.pid)
+        if rss is None:
+            return None
+        added = max(0.0, rss - self.base_rss_mb)
+        self.peak_rss_mb = max(self.peak_rss_mb or 0.0, added)
+        return added
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SandboxedExtractor(object):
+    """
+    Imports each python file in its own process and returns copies of the objects it defines. A file exceeding
+    the time or memory limit, failing or crashing is reported as a failure and skipped, the other files are still
+    extracted.
+
+    Processes are forked where possible, so that the modules already imported by compile are not imported again.
+    """
+
+    def __init__(self, root_path: str, cls: type, limits: SandboxLimits, log_level=logging.INFO):
+        self.logger = get_logger(log_level)
+        self.root_path = root_path
+        self.cls = cls
+        self.limits = limits
+        self.log_level = log_level
+        self.failures: List[ExtractionFailure] = []
+        # python file -> seconds spent extracting it.
+        self.timings: Dict[str, float] = {}
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        if limits.max_rss_mb and _rss_mb(os.getpid()) is None:
+            self.logger.warning("The memory limit of the extraction is not enforced on this platform.")
+
+    def extract(self, python_files: List[str]) -> Dict[str, object]:
+        """
+        returns:
+            map of object qualifier to object, in the order of the python files, like `extract_objects.from_files`.
+        """
+        pending = list(python_files)
+        running: List[_Extraction] = []
+        by_file = {}
+        while pending or running:
+            while pending and len(running) < max(1, self.limits.workers):
+                running.append(
+                    _Extraction(self.context, self.root_path, pending.pop(0), self.cls, self.log_level)
+                )
+            multiprocessing.connection.wait([e.conn for e in running], timeout=POLL_INTERVAL)
+            for extraction in list(running):
+                result = self._check(extraction)
+                if result is not None:
+                    running.remove(extraction)
+                    by_file[extraction.file_path] = result
+        results = {}
+        for f in python_files:
+            results.update(by_file.get(f, {}))
+        return results
+
+    def _check(self, extraction: _Extraction) -> Optional[Dict[str, object]]:
+        """
+        returns:
+            the objects of the file once its extraction is over, empty if it failed. None while it runs.
+        """
+        # checked first, so that a process exiting right after sending its result isn't taken for a crash.
+        alive = extraction.process.is_alive()
+        if extraction.conn.poll():
+            try:
+                status, payload, cpu = extraction.conn.recv()
+            except EOFError:
+                status, payload, cpu = "crash", "the extraction process exited without a result", 0.0
+            extraction.process.join()
+            extraction.conn.close()
+            self._record(extraction, cpu)
+            if status == "ok":
+                return dict(pickle.loads(payload))
+            return self._fail(extraction, status, payload)
+        if not alive:
+            self._record(extraction, 0.0)
+            extraction.conn.close()
+            return self._fail(extraction, "crash", f"exit code {extraction.process.exitcode}")
+        if self.limits.timeout and extraction.elapsed > self.limits.timeout:
+            extraction.kill()
+            self._record(extraction, 0.0)
+            return self._fail(extraction, "timeout", f"exceeded {self.limits.timeout}s")
+        added_rss_mb = extraction.added_rss_mb() if self.limits.max_rss_mb else None
+        if added_rss_mb is not None and added_rss_mb > self.limits.max_rss_mb:
+            extraction.kill()
+            self._record(extraction, 0.0)
+            return self._fail(extraction, "memory", f"exceeded {self.limits.max_rss_mb}MB")
+        return None
+
+    def _record(self, extraction: _Extraction, cpu: float):
+        elapsed = extraction.elapsed
+        self.timings[extraction.file_path] = elapsed
+        profiler = compile_profiler.active()
+        if profiler is not None:
+            profiler.record("import", elapsed, cpu, file=os.path.relpath(extraction.file_path, self.root_path))
+
+    def _fail(self, extraction: _Extraction, reason: str, message: str) -> dict:
+        failure = ExtractionFailure(
+            extraction.file_path, reason, self.timings[extraction.file_path], extraction.peak_rss_mb, message
+        )
+        self.failures.append(failure)
+        # same report as `extract_objects.from_files` for files failing to be extracted.
+        logging.error(f"Failed to extract: {extraction.file_path} ({reason} after {failure.elapsed:.2f}s)")
+        logging.error(message)
+        return {}
@@ -13,10 +13,12 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import base64
+import copy
 import json
 from ai.chronon.utils import JsonDiffer
 from thrift.Thrift import TType
-from thrift.protocol.TJSONProtocol import TSimpleJSONProtocolFactory, TJSONProtocolFactory
+from thrift.protocol.TJSONProtocol import TJSONProtocolFactory
 
 from thrift import TSerialization
 
@@ -31,8 +33,7 @@ class ThriftJSONDecoder(json.JSONDecoder):
             dct = json_str
         else:
             dct = super(ThriftJSONDecoder, self).decode(json_str)
-        return self._convert(dct, TType.STRUCT,
-                             (self._thrift_class, self._thrift_class.thrift_spec))
+        return get_struct_decoder(self._thrift_class)(dct)
 
     def _convert(self, val, ttype, ttype_info):
         if ttype == TType.STRUCT:
@@ -50,7 +51,7 @@ class ThriftJSONDecoder(json.JSONDecoder):
             (element_ttype, element_ttype_info, _) = ttype_info
             ret = [self._convert(x, element_ttype, element_ttype_info) for x in val]
         elif ttype == TType.SET:
-            (element_ttype, element_ttype_info) = ttype_info
+            (element_ttype, element_ttype_info, _) = ttype_info
             ret = set([self._convert(x, element_ttype, element_ttype_info) for x in val])
         elif ttype == TType.MAP:
             (key_ttype, key_ttype_info, val_ttype, val_ttype_info, _) = ttype_info
@@ -71,6 +72,92 @@ class ThriftJSONDecoder(json.JSONDecoder):
         return ret
 
 
+# Generated decoders share a namespace so that they can call each other, including recursively.
+_decoder_namespace = {}
+# thrift class -> generated decoder function.
+_struct_decoders = {}
+
+
+def _unrecognized_ttype(ttype):
+    raise TypeError('Unrecognized thrift field type: %d' % ttype)
+
+
+def _decoder_name(thrift_class):
+    return '_decode_{}_{}'.format(thrift_class.__module__.replace('.', '_'), thrift_class.__name__)
+
+
+def _decoder_expression(expr, ttype, ttype_info, depth, pending):
+    """
+    Python expression converting the json value `expr` like `ThriftJSONDecoder._convert` does.
+    Struct classes that still need a decoder are added to `pending`.
+    """
+    if ttype == TType.STRUCT:
+        thrift_class = ttype_info[0]
+        if thrift_class not in _struct_decoders:
+            pending.append(thrift_class)
+        return '{}({})'.format(_decoder_name(thrift_class), expr)
+    elif ttype == TType.LIST or ttype == TType.SET:
+        (element_ttype, element_ttype_info, _) = ttype_info
+        x = 'x{}'.format(depth)
+        element = _decoder_expression(x, element_ttype, element_ttype_info, depth + 1, pending)
+        template = '[{} for {} in {}]' if ttype == TType.LIST else '{{{} for {} in {}}}'
+        return template.format(element, x, expr)
+    elif ttype == TType.MAP:
+        (key_ttype, key_ttype_info, val_ttype, val_ttype_info, _) = ttype_info
+        k, v = 'k{}'.format(depth), 'v{}'.format(depth)
+        key = _decoder_expression(k, key_ttype, key_ttype_info, depth + 1, pending)
+        value = _decoder_expression(v, val_ttype, val_ttype_info, depth + 1, pending)
+        return '{{{}: {} for ({}, {}) in {}.items()}}'.format(key, value, k, v, expr)
+    elif ttype == TType.STRING:
+        return 'str({})'.format(expr)
+    elif ttype == TType.DOUBLE:
+        return 'float({})'.format(expr)
+    elif ttype in (TType.I64, TType.I32, TType.I16, TType.BYTE):
+        return 'int({})'.format(expr)
+    elif ttype == TType.BOOL:
+        return 'bool({})'.format(expr)
+    return '_unrecognized_ttype({})'.format(ttype)
+
+
+def _generate_struct_decoder(thrift_class, pending):
+    lines = ['def {}(val):'.format(_decoder_name(thrift_class)),
+             '    ret = {}_class()'.format(_decoder_name(thrift_class))]
+    for field in thrift_class.thrift_spec:
+        if field is None:
+            continue
+        (_, field_ttype, field_name, field_ttype_info, _) = field
+        value = _decoder_expression('val[{!r}]'.format(field_name), field_ttype, field_ttype_info, 0, pending)
+        lines.append('    if {!r} in val:'.format(field_name))
+        lines.append('        ret.{} = {}'.format(field_name, value))
+    lines.append('    return ret')
+    return '\n'.join(lines)
+
+
+def get_struct_decoder(thrift_class):
+    """
+    returns:
+        a function converting a parsed json dict into an instance of the thrift class, with the same
+        semantics as `ThriftJSONDecoder._convert`. The function is generated from the thrift_spec
+        once per process, along with the decoders of all the structs it can contain.
+    """
+    if thrift_class not in _struct_decoders:
+        pending = [thrift_class]
+        while pending:
+            current = pending.pop()
+            if current in _struct_decoders:
+                continue
+            # mark the class first so recursive structs don't get generated twice.
+            _struct_decoders[current] = None
+            _decoder_namespace[_decoder_name(current) + '_class'] = current
+            source = _generate_struct_decoder(current, pending)
+            exec(compile(source, '<thrift decoder {}>'.format(current.__name__), 'exec'), _decoder_namespace)
+            _struct_decoders[current] = _decoder_namespace[_decoder_name(current)]
+    return _struct_decoders[thrift_class]
+
+
+_decoder_namespace['_unrecognized_ttype'] = _unrecognized_ttype
+
+
 def json2thrift(json_str, thrift_class):
     return json.loads(json_str, cls=ThriftJSONDecoder, thrift_class=thrift_class)
 
@@ -88,10 +175,100 @@ def thrift_json(obj):
     return TSerialization.serialize(obj, protocol_factory=TJSONProtocolFactory())
 
 
+def _invalid_value(val, ttype):
+    return TypeError('Invalid value for thrift field type {}: {!r}'.format(TType._VALUES_TO_NAMES[ttype], val))
+
+
+def _encode(val, ttype, ttype_info):
+    """
+    Fails with a TypeError on the values TSimpleJSONProtocol can't write, e.g. `None` in a container.
+    """
+    if ttype == TType.STRUCT:
+        if not hasattr(val, 'thrift_spec'):
+            raise _invalid_value(val, ttype)
+        return thrift_to_dict(val)
+    elif ttype == TType.LIST or ttype == TType.SET:
+        (element_ttype, element_ttype_info, _) = ttype_info
+        return [_encode(x, element_ttype, element_ttype_info) for x in val]
+    elif ttype == TType.MAP:
+        if not hasattr(val, 'items'):
+            raise _invalid_value(val, ttype)
+        (key_ttype, key_ttype_info, val_ttype, val_ttype_info, _) = ttype_info
+        return {_encode_key(k, key_ttype, key_ttype_info): _encode(v, val_ttype, val_ttype_info)
+                for (k, v) in val.items()}
+    elif ttype == TType.BOOL:
+        # TSimpleJSONProtocol writes booleans as numbers.
+        return 1 if val is True else 0
+    elif ttype == TType.STRING and ttype_info == 'BINARY':
+        if not isinstance(val, bytes):
+            raise _invalid_value(val, ttype)
+        return base64.b64encode(val).decode('ascii')
+    elif ttype == TType.STRING:
+        if not isinstance(val, str):
+            raise _invalid_value(val, ttype)
+    elif ttype in (TType.DOUBLE, TType.I64, TType.I32, TType.I16, TType.BYTE):
+        if not isinstance(val, (int, float)) or isinstance(val, bool):
+            raise _invalid_value(val, ttype)
+    return val
+
+
+def _encode_key(key, ttype, ttype_info):
+    encoded = _encode(key, ttype, ttype_info)
+    # json object keys are always strings, numbers are quoted as they are written.
+    return encoded if isinstance(encoded, str) else str(encoded)
+
+
+def thrift_to_dict(obj) -> dict:
+    """
+    Converts a thrift object into the plain dict its simple json serialization parses into,
+    by walking the thrift_spec of the object directly.
+    """
+    result = {}
+    for field in obj.thrift_spec:
+        if field is None:
+            continue
+        (_, field_ttype, field_name, field_ttype_info, _) = field
+        val = getattr(obj, field_name)
+        if val is not None:
+            result[field_name] = _encode(val, field_ttype, field_ttype_info)
+    return result
+
+
+def _copy(val, ttype, ttype_info):
+    if val is None:
+        return None
+    elif ttype == TType.STRUCT:
+        return copy_thrift(val)
+    elif ttype == TType.LIST or ttype == TType.SET:
+        (element_ttype, element_ttype_info, _) = ttype_info
+        elements = [_copy(x, element_ttype, element_ttype_info) for x in val]
+        return elements if ttype == TType.LIST else set(elements)
+    elif ttype == TType.MAP:
+        (key_ttype, key_ttype_info, val_ttype, val_ttype_info, _) = ttype_info
+        return {_copy(k, key_ttype, key_ttype_info): _copy(v, val_ttype, val_ttype_info) for (k, v) in val.items()}
+    return val
+
+
+def copy_thrift(obj):
+    """
+    returns:
+        a deep copy of a thrift object made along its thrift_spec. Values are kept as they are, so that they are
+        validated by the serialization of the copy, and any iterable, e.g. the one returned by `Aggregations`, is
+        accepted for a list field.
+    """
+    if not hasattr(obj, 'thrift_spec'):
+        return copy.deepcopy(obj)
+    copied = type(obj)()
+    for field in obj.thrift_spec:
+        if field is None:
+            continue
+        (_, field_ttype, field_name, field_ttype_info, _) = field
+        setattr(copied, field_name, _copy(getattr(obj, field_name), field_ttype, field_ttype_info))
+    return copied
+
+
 def thrift_simple_json(obj):
-    simple = TSerialization.serialize(obj, protocol_factory=TSimpleJSONProtocolFactory())
-    parsed = json.loads(simple)
-    return json.dumps(parsed, indent=2)
+    return json.dumps(thrift_to_dict(obj), indent=2)
 
 
 def thrift_simple_json_protected(obj, obj_type) -> str:
@@ -99,11 +276,10 @@ def thrift_simple_json_protected(obj, obj_type) -> str:
     # ensure that reversal works - we will use this reversal during deployment
     thrift_obj = json.loads(serialized, cls=ThriftJSONDecoder, thrift_class=obj_type)
     actual = thrift_simple_json(thrift_obj)
-    differ = JsonDiffer()
-    diff = differ.diff(serialized, actual)
+    # identical dumps are the common case and need no structural comparison.
+    diff = "" if actual == serialized else JsonDiffer().diff(serialized, actual)
     assert len(diff) == 0, f"""Serialization can't be reversed
 diff: \n{diff}
 original: \n{serialized}
 """
-    differ.clean()
     return serialized
@@ -15,7 +15,6 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
-import json
 import logging
 import os
 import re
@@ -25,8 +24,8 @@ from typing import Dict, List, Set
 from ai.chronon.api.ttypes import Derivation, ExternalPart, GroupBy, Join, Source
 from ai.chronon.group_by import get_output_col_names
 from ai.chronon.logger import get_logger
-from ai.chronon.repo import GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME
-from ai.chronon.repo.serializer import file2thrift, thrift_simple_json
+from ai.chronon.repo.manifest import RepoManifest
+from ai.chronon.repo.serializer import file2thrift, json2thrift, thrift_to_dict
 from ai.chronon.utils import FeatureDisplayKeys
 
 # Fields that indicate stutus of the entities.
@@ -202,45 +201,79 @@ def get_join_output_columns(join: Join) -> Dict[FeatureDisplayKeys, List[str]]:
 class ChrononRepoValidator(object):
     def __init__(self, chronon_root_path: str, output_root: str, log_level=logging.INFO):
         self.logger = get_logger(log_level)
-        self.old_objs = defaultdict(dict)
         # returned key has "group_by." prefix in the name so we remove the prefix.
         self.chronon_root_path = chronon_root_path
         self.output_root = output_root
         self.log_level = log_level
         self.logger = get_logger(log_level)
+        self.manifest = RepoManifest(os.path.join(chronon_root_path, output_root), log_level=log_level)
         self.load_objs()
 
-    def load_objs(self):
-        # we keep the objs in the list not in  a set since thrift does not
-        # implement __hash__ for ttypes object.
-        self.old_group_bys = extract_json_confs(
-            GroupBy, os.path.join(self.chronon_root_path, self.output_root, GROUP_BY_FOLDER_NAME)
-        )
-        self.old_joins = extract_json_confs(
-            Join, os.path.join(self.chronon_root_path, self.output_root, JOIN_FOLDER_NAME)
-        )
+    def load_objs(self, refresh: bool = True):
+        """
+        Takes a new snapshot of the materialized confs. Without refresh, the confs changed on disk by other
+        processes since the last load are not picked up, which saves reading them all again.
+        """
+        if refresh:
+            self.manifest.refresh()
+        # snapshot of the materialized confs. Confs written afterwards are only seen once added with `add_obj`
+        # or on the next load.
+        self._old_contents = dict(self.manifest.contents)
+        # class name -> conf name -> manifest entry of the materialized conf.
+        self.old_entries = defaultdict(dict)
+        # class name -> conf name -> materialized conf, decoded the first time a check needs the whole object.
+        self.old_objs = defaultdict(dict)
+        # group_by name -> names of the materialized joins including it.
+        self.old_join_names_by_group_by = defaultdict(set)
+        for entry in self.manifest.entries.values():
+            self._index_old_entry(entry)
+
+    def _index_old_entry(self, entry: dict):
+        previous = self.old_entries[entry["type"]].get(entry["name"])
+        if previous is not None and previous["type"] == Join.__name__:
+            for group_by_name in previous["group_bys"]:
+                self.old_join_names_by_group_by[group_by_name].discard(entry["name"])
+        self.old_entries[entry["type"]][entry["name"]] = entry
+        if entry["type"] == Join.__name__:
+            for group_by_name in entry["group_bys"]:
+                self.old_join_names_by_group_by[group_by_name].add(entry["name"])
+
+    def add_obj(self, obj: object):
+        """
+        Makes an object that was just materialized visible to the following checks, without reloading.
+        """
+        obj_class = type(obj)
+        self._index_old_entry(self.manifest.find(obj_class, obj.metaData.name))
+        self.old_objs[obj_class.__name__][obj.metaData.name] = obj
 
-        self.old_objs["GroupBy"] = self.old_group_bys
-        self.old_objs["Join"] = self.old_joins
+    @property
+    def old_group_bys(self) -> List[GroupBy]:
+        return [self._get_old_obj(GroupBy, name) for name in sorted(self.old_entries[GroupBy.__name__])]
+
+    @property
+    def old_joins(self) -> List[Join]:
+        return [self._get_old_obj(Join, name) for name in sorted(self.old_entries[Join.__name__])]
 
     def _get_old_obj(self, obj_class: type, obj_name: str) -> object:
         """
         returns:
            materialized version of the obj given the object's name.
         """
-        return next((x for x in self.old_objs[obj_class.__name__] if x.metaData and x.metaData.name == obj_name), None)
+        class_name = obj_class.__name__
+        if obj_name not in self.old_objs[class_name]:
+            entry = self.old_entries[class_name].get(obj_name)
+            if entry is None:
+                return None
+            self.old_objs[class_name][obj_name] = json2thrift(self._old_contents[entry["path"]], obj_class)
+        return self.old_objs[class_name][obj_name]
 
     def _get_old_joins_with_group_by(self, group_by: GroupBy) -> List[Join]:
         """
         returns:
-            materialized joins including the group_by as dicts.
+            materialized joins including the group_by.
         """
-        return [
-            join
-            for join in self.old_joins
-            if join.joinParts is not None
-            and group_by.metaData.name in [rp.groupBy.metaData.name for rp in join.joinParts]
-        ]
+        join_names = self.old_join_names_by_group_by.get(group_by.metaData.name, ())
+        return [self._get_old_obj(Join, name) for name in sorted(join_names)]
 
     def can_skip_materialize(self, obj: object) -> List[str]:
         """
@@ -273,8 +306,8 @@ class ChrononRepoValidator(object):
         return []
 
     def _has_diff(self, obj: object, old_obj: object, skipped_fields=SKIPPED_FIELDS) -> bool:
-        new_json = {k: v for k, v in json.loads(thrift_simple_json(obj)).items() if k not in skipped_fields}
-        old_json = {k: v for k, v in json.loads(thrift_simple_json(old_obj)).items() if k not in skipped_fields}
+        new_json = {k: v for k, v in thrift_to_dict(obj).items() if k not in skipped_fields}
+        old_json = {k: v for k, v in thrift_to_dict(old_obj).items() if k not in skipped_fields}
         if isinstance(obj, Join):
             _filter_skipped_fields_from_join(new_json, skipped_fields)
             _filter_skipped_fields_from_join(old_json, skipped_fields)
@@ -340,7 +373,9 @@ class ChrononRepoValidator(object):
         ]
         errors = []
         old_group_bys = [
-            group_by for group_by in included_group_bys if self._get_old_obj(GroupBy, group_by.metaData.name)
+            group_by
+            for group_by in included_group_bys
+            if group_by.metaData.name in self.old_entries[GroupBy.__name__]
         ]
         non_prod_old_group_bys = [
             group_by.metaData.name for group_by in old_group_bys if group_by.metaData.production is False
@@ -0,0 +1,444 @@
+"""
+Client of the feature service, fetching the features of joins and group_bys through its
+/v1/features/join/<name> and /v1/features/groupby/<name> endpoints.
+
+    with FeatureClient("http://localhost:9000") as client:
+        results = client.fetch_join("quickstart/training_set.v2", [{"user_id": "5"}, {"user_id": "7"}], timeout=0.5)
+
+    async with AsyncFeatureClient("http://localhost:9000") as client:
+        results = await client.fetch_join("quickstart/training_set.v2", [{"user_id": "5"}], timeout=0.5)
+
+Connections are kept alive in a pool, keys are sent in batches of at most `batch_size` per request and the batches
+of a call are fetched concurrently, at most `concurrency` requests at a time for the whole client. Each call has a
+deadline, after which it raises FeatureServiceTimeout. Request and call latencies are recorded in histograms.
+
+Only depends on the standard library. `StubFeatureServer` serves features from a dict, to test without a service.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import asyncio
+import bisect
+import concurrent.futures
+import functools
+import http.client
+import http.server
+import json
+import queue
+import socket
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 8
+# seconds, for calls without a timeout.
+DEFAULT_TIMEOUT = 10.0
+# upper bounds in milliseconds of the buckets of the latency histograms, the last bucket is unbounded.
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+JOIN = "join"
+GROUP_BY = "groupby"
+
+
+class FeatureServiceError(Exception):
+    """A request the feature service failed, with its status and error messages."""
+
+    def __init__(self, status: int, errors: List[str]):
+        super().__init__(f"Feature service responded {status}: {'; '.join(errors)}")
+        self.status = status
+        self.errors = errors
+
+
+class FeatureServiceTimeout(FeatureServiceError, TimeoutError):
+    def __init__(self, timeout: float):
+        super().__init__(0, [f"no response within {timeout}s"])
+
+
+@dataclass
+class FetchResult:
+    keys: Dict[str, Any]
+    features: Optional[Dict[str, Any]] = None
+    # message of a failed lookup, the other keys of the call may still succeed.
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class LatencyHistogram(object):
+    """Counts of latencies per bucket of LATENCY_BUCKETS_MS, safe to record from several threads."""
+
+    def __init__(self, buckets_ms: List[float] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets_ms, latency_ms)] += 1
+            self.count += 1
+            self.total_ms += latency_ms
+            self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket of the p-th percentile, the max latency for the unbounded bucket."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, -(-p * self.count // 100))
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank:
+                    return min(self.buckets_ms[index], self.max_ms) if index < len(self.buckets_ms) else self.max_ms
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms if self.count else None,
+        }
+
+
+class _ConnectionPool(object):
+    """Keep-alive connections to the service, at most `size` of them open at a time."""
+
+    def __init__(self, url: str, size: int):
+        parsed = urllib.parse.urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.prefix = parsed.path.rstrip("/")
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self, timeout: float):
+        if not self._slots.acquire(timeout=max(0.0, timeout)):
+            raise FeatureServiceTimeout(timeout)
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self.connection_class(self.host, self.port, timeout=timeout)
+
+    def release(self, connection, reusable: bool):
+        if reusable:
+            self._idle.put(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class FeatureClient(object):
+    """
+    Blocking client of the feature service, safe to share between threads.
+
+    url: of the service, like http://localhost:9000.
+    pool_size: connections kept open to the service.
+    batch_size: keys sent in a single request.
+    concurrency: requests in flight at a time, over all the calls.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self._pool = _ConnectionPool(url, pool_size)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, concurrency))
+        # latency of each http request, and of each call over all its batches.
+        self.request_latency = LatencyHistogram()
+        self.call_latency = LatencyHistogram()
+
+    def fetch_join(self, name: str, keys: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[FetchResult]:
+        """
+        returns: the result of each key map, in order.
+        raises: FeatureServiceTimeout past the timeout, FeatureServiceError if a request fails as a whole.
+        """
+        return self._fetch(JOIN, name, keys, timeout)
+
+    def fetch_group_by(
+        self, name: str, keys: List[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> List[FetchResult]:
+        """Same as `fetch_join`, for the keys of a group_by."""
+        return self._fetch(GROUP_BY, name, keys, timeout)
+
+    def _fetch(self, entity: str, name: str, keys: List[Dict[str, Any]], timeout: Optional[float]) -> List[FetchResult]:
+        start = time.perf_counter()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        futures = [
+            self._executor.submit(self._fetch_batch, entity, name, batch, deadline, timeout)
+            for batch in self._batches(keys)
+        ]
+        try:
+            done, pending = concurrent.futures.wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+            if pending:
+                raise FeatureServiceTimeout(timeout)
+            results = [result for future in futures for result in future.result()]
+        finally:
+            for future in futures:
+                future.cancel()
+        self.call_latency.record((time.perf_counter() - start) * 1000)
+        return results
+
+    def _batches(self, keys: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        return [keys[i: i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+
+    def _fetch_batch(
+        self, entity: str, name: str, keys: List[Dict[str, Any]], deadline: float, timeout: float
+    ) -> List[FetchResult]:
+        path = f"{self._pool.prefix}/v1/features/{entity}/{urllib.parse.quote(name, safe='')}"
+        body = json.dumps(keys).encode("utf-8")
+        # a kept alive connection may have been closed by the service meanwhile, in which case it is retried once on
+        # a new connection.
+        for attempt in range(2):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise FeatureServiceTimeout(timeout)
+            connection = self._pool.acquire(remaining)
+            reused = connection.sock is not None
+            start = time.perf_counter()
+            try:
+                # also bounds the wait of a connection already open.
+                connection.timeout = remaining
+                if connection.sock is not None:
+                    connection.sock.settimeout(remaining)
+                connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+                response = connection.getresponse()
+                payload = response.read()
+            except socket.timeout:
+                self._pool.release(connection, reusable=False)
+                raise FeatureServiceTimeout(timeout)
+            except (OSError, http.client.HTTPException):
+                self._pool.release(connection, reusable=False)
+                if reused and attempt == 0:
+                    continue
+                raise
+            self._pool.release(connection, reusable=not response.will_close)
+            self.request_latency.record((time.perf_counter() - start) * 1000)
+            return _parse_response(response.status, payload)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self._pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _parse_response(status: int, payload: bytes) -> List[FetchResult]:
+    try:
+        content = json.loads(payload)
+    except ValueError:
+        content = None
+    if status != 200 or not isinstance(content, dict) or "results" not in content:
+        errors = content.get("errors") if isinstance(content, dict) else None
+        raise FeatureServiceError(status, errors or [payload.decode("utf-8", "replace")[:200]])
+    return [
+        FetchResult(
+            keys=result.get("entityKeys") or {},
+            features=result.get("features"),
+            error=None if result.get("status") == "Success" else result.get("error") or "Failure",
+        )
+        for result in content["results"]
+    ]
+
+
+class AsyncFeatureClient(object):
+    """
+    asyncio client of the feature service, with the same arguments as `FeatureClient`.
+
+    The requests of the batches run on the connection pool of a `FeatureClient` in its threads, at most
+    `concurrency` at a time, so that waiting on them does not block the event loop.
+    """
+
+    def __init__(self, url: str, **kwargs):
+        self.client = FeatureClient(url, **kwargs)
+
+    @property
+    def request_latency(self) -> LatencyHistogram:
+        return self.client.request_latency
+
+    @property
+    def call_latency(self) -> LatencyHistogram:
+        return self.client.call_latency
+
+    async def fetch_join(
+        self, name: str, keys: List[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> List[FetchResult]:
+        return await self._fetch(JOIN, name, keys, timeout)
+
+    async def fetch_group_by(
+        self, name: str, keys: List[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> List[FetchResult]:
+        return await self._fetch(GROUP_BY, name, keys, timeout)
+
+    async def _fetch(
+        self, entity: str, name: str, keys: List[Dict[str, Any]], timeout: Optional[float]
+    ) -> List[FetchResult]:
+        client = self.client
+        start = time.perf_counter()
+        timeout = client.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(
+                client._executor, functools.partial(client._fetch_batch, entity, name, batch, deadline, timeout)
+            )
+            for batch in client._batches(keys)
+        ]
+        try:
+            batches = await asyncio.wait_for(asyncio.gather(*futures), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise FeatureServiceTimeout(timeout)
+        client.call_latency.record((time.perf_counter() - start) * 1000)
+        return [result for batch in batches for result in batch]
+
+    async def close(self):
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class StubFeatureServer(object):
+    """
+    Local stand-in of the feature service, serving the features of a dict in a background thread.
+
+    features: map of join or group_by name to a list of {"keys": {...}, "features": {...}}. Keys are compared as
+        strings, unknown keys fail like a missing key in the service.
+    delay: seconds to wait before each response.
+
+        with StubFeatureServer({"team/join.v1": [{"keys": {"id": "1"}, "features": {"a": 1}}]}) as server:
+            FeatureClient(server.url).fetch_join("team/join.v1", [{"id": 1}])
+    """
+
+    def __init__(self, features: Dict[str, List[Dict[str, Any]]], delay: float = 0.0, port: int = 0):
+        self.store = {
+            name: {_stub_key(row["keys"]): row["features"] for row in rows} for name, rows in features.items()
+        }
+        self.delay = delay
+        # number of requests and of new connections, to check batching and pooling.
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                if self.path == "/ping":
+                    self._respond(200, {"status": "ok"})
+                else:
+                    self._respond(404, {"errors": [f"no route for {self.path}"]})
+
+            def do_POST(self):
+                with server._lock:
+                    server.requests += 1
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                parts = self.path.split("/")
+                if len(parts) != 5 or parts[1:3] != ["v1", "features"] or parts[3] not in (JOIN, GROUP_BY):
+                    self._respond(404, {"errors": [f"no route for {self.path}"]})
+                    return
+                try:
+                    keys = json.loads(body)
+                    assert isinstance(keys, list), "expected a list of key maps"
+                except (ValueError, AssertionError) as e:
+                    self._respond(400, {"errors": [str(e)]})
+                    return
+                time.sleep(server.delay)
+                name = urllib.parse.unquote(parts[4])
+                rows = server.store.get(name)
+                results = []
+                for key_map in keys:
+                    features = None if rows is None else rows.get(_stub_key(key_map))
+                    if features is None:
+                        missing = f"no features for {name}" if rows is None else f"no features for keys {key_map}"
+                        results.append({"status": "Failure", "entityKeys": key_map, "error": missing})
+                    else:
+                        results.append({"status": "Success", "entityKeys": key_map, "features": features})
+                self._respond(200, {"results": results})
+
+            def _respond(self, status, content):
+                payload = json.dumps(content).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubFeatureServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _stub_key(keys: Dict[str, Any]) -> str:
+    return json.dumps({key: str(value) for key, value in keys.items()}, sort_keys=True)
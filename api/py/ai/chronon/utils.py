@@ -12,14 +12,11 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
-import gc
+import difflib
 import importlib
 import json
 import os
 import re
-import shutil
-import subprocess
-import tempfile
 from collections.abc import Iterable
 from dataclasses import dataclass, fields
 from enum import Enum
@@ -77,10 +74,10 @@ def edit_distance(str1, str2):
 
 
 class JsonDiffer:
-    def __init__(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.new_name = "new.json"
-        self.old_name = "old.json"
+    """
+    Structural diff of two json documents, rendered like the `diff` command on their sorted and indented dumps.
+    Runs in process, without temporary files.
+    """
 
     def diff(self, new_json_str: object, old_json_str: object, skipped_keys=[]) -> str:
         new_json = {
@@ -89,19 +86,41 @@ class JsonDiffer:
         old_json = {
             k: v for k, v in json.loads(old_json_str).items() if k not in skipped_keys
         }
-
-        with open(os.path.join(self.temp_dir, self.old_name), mode="w") as old, open(
-            os.path.join(self.temp_dir, self.new_name), mode="w"
-        ) as new:
-            old.write(json.dumps(old_json, sort_keys=True, indent=2))
-            new.write(json.dumps(new_json, sort_keys=True, indent=2))
-        diff_str = subprocess.run(
-            ["diff", old.name, new.name], stdout=subprocess.PIPE
-        ).stdout.decode("utf-8")
-        return diff_str
+        old_dump = json.dumps(old_json, sort_keys=True, indent=2)
+        new_dump = json.dumps(new_json, sort_keys=True, indent=2)
+        # compare the dumps rather than the parsed documents, where e.g. 100 == 100.0 and True == 1.
+        if new_dump == old_dump:
+            return ""
+        return _normal_diff(old_dump.splitlines(), new_dump.splitlines())
 
     def clean(self):
-        shutil.rmtree(self.temp_dir)
+        # Nothing to clean up, kept for callers of the temp dir based differ.
+        pass
+
+
+def _diff_range(start: int, end: int) -> str:
+    return str(start + 1) if end - start == 1 else f"{start + 1},{end}"
+
+
+def _normal_diff(old_lines: List[str], new_lines: List[str]) -> str:
+    """Renders the differences between two lists of lines in the default output format of `diff`."""
+    hunks = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag == "replace":
+            header = f"{_diff_range(i1, i2)}c{_diff_range(j1, j2)}"
+        elif tag == "delete":
+            header = f"{_diff_range(i1, i2)}d{j1}"
+        else:
+            header = f"{i1}a{_diff_range(j1, j2)}"
+        hunk = [header] + [f"< {line}" for line in old_lines[i1:i2]]
+        if tag == "replace":
+            hunk.append("---")
+        hunk += [f"> {line}" for line in new_lines[j1:j2]]
+        hunks.append("\n".join(hunk) + "\n")
+    return "".join(hunks)
 
 
 def check_contains_single(candidate, valid_items, type_name, name, print_function=repr):
@@ -179,20 +198,8 @@ def get_columns(source: api.Source):
     return columns
 
 
-def get_mod_name_from_gc(obj, mod_prefix):
-    """get an object's module information from garbage collector"""
-    mod_name = None
-    # get obj's module info from garbage collector
-    gc.collect()
-    for ref in gc.get_referrers(obj):
-        if "__name__" in ref and ref["__name__"].startswith(mod_prefix):
-            mod_name = ref["__name__"]
-            break
-    return mod_name
-
-
 def __set_name(obj, cls, mod_prefix):
-    module_name = get_mod_name_from_gc(obj, mod_prefix)
+    module_name = eo.get_mod_name(obj, mod_prefix)
     assert module_name, f"Couldn't find module name for object:\n{obj}\n"
     module = importlib.import_module(module_name)
     eo.import_module_set_name(module, cls)
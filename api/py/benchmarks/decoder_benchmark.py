@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark of loading every materialized conf of a chronon repo back into thrift objects.
+
+Compares the generated per-class decoders used by `json2thrift` / `file2thrift` against the
+`ThriftJSONDecoder._convert` interpreter, which walks the thrift_spec for every value it converts.
+
+    python api/py/benchmarks/decoder_benchmark.py --chronon_root=api/py/test/sample
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import argparse
+import json
+import os
+import time
+
+from ai.chronon.api.ttypes import GroupBy, Join, StagingQuery
+from ai.chronon.repo import GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME, STAGING_QUERY_FOLDER_NAME
+from ai.chronon.repo.serializer import ThriftJSONDecoder, get_struct_decoder
+from thrift.Thrift import TType
+
+FOLDER_CLASSES = {GROUP_BY_FOLDER_NAME: GroupBy, JOIN_FOLDER_NAME: Join, STAGING_QUERY_FOLDER_NAME: StagingQuery}
+
+
+def load_production_tree(production_root: str):
+    """returns: list of (parsed json dict, thrift class) for every materialized conf."""
+    confs = []
+    for folder, obj_class in FOLDER_CLASSES.items():
+        for sub_root, _, sub_files in os.walk(os.path.join(production_root, folder)):
+            for f in sub_files:
+                with open(os.path.join(sub_root, f)) as conf_file:
+                    confs.append((json.load(conf_file), obj_class))
+    return confs
+
+
+def interpreted_decode(dct, obj_class):
+    decoder = ThriftJSONDecoder(thrift_class=obj_class)
+    return decoder._convert(dct, TType.STRUCT, (obj_class, obj_class.thrift_spec))
+
+
+def generated_decode(dct, obj_class):
+    return get_struct_decoder(obj_class)(dct)
+
+
+def time_tree(fn, confs, repeat: int) -> float:
+    """returns: mean wall time in milliseconds to decode the whole tree."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for dct, obj_class in confs:
+            fn(dct, obj_class)
+    return (time.perf_counter() - start) * 1e3 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chronon_root", default=os.getcwd(), help="Path to the root chronon folder.")
+    parser.add_argument("--output_root", default="production", help="Materialized conf folder under the root.")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of passes over the tree.")
+    args = parser.parse_args()
+
+    confs = load_production_tree(os.path.join(args.chronon_root, args.output_root))
+    if not confs:
+        raise ValueError(f"No materialized confs found under {args.chronon_root}/{args.output_root}")
+    for dct, obj_class in confs:
+        assert generated_decode(dct, obj_class) == interpreted_decode(dct, obj_class)
+
+    interpreted = time_tree(interpreted_decode, confs, args.repeat)
+    generated = time_tree(generated_decode, confs, args.repeat)
+    print(f"confs:        {len(confs)}")
+    print(f"interpreted:  {interpreted:.2f} ms/tree")
+    print(f"generated:    {generated:.2f} ms/tree")
+    print(f"speedup:      {interpreted / generated:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the repo-wide tooling on a generated chronon root, to catch how it scales with the size of a repo.
+
+Generates a root with `synthetic_repo.py`, compiles it with `compile --all`, then times the validation of every
+materialized conf, the explore index, the lineage parsing, the backfill flows of the joins and the airflow DAG
+definition, when airflow is installed. Every benchmark reports the best wall time over the repeats, the confs
+processed per second and the peak memory allocated by python while it runs.
+
+    python api/py/benchmarks/repo_benchmark.py --teams 20 --group_bys 50 --output results.json
+    python api/py/benchmarks/repo_benchmark.py --teams 20 --group_bys 50 --baseline results.json
+
+Confs are executed in this process, so it must not import the conf modules of another chronon root.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, List, Optional
+
+import ai.chronon.repo.extract_objects as eo
+from ai.chronon.repo import GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME, STAGING_QUERY_FOLDER_NAME, explore
+from ai.chronon.repo.compile import FOLDER_NAME_TO_CLASS, extract_and_convert
+from ai.chronon.repo.serializer import file2thrift
+from ai.chronon.repo.validator import ChrononRepoValidator
+from synthetic_repo import RepoSpec, generate_repo
+
+AIRFLOW_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..", "airflow")
+AIRFLOW_TASKS = [
+    ("streaming", GROUP_BY_FOLDER_NAME),
+    ("backfill", GROUP_BY_FOLDER_NAME),
+    ("upload", GROUP_BY_FOLDER_NAME),
+    ("backfill", JOIN_FOLDER_NAME),
+    ("backfill", STAGING_QUERY_FOLDER_NAME),
+]
+
+
+class Skipped(Exception):
+    pass
+
+
+def production_files(root: str, folder: str) -> List[str]:
+    paths = []
+    for sub_root, _, sub_files in os.walk(os.path.join(root, "production", folder)):
+        paths.extend(os.path.join(sub_root, f) for f in sub_files)
+    return sorted(paths)
+
+
+def bench_compile(root: str) -> int:
+    # imports the confs again on every repeat, like a new compile process.
+    eo.unload_conf_modules()
+    with contextlib.redirect_stdout(io.StringIO()):
+        extract_and_convert.main(
+            ["--chronon_root", root, "--all", "--force-overwrite"], standalone_mode=False
+        )
+    return sum(len(production_files(root, folder)) for folder in FOLDER_NAME_TO_CLASS)
+
+
+def bench_validator(root: str) -> int:
+    validator = ChrononRepoValidator(root, "production", log_level=logging.ERROR)
+    count = 0
+    for folder, obj_class in FOLDER_NAME_TO_CLASS.items():
+        for path in production_files(root, folder):
+            validator.validate_obj(file2thrift(path, obj_class))
+            count += 1
+    return count
+
+
+def bench_explore(root: str) -> int:
+    teams = explore.load_team_data(os.path.join(root, "teams.json"))
+    group_bys = explore.build_index(GROUP_BY_FOLDER_NAME, explore.GB_INDEX_SPEC, root=root, teams=teams)
+    joins = explore.build_index(JOIN_FOLDER_NAME, explore.JOIN_INDEX_SPEC, root=root, teams=teams)
+    return len(group_bys) + len(joins)
+
+
+def bench_lineage(root: str) -> int:
+    try:
+        from ai.chronon.lineage.lineage_parser import LineageParser
+    except ImportError as e:
+        raise Skipped(f"lineage dependencies are not installed: {e}")
+    LineageParser().parse_lineage(root)
+    return sum(len(production_files(root, folder)) for folder in FOLDER_NAME_TO_CLASS)
+
+
+def bench_join_backfill(root: str) -> int:
+    from ai.chronon.repo.join_backfill import JoinBackfill
+
+    paths = production_files(root, JOIN_FOLDER_NAME)
+    # the flows refer to the confs by their path relative to the root.
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        for path in paths:
+            JoinBackfill("2023-01-01", "2023-01-31", path).build_flow()
+    finally:
+        os.chdir(cwd)
+    return len(paths)
+
+
+def bench_airflow(root: str) -> int:
+    if AIRFLOW_PATH not in sys.path:
+        sys.path.append(AIRFLOW_PATH)
+    try:
+        from airflow.models import DAG
+        import helpers
+    except ImportError as e:
+        raise Skipped(f"airflow is not installed: {e}")
+
+    def dag_constructor(conf, mode, conf_type, team_conf):
+        return DAG(helpers.dag_names(conf, mode, conf_type), start_date=datetime(2023, 1, 1))
+
+    for mode, conf_type in AIRFLOW_TASKS:
+        helpers.walk_and_define_tasks(mode, conf_type, root, dag_constructor, dags={})
+    return sum(len(production_files(root, conf_type)) for _, conf_type in AIRFLOW_TASKS)
+
+
+BENCHMARKS = {
+    "compile": bench_compile,
+    "validator": bench_validator,
+    "explore": bench_explore,
+    "lineage": bench_lineage,
+    "join_backfill": bench_join_backfill,
+    "airflow": bench_airflow,
+}
+
+
+def measure(fn: Callable[[str], int], root: str, repeat: int, memory: bool) -> dict:
+    """returns: confs processed, best wall seconds, confs per second and peak python memory in MB of a benchmark."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = fn(root)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    result = {"items": items, "seconds": round(best, 6), "throughput": round(items / best, 2) if best else None}
+    if memory:
+        # separate run, tracing allocations slows down python severalfold.
+        tracemalloc.start()
+        try:
+            fn(root)
+            result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """returns: the benchmarks whose throughput dropped by more than the tolerance from the baseline."""
+    slower = []
+    for name, result in results.items():
+        expected = baseline.get(name, {}).get("throughput")
+        if expected and result.get("throughput") and result["throughput"] < expected * (1 - tolerance):
+            slower.append(f"{name}: {result['throughput']} confs/s, baseline {expected} confs/s")
+    return slower
+
+
+def run(root: str, names: List[str], repeat: int, memory: bool) -> dict:
+    results = {}
+    for name in names:
+        try:
+            results[name] = measure(BENCHMARKS[name], root, repeat, memory)
+        except Skipped as e:
+            results[name] = {"skipped": str(e)}
+    return results
+
+
+def print_results(results: dict):
+    print(f"{'benchmark':<16}{'confs':>8}{'seconds':>12}{'confs/s':>12}{'peak MB':>10}")
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:<16}skipped, {result['skipped']}")
+            continue
+        peak = f"{result['peak_mb']:.1f}" if "peak_mb" in result else "-"
+        print(f"{name:<16}{result['items']:>8}{result['seconds']:>12.3f}{result['throughput']:>12.1f}{peak:>10}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chronon_root", help="Generate the root in this folder instead of a temporary one.")
+    parser.add_argument("--teams", type=int, default=RepoSpec.teams)
+    parser.add_argument("--staging_queries", type=int, default=RepoSpec.staging_queries, help="Per team.")
+    parser.add_argument("--group_bys", type=int, default=RepoSpec.group_bys, help="Per team.")
+    parser.add_argument("--joins", type=int, default=RepoSpec.joins, help="Per team.")
+    parser.add_argument("--chains", type=int, default=RepoSpec.chains, help="Chained joins per team.")
+    parser.add_argument("--join_parts", type=int, default=RepoSpec.join_parts, help="Group_bys per join.")
+    parser.add_argument("--seed", type=int, default=RepoSpec.seed)
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each benchmark, the best one is reported.")
+    parser.add_argument("--no_memory", action="store_true", help="Skip the memory measurement run.")
+    parser.add_argument("--output", help="Write the results as json to this file.")
+    parser.add_argument("--baseline", help="Results json of a previous run to compare the throughput with.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput drop from the baseline.")
+    args = parser.parse_args(argv)
+    spec = RepoSpec(
+        args.teams, args.staging_queries, args.group_bys, args.joins, args.chains, args.join_parts, args.seed
+    )
+
+    with contextlib.ExitStack() as stack:
+        root = args.chronon_root or stack.enter_context(tempfile.TemporaryDirectory(prefix="chronon_benchmark_"))
+        root = os.path.abspath(root)
+        counts = generate_repo(root, spec)
+        print(f"Generated {sum(counts.values())} python confs in {root}: {counts}")
+        sys.path.insert(0, root)
+        # the other benchmarks read the materialized confs.
+        names = args.benchmarks if "compile" in args.benchmarks else ["compile"] + args.benchmarks
+        logging.disable(logging.WARNING)
+        results = run(root, names, args.repeat, not args.no_memory)
+        logging.disable(logging.NOTSET)
+        results = {name: result for name, result in results.items() if name in args.benchmarks}
+
+    print_results(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"spec": vars(spec), "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["spec"] != vars(spec):
+            print(f"Warning - the baseline was measured on a different repo: {baseline['spec']}")
+        slower = regressions(results, baseline["results"], args.tolerance)
+        for line in slower:
+            print(f"Regression - {line}")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
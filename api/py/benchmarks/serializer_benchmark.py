@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the serialization round-trip check done for every materialized conf.
+
+Compares the per-object cost of `thrift_simple_json_protected` against the previous implementation,
+which compared the round-tripped json with the `diff` binary over temporary files.
+
+    python api/py/benchmarks/serializer_benchmark.py --chronon_root=api/py/test/sample
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from ai.chronon.api.ttypes import GroupBy, Join
+from ai.chronon.repo import GROUP_BY_FOLDER_NAME, JOIN_FOLDER_NAME
+from ai.chronon.repo.serializer import ThriftJSONDecoder, thrift_simple_json, thrift_simple_json_protected
+from ai.chronon.repo.validator import extract_json_confs
+
+
+def legacy_thrift_simple_json_protected(obj, obj_type) -> str:
+    """The round-trip check as it was done with temp files and the `diff` binary."""
+    serialized = thrift_simple_json(obj)
+    thrift_obj = json.loads(serialized, cls=ThriftJSONDecoder, thrift_class=obj_type)
+    actual = thrift_simple_json(thrift_obj)
+    temp_dir = tempfile.mkdtemp()
+    old_path, new_path = os.path.join(temp_dir, "old.json"), os.path.join(temp_dir, "new.json")
+    with open(old_path, mode="w") as old, open(new_path, mode="w") as new:
+        old.write(json.dumps(json.loads(actual), sort_keys=True, indent=2))
+        new.write(json.dumps(json.loads(serialized), sort_keys=True, indent=2))
+    diff = subprocess.run(["diff", old_path, new_path], stdout=subprocess.PIPE).stdout.decode("utf-8")
+    assert len(diff) == 0
+    shutil.rmtree(temp_dir)
+    return serialized
+
+
+def time_per_object(fn, objs, repeat: int) -> float:
+    """returns: mean wall time in microseconds per object."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for obj in objs:
+            fn(obj, type(obj))
+    return (time.perf_counter() - start) * 1e6 / (repeat * len(objs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chronon_root", default=os.getenv("CHRONON_ROOT", os.getcwd()))
+    parser.add_argument("--output_root", default="production")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    production = os.path.join(args.chronon_root, args.output_root)
+    objs = extract_json_confs(GroupBy, os.path.join(production, GROUP_BY_FOLDER_NAME)) + extract_json_confs(
+        Join, os.path.join(production, JOIN_FOLDER_NAME)
+    )
+    assert objs, f"No materialized confs found under {production}"
+    before = time_per_object(legacy_thrift_simple_json_protected, objs, args.repeat)
+    after = time_per_object(thrift_simple_json_protected, objs, args.repeat)
+    print(f"objects: {len(objs)}, repeat: {args.repeat}")
+    print(f"{'temp files + diff':>20}: {before:10.1f} us/object")
+    print(f"{'in process':>20}: {after:10.1f} us/object")
+    print(f"{'speedup':>20}: {before / after:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
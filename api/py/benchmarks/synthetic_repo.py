@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Generator of synthetic chronon roots, shaped after the confs of api/py/test/sample.
+
+Every team gets an event source, staging queries with entity sources on their output, event and entity group_bys
+with windows and derivations, joins over them, some with a part from the previous team, and chains of a parent
+join, a group_by with the parent join as source and a join over that group_by.
+
+    python api/py/benchmarks/synthetic_repo.py /tmp/synthetic_root --teams 20 --group_bys 50
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import argparse
+import json
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict, List
+
+LICENSE = """#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+
+OPERATIONS = ["SUM", "COUNT", "AVERAGE", "MAX", "MIN", "LAST"]
+WINDOWS = [1, 3, 7, 14, 30, 90]
+
+
+@dataclass
+class RepoSpec:
+    teams: int = 4
+    staging_queries: int = 2
+    # group_bys per team, a third of them on the entity sources of the staging queries.
+    group_bys: int = 10
+    joins: int = 3
+    # parent join, chained group_by and join triples per team.
+    chains: int = 1
+    # group_bys joined by each join.
+    join_parts: int = 4
+    seed: int = 0
+
+
+def team_name(index: int) -> str:
+    return f"team_{index:03d}"
+
+
+def _write(root: str, rel_path: str, content: str):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _conf(imports: List[str], body: str) -> str:
+    return LICENSE + "\n" + "\n".join(imports) + "\n\n" + body
+
+
+def _teams_json(spec: RepoSpec) -> dict:
+    with open(os.path.join(os.path.dirname(__file__), "..", "test", "sample", "teams.json")) as f:
+        default = json.load(f)["default"]
+    teams = {"default": default}
+    for i in range(spec.teams):
+        teams[team_name(i)] = {
+            "description": f"Synthetic team {i}",
+            "namespace": f"{team_name(i)}_db",
+            "user": team_name(i),
+        }
+    return teams
+
+
+def _sources(team: str, spec: RepoSpec) -> str:
+    imports = [
+        "from ai.chronon.api import ttypes",
+        "from ai.chronon.query import Query, select",
+        "from ai.chronon.utils import get_staging_query_output_table_name",
+    ] + [f"from staging_queries.{team} import sq_{k}" for k in range(spec.staging_queries)]
+    body = f"""events = ttypes.Source(events=ttypes.EventSource(
+    table="{team}_db.events",
+    topic="{team}_events",
+    query=Query(
+        selects=select(
+            user_id="user_id",
+            item_id="item_id",
+            amount="CAST(amount AS DOUBLE)",
+            event="event_type",
+        ),
+        start_partition="2023-01-01",
+        time_column="ts",
+    ),
+))
+"""
+    for k in range(spec.staging_queries):
+        body += f"""
+sq_{k}_entities = ttypes.Source(entities=ttypes.EntitySource(
+    snapshotTable="{team}_db.{{}}".format(get_staging_query_output_table_name(sq_{k}.v1)),
+    query=Query(
+        selects=select(user_id="user_id", score="score", amount="amount"),
+        start_partition="2023-01-01",
+    ),
+))
+"""
+    return _conf(imports, body)
+
+
+def _staging_query(team: str, k: int) -> str:
+    body = f'''query = """
+SELECT
+    user_id,
+    AVG(score) AS score,
+    SUM(amount) AS amount,
+    ds
+FROM {team}_db.user_activity_{k}
+WHERE ds BETWEEN '{{{{ start_date }}}}' AND '{{{{ end_date }}}}'
+GROUP BY user_id, ds
+"""
+
+v1 = StagingQuery(
+    query=query,
+    startPartition="2023-01-01",
+    metaData=MetaData(
+        outputNamespace="{team}_db",
+        dependencies=["{team}_db.user_activity_{k}/ds={{{{ ds }}}}"],
+        tableProperties={{"source": "synthetic"}},
+    ),
+)
+'''
+    return _conf(["from ai.chronon.api.ttypes import MetaData, StagingQuery"], body)
+
+
+def _aggregation(rng: random.Random, input_column: str) -> str:
+    operation = rng.choice(OPERATIONS)
+    windows = sorted(rng.sample(WINDOWS, rng.randint(1, 3)))
+    windows_arg = ", ".join(f"Window(length={w}, timeUnit=TimeUnit.DAYS)" for w in windows)
+    return (
+        f'        Aggregation(input_column="{input_column}", operation=Operation.{operation}, '
+        f"windows=[{windows_arg}]),\n"
+    )
+
+
+def _group_by(team: str, k: int, spec: RepoSpec, rng: random.Random) -> str:
+    imports = [
+        "from ai.chronon.group_by import Aggregation, Derivation, GroupBy, Operation, TimeUnit, Window",
+        f"from sources import {team}",
+    ]
+    entity = spec.staging_queries and k % 3 == 2
+    if entity:
+        source = f"{team}.sq_{k % spec.staging_queries}_entities"
+        # snapshot aggregations, without windows.
+        aggregations = (
+            '        Aggregation(input_column="score", operation=Operation.MAX),\n'
+            '        Aggregation(input_column="amount", operation=Operation.SUM),\n'
+        )
+    else:
+        source = f"{team}.events"
+        aggregations = '        Aggregation(input_column="amount", operation=Operation.SUM),\n'
+        aggregations += "".join(_aggregation(rng, rng.choice(["amount", "item_id"])) for _ in range(rng.randint(1, 4)))
+    derivations = ""
+    if k % 4 == 0:
+        derivations = """    derivations=[
+        Derivation(name="*", expression="*"),
+        Derivation(name="total_amount", expression="amount_sum"),
+        Derivation(name="half_amount", expression="amount_sum / 2"),
+    ],
+"""
+    body = f"""v1 = GroupBy(
+    sources={source},
+    keys=["user_id"],
+    aggregations=[
+{aggregations}    ],
+{derivations}    online={k % 2 == 0},
+    output_namespace="{team}_db",
+    table_properties={{"source": "synthetic"}},
+)
+"""
+    return _conf(imports, body)
+
+
+def _online_group_bys(spec: RepoSpec) -> List[int]:
+    return [k for k in range(spec.group_bys) if k % 2 == 0]
+
+
+def _join_parts(team: str, group_bys: List[int], previous_team: str = None) -> str:
+    parts = "".join(f"        JoinPart(group_by=gb_{k}.v1, prefix=\"{team}_{k}\"),\n" for k in group_bys)
+    if previous_team:
+        parts += f'        JoinPart(group_by=gb_0_{previous_team}.v1, prefix="{previous_team}_0"),\n'
+    return parts
+
+
+def _join_imports(team: str, group_bys: List[int], previous_team: str = None) -> List[str]:
+    imports = ["from ai.chronon.join import Derivation, Join, JoinPart", f"from sources import {team}"]
+    imports += [f"from group_bys.{team} import gb_{k}" for k in sorted(set(group_bys))]
+    if previous_team:
+        imports.append(f"from group_bys.{previous_team} import gb_0 as gb_0_{previous_team}")
+    return imports
+
+
+def _join(team: str, k: int, spec: RepoSpec, rng: random.Random, previous_team: str = None) -> str:
+    online = k % 2 == 0
+    candidates = _online_group_bys(spec) if online else list(range(spec.group_bys))
+    group_bys = sorted(rng.sample(candidates, min(spec.join_parts, len(candidates))))
+    derivations = ""
+    if k % 3 == 0:
+        derivations = """    derivations=[
+        Derivation(name="*", expression="*"),
+        Derivation(name="has_event", expression="event IS NOT NULL"),
+    ],
+"""
+    body = f"""v1 = Join(
+    left={team}.events,
+    right_parts=[
+{_join_parts(team, group_bys, previous_team)}    ],
+{derivations}    online={online},
+    output_namespace="{team}_db",
+)
+"""
+    return _conf(_join_imports(team, group_bys, previous_team), body)
+
+
+def _parent_join(team: str, k: int, spec: RepoSpec, rng: random.Random) -> str:
+    candidates = _online_group_bys(spec)
+    group_bys = sorted(rng.sample(candidates, min(spec.join_parts, len(candidates))))
+    body = f"""v1 = Join(
+    left={team}.events,
+    right_parts=[
+{_join_parts(team, group_bys)}    ],
+    online=True,
+    check_consistency=True,
+    historical_backfill=False,
+    output_namespace="{team}_db",
+)
+"""
+    return _conf(_join_imports(team, group_bys), body)
+
+
+def _chained_group_by(team: str, k: int) -> str:
+    imports = [
+        "from ai.chronon.api import ttypes",
+        "from ai.chronon.group_by import Accuracy, Aggregation, GroupBy, Operation, TimeUnit, Window",
+        "from ai.chronon.query import Query, select",
+        f"from joins.{team} import parent_{k}",
+    ]
+    body = f"""v1 = GroupBy(
+    sources=ttypes.Source(
+        joinSource=ttypes.JoinSource(
+            join=parent_{k}.v1,
+            query=Query(
+                selects=select(user_id="user_id", amount="amount", event="event"),
+                start_partition="2023-06-01",
+                time_column="ts",
+            ),
+        )
+    ),
+    keys=["user_id"],
+    aggregations=[
+        Aggregation(input_column="event", operation=Operation.LAST),
+        Aggregation(input_column="amount", operation=Operation.SUM, windows=[Window(length=1, timeUnit=TimeUnit.DAYS)]),
+    ],
+    accuracy=Accuracy.TEMPORAL,
+    online=True,
+    output_namespace="{team}_db",
+)
+"""
+    return _conf(imports, body)
+
+
+def _chained_join(team: str, k: int) -> str:
+    imports = [
+        "from ai.chronon.join import Join, JoinPart",
+        f"from sources import {team}",
+        f"from group_bys.{team} import chained_{k}",
+    ]
+    body = f"""v1 = Join(
+    left={team}.events,
+    right_parts=[JoinPart(group_by=chained_{k}.v1)],
+    online=True,
+    output_namespace="{team}_db",
+)
+"""
+    return _conf(imports, body)
+
+
+def generate_repo(root: str, spec: RepoSpec) -> Dict[str, int]:
+    """
+    Writes the python confs and teams.json of a chronon root. The same spec always generates the same root.
+
+    returns:
+        number of python conf files per conf folder.
+    """
+    rng = random.Random(spec.seed)
+    counts = {"staging_queries": 0, "group_bys": 0, "joins": 0}
+    for folder in ["sources"] + list(counts):
+        _write(root, os.path.join(folder, "__init__.py"), "")
+    with open(os.path.join(root, "teams.json"), "w") as f:
+        json.dump(_teams_json(spec), f, indent=4)
+    for i in range(spec.teams):
+        team = team_name(i)
+        # every other team joins a group_by of the previous team.
+        previous_team = team_name(i - 1) if i % 2 == 1 and spec.group_bys else None
+        for folder in counts:
+            _write(root, os.path.join(folder, team, "__init__.py"), "")
+        _write(root, os.path.join("sources", f"{team}.py"), _sources(team, spec))
+        files = {}
+        for k in range(spec.staging_queries):
+            files[os.path.join("staging_queries", team, f"sq_{k}.py")] = _staging_query(team, k)
+        for k in range(spec.group_bys):
+            files[os.path.join("group_bys", team, f"gb_{k}.py")] = _group_by(team, k, spec, rng)
+        if spec.group_bys:
+            for k in range(spec.joins):
+                files[os.path.join("joins", team, f"join_{k}.py")] = _join(
+                    team, k, spec, rng, previous_team if k == 0 else None
+                )
+            for k in range(spec.chains):
+                files[os.path.join("joins", team, f"parent_{k}.py")] = _parent_join(team, k, spec, rng)
+                files[os.path.join("group_bys", team, f"chained_{k}.py")] = _chained_group_by(team, k)
+                files[os.path.join("joins", team, f"chained_{k}.py")] = _chained_join(team, k)
+        for rel_path, content in files.items():
+            _write(root, rel_path, content)
+            counts[rel_path.split(os.sep)[0]] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="Folder to generate the chronon root in.")
+    parser.add_argument("--teams", type=int, default=RepoSpec.teams)
+    parser.add_argument("--staging_queries", type=int, default=RepoSpec.staging_queries, help="Per team.")
+    parser.add_argument("--group_bys", type=int, default=RepoSpec.group_bys, help="Per team.")
+    parser.add_argument("--joins", type=int, default=RepoSpec.joins, help="Per team.")
+    parser.add_argument("--chains", type=int, default=RepoSpec.chains, help="Chained joins per team.")
+    parser.add_argument("--join_parts", type=int, default=RepoSpec.join_parts, help="Group_bys per join.")
+    parser.add_argument("--seed", type=int, default=RepoSpec.seed)
+    args = parser.parse_args()
+    spec = RepoSpec(**{k: v for k, v in vars(args).items() if k != "root"})
+    counts = generate_repo(args.root, spec)
+    for folder, count in counts.items():
+        print(f"{folder + ':':<18}{count:>8} files")
+
+
+if __name__ == "__main__":
+    main()
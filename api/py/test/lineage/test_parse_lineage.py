@@ -12,7 +12,10 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import json
 import os
+import shutil
+import tempfile
 import unittest
 
 from ai.chronon.lineage.lineage_parser import LineageParser, build_lineage
@@ -29,6 +32,22 @@ class TestParseLineage(unittest.TestCase):
         for attr in attributes:
             self.assertGreater(len(getattr(metadata, attr)), 0, f"{attr} should not be empty")
 
+    def test_parse_config_without_output_namespace(self):
+        # the output table is then in the namespace of the team.
+        with tempfile.TemporaryDirectory() as root:
+            shutil.copy(os.path.join(TEST_BASE_PATH, "teams.json"), root)
+            conf_path = "production/group_bys/sample_team/event_sample_group_by.v1"
+            os.makedirs(os.path.dirname(os.path.join(root, conf_path)))
+            with open(os.path.join(TEST_BASE_PATH, conf_path)) as infile:
+                conf = json.load(infile)
+            del conf["metaData"]["outputNamespace"]
+            with open(os.path.join(root, conf_path), "w") as outfile:
+                json.dump(conf, outfile)
+
+            metadata = LineageParser().parse_lineage(root)
+        self.assertEqual([], metadata.unparsed_configs["group_bys"])
+        self.assertIn("chronon_db.sample_team_event_sample_group_by_v1", metadata.tables)
+
     def test_cannot_parse_lineage(self):
         # Can't parse lineage since there is no specific column.
         lineage = build_lineage("output", "SELECT COUNT(*) AS a FROM input")
@@ -19,6 +19,12 @@ Run the flow for materialize.
 import json
 import os
 import re
+import shutil
+import subprocess
+import sys
+import ai.chronon.repo.compile as compile_module
+import ai.chronon.repo.extract_objects as eo
+import ai.chronon.utils as utils
 import pytest
 from ai.chronon.api.ttypes import GroupBy, Join
 from ai.chronon.repo.compile import extract_and_convert
@@ -398,3 +404,205 @@ def test_compile_inline_group_by():
         join = json2thrift(file.read(), Join)
         assert len(join.joinParts) == 1
         assert join.joinParts[0].groupBy.metaData.team == "unit_test"
+
+
+@pytest.mark.parametrize("input_path", ["group_bys/quickstart", "group_bys/sample_team", "joins/sample_team"])
+def test_parallel_compile_matches_serial(input_path, tmp_path):
+    """
+    Compiling a folder with a process pool should produce the same output and materialized files as a serial run,
+    including for files sharing modules, which change the objects of each other.
+    """
+    runner = CliRunner()
+    command = ["--chronon_root=api/py/test/sample", f"--input_path={input_path}/", "--force-overwrite"]
+    production = _get_full_file_path("sample/production")
+    backup = str(tmp_path / "production")
+    shutil.copytree(production, backup)
+
+    def _materialized():
+        return {
+            os.path.relpath(os.path.join(sub_root, f), production): open(os.path.join(sub_root, f)).read()
+            for sub_root, _, files in os.walk(production)
+            for f in files
+        }
+
+    def _restore():
+        shutil.rmtree(production)
+        shutil.copytree(backup, production)
+
+    try:
+        serial = runner.invoke(extract_and_convert, command)
+        serial_files = _materialized()
+        _restore()
+
+        parallel = runner.invoke(extract_and_convert, command + ["--workers=2"])
+        assert parallel.exit_code == serial.exit_code
+        assert repr(parallel.exception) == repr(serial.exception)
+        assert parallel.output == serial.output
+        parallel_files = _materialized()
+        assert sorted(parallel_files) == sorted(serial_files)
+        for file_name, content in serial_files.items():
+            assert parallel_files[file_name] == content, f"{file_name} differs between serial and parallel compile"
+    finally:
+        _restore()
+
+
+def test_changed_since_affected_files():
+    root = "api/py/test/sample"
+    changed = [os.path.join(root, "group_bys/sample_team/sample_group_by.py")]
+    affected = compile_module._get_affected_files(root, "production", changed, None)
+    assert list(affected.keys()) == ["staging_queries", "group_bys", "joins"]
+    assert sorted(os.path.relpath(f, root) for f in affected["group_bys"]) == [
+        "group_bys/sample_team/sample_group_by.py",
+        "group_bys/sample_team/sample_group_by_from_join_part.py",
+        "group_bys/sample_team/sample_group_by_group_by.py",
+    ]
+    assert "joins/sample_team/sample_join.py" in [os.path.relpath(f, root) for f in affected["joins"]]
+    scoped = compile_module._get_affected_files(root, "production", changed, "joins/unit_test")
+    assert not any(scoped.values())
+
+
+def test_get_changed_files(tmp_path):
+    if shutil.which("git") is None:
+        pytest.skip("git is not available")
+    root = str(tmp_path)
+
+    def git(*args):
+        subprocess.check_call(["git", "-c", "user.name=test", "-c", "user.email=test@test", *args], cwd=root)
+
+    git("init", "-q")
+    for name in ["unchanged.py", "modified.py"]:
+        with open(os.path.join(root, name), "w") as f:
+            f.write("x = 1\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "init")
+    with open(os.path.join(root, "modified.py"), "a") as f:
+        f.write("y = 2\n")
+    with open(os.path.join(root, "new.py"), "w") as f:
+        f.write("z = 3\n")
+    changed = compile_module._get_changed_files(root, "HEAD")
+    assert [os.path.basename(f) for f in changed] == ["modified.py", "new.py"]
+
+
+def test_input_path_required_without_changed_since():
+    runner = CliRunner()
+    result = runner.invoke(extract_and_convert, ["--chronon_root=api/py/test/sample"])
+    assert result.exit_code != 0
+    assert "--input_path" in result.output
+
+
+def test_profile_report(tmp_path):
+    runner = CliRunner()
+    report_path = os.path.join(str(tmp_path), "profile.json")
+    result = _invoke_cli_with_params(
+        runner,
+        "staging_queries/sample_team/sample_staging_query.py",
+        ["--profile", f"--profile-output={report_path}", "--profile-top=1"],
+    )
+    assert result.exit_code == 0
+    assert "Slowest Confs" in result.output
+    with open(report_path) as f:
+        report = json.load(f)
+    assert {"import", "validate", "serialize", "write"} <= set(report["phases"])
+    conf = report["confs"]["sample_team.sample_staging_query.v1"]
+    assert {"validate", "serialize", "write"} <= set(conf["phases"])
+    assert conf["wall"] >= conf["phases"]["serialize"]["wall"]
+    assert list(report["files"]) == ["staging_queries/sample_team/sample_staging_query.py"]
+
+
+def test_identical_output_is_not_rewritten():
+    runner = CliRunner()
+    input_path = "staging_queries/sample_team/sample_staging_query.py"
+    output_file = _get_full_file_path("sample/production/staging_queries/sample_team/sample_staging_query.v1")
+    result = _invoke_cli_with_params(runner, input_path)
+    assert result.exit_code == 0
+    os.utime(output_file, ns=(0, 0))
+
+    result = _invoke_cli_with_params(runner, input_path)
+    assert result.exit_code == 0
+    assert "0 written, 1 unchanged, 0 skipped" in result.output
+    assert os.stat(output_file).st_mtime_ns == 0
+    assert not [f for f in os.listdir(os.path.dirname(output_file)) if f.endswith(".tmp")]
+
+
+def test_compile_in_dependency_order(capsys, monkeypatch):
+    root = "api/py/test/sample"
+    monkeypatch.setattr(utils, "chronon_root_path", root)
+    eo.unload_conf_modules()
+    executed = []
+    register_module = eo._register_module
+
+    def _register_executed_module(module):
+        executed.append(module.__name__)
+        register_module(module)
+
+    monkeypatch.setattr(eo, "_register_module", _register_executed_module)
+    compile_module._compile_in_dependency_order(
+        root,
+        {
+            "staging_queries": [os.path.join(root, "staging_queries/sample_team/sample_staging_query.py")],
+            "group_bys": [os.path.join(root, "group_bys/unit_test/sample_chaining_group_by.py")],
+            "joins": [os.path.join(root, "joins/unit_test/sample_parent_join.py")],
+        },
+        "production",
+        False,
+        False,
+        False,
+        1,
+        False,
+    )
+    output = capsys.readouterr().out
+    passes = re.findall(r"Compiling ([a-z_ ]+) - \x1b\[34m(\d+)", output)
+    assert passes == [("staging_queries", "1"), ("group_bys", "0"), ("joins", "1"), ("chained group_bys", "1")]
+    # the chaining group_by downstream of the join is compiled by the same run, so it isn't a missing dependency.
+    assert "Detected dependencies" not in output
+    # the passes share the imported conf modules, which compile leaves as defined.
+    assert len(executed) == len(set(executed))
+    parent_join = sys.modules["joins.unit_test.sample_parent_join"].parent_join
+    assert parent_join.metaData.tableProperties is None
+    assert all(jp.groupBy.metaData.tableProperties is None for jp in parent_join.joinParts)
+
+
+def test_chained_group_by_files_are_found_statically(monkeypatch):
+    root = "api/py/test/sample"
+    eo.unload_conf_modules()
+    monkeypatch.setattr(eo, "_register_module", lambda module: pytest.fail(f"{module.__name__} was executed"))
+    group_by_files = [
+        os.path.join(root, "group_bys/sample_team/sample_group_by.py"),
+        os.path.join(root, "group_bys/sample_team/sample_chaining_group_by.py"),
+        os.path.join(root, "group_bys/unit_test/sample_chaining_group_by.py"),
+    ]
+    assert compile_module._get_chained_group_by_files(root, group_by_files) == group_by_files[1:]
+
+
+def test_all_rejects_input_path():
+    runner = CliRunner()
+    result = _invoke_cli_with_params(runner, "group_bys/sample_team", ["--all"])
+    assert result.exit_code != 0
+    assert "--all can't be combined" in result.output
+
+
+@pytest.mark.parametrize("copy_objs", [False, True])
+def test_invalid_select_fails_folder_compile(copy_objs, monkeypatch):
+    # a group_by of the folder adds a `None` select to a source shared with the other group_bys.
+    root = "api/py/test/sample"
+    monkeypatch.setattr(utils, "chronon_root_path", root)
+    output_dir = os.path.join(root, "production/group_bys/sample_team")
+    existing = set(os.listdir(output_dir))
+    try:
+        with pytest.raises(TypeError, match="Invalid value for thrift field type STRING: None"):
+            compile_module._compile_files(
+                root,
+                GroupBy,
+                eo.get_python_files(os.path.join(root, "group_bys/sample_team")),
+                True,
+                "production",
+                False,
+                False,
+                False,
+                1,
+                False,
+                copy_objs=copy_objs,
+            )
+    finally:
+        for f in set(os.listdir(output_dir)) - existing:
+            os.remove(os.path.join(output_dir, f))
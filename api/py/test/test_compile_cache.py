@@ -0,0 +1,66 @@
+"""
+Test the incremental compile cache.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import os
+import shutil
+
+import pytest
+from ai.chronon.repo import COMPILE_CACHE_FILE_PATH
+from ai.chronon.repo.compile import extract_and_convert
+from ai.chronon.repo.compile_cache import get_local_imports
+from click.testing import CliRunner
+
+
+@pytest.fixture
+def quickstart_output(repo):
+    output_dir = os.path.join(repo, "production/group_bys/quickstart")
+    yield output_dir
+    shutil.rmtree(output_dir, ignore_errors=True)
+    shutil.rmtree(os.path.dirname(os.path.join(repo, COMPILE_CACHE_FILE_PATH)), ignore_errors=True)
+
+
+def test_get_local_imports(repo):
+    imports = get_local_imports(repo, os.path.join(repo, "joins/sample_team/sample_join.py"))
+    assert [os.path.relpath(path, repo) for path in imports] == [
+        "group_bys/sample_team/sample_group_by.py",
+        "group_bys/sample_team/sample_group_by_group_by.py",
+        "sources/test_sources.py",
+        "staging_queries/sample_team/sample_staging_query.py",
+    ]
+
+
+def test_incremental_compile_reuses_materialized_output(quickstart_output):
+    runner = CliRunner()
+    command = ["--chronon_root=api/py/test/sample", "--input_path=group_bys/quickstart/", "--incremental"]
+    result = runner.invoke(extract_and_convert, command)
+    assert result.exit_code == 0
+    assert "0 hits, 4 misses" in result.output
+    materialized = sorted(os.listdir(quickstart_output))
+    assert materialized
+
+    result = runner.invoke(extract_and_convert, command)
+    assert result.exit_code == 0
+    assert "4 hits, 0 misses" in result.output
+    assert "Writing GroupBy" not in result.output
+
+    # A modified materialized file invalidates the entry that produced it.
+    with open(os.path.join(quickstart_output, materialized[0]), "a") as f:
+        f.write("\n")
+    result = runner.invoke(extract_and_convert, command)
+    assert result.exit_code == 0
+    assert "3 hits, 1 misses" in result.output
@@ -0,0 +1,77 @@
+"""
+Test the change tracking of compile --watch.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import importlib
+import os
+import sys
+
+import ai.chronon.repo.compile as compile_module
+from ai.chronon.repo.compile_watcher import CompileWatcher
+
+
+def _write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_poll_and_unload(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    package = os.path.join(root, "watched_pkg")
+    os.makedirs(package)
+    _write(os.path.join(package, "__init__.py"), "")
+    _write(os.path.join(package, "helpers.py"), "value = 1\n")
+    _write(os.path.join(package, "conf.py"), "from watched_pkg.helpers import value\n")
+    _write(os.path.join(package, "other.py"), "value = 3\n")
+    monkeypatch.syspath_prepend(root)
+    for name in ["watched_pkg.conf", "watched_pkg.other"]:
+        importlib.import_module(name)
+    other = sys.modules["watched_pkg.other"]
+    try:
+        watcher = CompileWatcher(root, "production")
+        assert watcher.poll() == []
+
+        helpers = os.path.join(package, "helpers.py")
+        _write(helpers, "value = 2\n")
+        os.utime(helpers, ns=(0, 0))
+        added = os.path.join(package, "added.py")
+        _write(added, "import watched_pkg.conf\n")
+        assert watcher.poll() == [added, helpers]
+        assert watcher.unload([added, helpers], []) == ["watched_pkg.conf", "watched_pkg.helpers"]
+        from watched_pkg import conf
+
+        assert conf.value == 2
+        assert sys.modules["watched_pkg.other"] is other
+    finally:
+        for name in [name for name in sys.modules if name.split(".")[0] == "watched_pkg"]:
+            del sys.modules[name]
+
+
+def test_recompile_changes(repo):
+    watcher = CompileWatcher(repo, "production")
+    changed = os.path.join(watcher.chronon_root_path, "staging_queries", "sample_team", "sample_staging_query.py")
+    module_name = "staging_queries.sample_team.sample_staging_query"
+    importlib.import_module(module_name)
+    module = sys.modules[module_name]
+    affected = compile_module._recompile_changes(
+        watcher, [changed], "staging_queries", "production", False, False, False
+    )
+    assert affected == {"staging_queries": [changed], "group_bys": [], "joins": []}
+    assert sys.modules[module_name] is not module
+    assert os.path.isfile(
+        os.path.join(repo, "production", "staging_queries", "sample_team", "sample_staging_query.v1")
+    )
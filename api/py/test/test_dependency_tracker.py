@@ -17,6 +17,7 @@ Test dependency tracker
 #     limitations under the License.
 
 import pytest
+from ai.chronon.api.ttypes import Join
 from ai.chronon.repo import dependency_tracker
 
 
@@ -51,3 +52,26 @@ def test_get_join_dependency(test_dependency_tracker):
     downstream = test_dependency_tracker.get_downstream(conf_path)
     assert len(downstream) == 1
     assert "sample_team.sample_chaining_group_by" in [d.metaData.name for d in downstream]
+
+
+def test_get_staging_query_dependency_names(test_dependency_tracker):
+    conf_path = "staging_queries/sample_team/sample_staging_query.v1"
+    downstream = test_dependency_tracker.get_downstream_names(conf_path)
+    assert "sample_team.sample_join.v1" in downstream
+    assert downstream == sorted(downstream)
+
+
+def test_get_transitive_dependency_names(test_dependency_tracker):
+    conf_path = "joins/sample_team/sample_chaining_join.parent_join"
+    downstream = test_dependency_tracker.get_transitive_downstream_names(conf_path)
+    assert downstream == ["sample_team.sample_chaining_group_by", "sample_team.sample_chaining_join.v1"]
+
+
+def test_dependency_graph_update(test_dependency_tracker):
+    graph = test_dependency_tracker.graph
+    node = ("GroupBy", "sample_team.sample_group_by_for_dependency_test.v1")
+    entry = dict(test_dependency_tracker.manifest.find(Join, "sample_team.sample_join_for_dependency_test.v1"))
+    assert graph.downstream(node) == [("Join", entry["name"])]
+    graph.add(dict(entry, group_bys=[]))
+    assert graph.downstream(node) == []
+    assert graph.transitive_downstream(node) == []
@@ -40,3 +40,18 @@ def test_basic_flow(teams_json, rootdir, keyword):
     group_bys = find_in_index(gb_index, keyword)
     display_entries(group_bys, keyword, root=root, trim_paths=True)
     assert len(group_bys) > 0
+
+
+def test_index_ignores_stale_manifest(teams_json, rootdir, tmp_path):
+    import json
+    import shutil
+
+    teams = load_team_data(teams_json)
+    root = str(tmp_path / "sample")
+    shutil.copytree(os.path.join(rootdir, "sample", "production"), os.path.join(root, "production"))
+    expected = build_index("group_bys", GB_INDEX_SPEC, root=root, teams=teams)
+    # a manifest left behind by another branch, or a compile that failed before saving it.
+    with open(os.path.join(root, "production_manifest.json"), "w") as f:
+        json.dump({"confs": {"group_bys/sample_team/event_sample_group_by.v1": {"online": False}}}, f)
+    assert build_index("group_bys", GB_INDEX_SPEC, root=root, teams=teams).keys() == expected.keys()
+    assert len(expected) > 1
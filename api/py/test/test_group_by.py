@@ -274,3 +274,16 @@ def test_additional_metadata():
         tags={"to_deprecate": True}
     )
     assert json.loads(gb.metaData.customJson)['groupby_tags']['to_deprecate']
+
+
+def test_team_from_caller_folder():
+    kwargs = {
+        "sources": [ttypes.EventSource(table="event_table1", query=query.Query(selects=None, time_column="ts"))],
+        "keys": ["key1"],
+        "aggregations": [group_by.Aggregation(input_column="event_id", operation=ttypes.Operation.SUM)],
+    }
+    assert group_by.GroupBy(**kwargs).metaData.team == "test"
+    # the team is the folder of the module calling GroupBy.
+    namespace = {"group_by": group_by, "kwargs": kwargs}
+    exec(compile("gb = group_by.GroupBy(**kwargs)", "/confs/some_team/some_conf.py", "exec"), namespace)
+    assert namespace["gb"].metaData.team == "some_team"
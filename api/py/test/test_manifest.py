@@ -0,0 +1,108 @@
+"""
+Test the manifest of materialized confs.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import json
+import os
+import shutil
+
+import ai.chronon.repo.manifest as manifest_module
+import pytest
+from ai.chronon.api.ttypes import GroupBy, Join, StagingQuery
+from ai.chronon.repo.manifest import RepoManifest, manifest_path
+from ai.chronon.repo.serializer import file2thrift
+
+
+@pytest.fixture
+def output_root(repo, tmp_path):
+    path = os.path.join(str(tmp_path), "production")
+    shutil.copytree(os.path.join(repo, "production"), path)
+    return path
+
+
+def test_manifest_entries(output_root):
+    manifest = RepoManifest(output_root).refresh()
+    join_path = os.path.join("joins", "sample_team", "sample_join_for_dependency_test.v1")
+    entry = manifest.get(join_path)
+    assert entry["name"] == "sample_team.sample_join_for_dependency_test.v1"
+    assert entry["type"] == "Join"
+    assert entry["team"] == "sample_team"
+    assert entry["group_bys"] == ["sample_team.sample_group_by_for_dependency_test.v1"]
+    assert entry["output_columns"] == ["sample_team_sample_group_by_for_dependency_test_v1_event_sum"]
+    assert "chronon_db.sample_team_sample_join_for_dependency_test_v1" in entry["output_tables"]
+    assert manifest.find(Join, entry["name"]) == entry
+    assert manifest.load_conf(entry) == file2thrift(os.path.join(output_root, join_path), Join)
+
+    chaining = manifest.find(GroupBy, "sample_team.sample_chaining_group_by")
+    assert chaining["joins"] == ["sample_team.sample_chaining_join.parent_join"]
+    assert all(entry["type"] == "StagingQuery" for entry in manifest.confs(StagingQuery))
+    assert len(manifest.confs(GroupBy)) + len(manifest.confs(Join)) + len(manifest.confs(StagingQuery)) == len(
+        manifest.entries
+    )
+
+
+def test_manifest_incremental_refresh(output_root, monkeypatch):
+    manifest = RepoManifest(output_root).refresh()
+    manifest.save()
+    assert os.path.exists(manifest_path(output_root))
+    with open(manifest_path(output_root)) as f:
+        assert len(json.load(f)["confs"]) == len(manifest.entries)
+
+    group_by_path = os.path.join("group_bys", "sample_team", "event_sample_group_by.v1")
+    with open(os.path.join(output_root, group_by_path)) as f:
+        group_by = json.load(f)
+    group_by["metaData"]["production"] = 1
+    with open(os.path.join(output_root, group_by_path), "w") as f:
+        json.dump(group_by, f)
+    join_path = os.path.join("joins", "sample_team", "sample_join_for_dependency_test.v1")
+    os.remove(os.path.join(output_root, join_path))
+
+    decoded = []
+    json2thrift = manifest_module.json2thrift
+    monkeypatch.setattr(manifest_module, "json2thrift", lambda *args: decoded.append(args) or json2thrift(*args))
+    reloaded = RepoManifest(output_root).refresh()
+    # only the modified conf is decoded again.
+    assert len(decoded) == 1
+    assert reloaded.get(group_by_path)["production"] is True
+    assert reloaded.get(join_path) is None
+    assert reloaded.find(Join, "sample_team.sample_join_for_dependency_test.v1") is None
+
+
+def test_manifest_file_stat(output_root):
+    manifest = RepoManifest(output_root).refresh()
+    group_by_path = os.path.join("group_bys", "sample_team", "event_sample_group_by.v1")
+    full_path = os.path.join(output_root, group_by_path)
+    assert manifest.get(group_by_path)["mtime_ns"] == os.stat(full_path).st_mtime_ns
+    assert manifest.get(group_by_path)["size"] == os.stat(full_path).st_size
+    manifest.save()
+
+    # rewritten with the same content, the entry is kept with the new modification time.
+    os.utime(full_path, ns=(0, 0))
+    reloaded = RepoManifest(output_root).refresh()
+    assert reloaded.get(group_by_path)["mtime_ns"] == 0
+    assert reloaded.get(group_by_path)["hash"] == manifest.get(group_by_path)["hash"]
+
+
+def test_manifest_update(output_root):
+    manifest = RepoManifest(output_root).refresh()
+    join_path = os.path.join("joins", "sample_team", "sample_join_for_dependency_test.v1")
+    join = manifest.load_conf(manifest.get(join_path))
+    join.metaData.online = True
+    manifest.update(join, os.path.join(output_root, join_path), "{}")
+    assert manifest.get(join_path)["online"] is True
+    manifest.save()
+    assert RepoManifest(output_root).get(join_path)["online"] is True
@@ -0,0 +1,44 @@
+"""
+Test the synthetic repo benchmark runs end to end on a small generated repo.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import json
+import os
+import subprocess
+import sys
+
+BENCHMARK = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "repo_benchmark.py")
+
+
+def test_repo_benchmark(tmp_path):
+    output = str(tmp_path / "results.json")
+    root = str(tmp_path / "root")
+    # a separate process, the generated conf modules would clash with the ones of the sample repo.
+    env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), ".."))
+    args = ["--teams", "2", "--group_bys", "4", "--repeat", "1", "--no_memory", "--chronon_root", root]
+    subprocess.run(
+        [sys.executable, BENCHMARK, *args, "--benchmarks", "validator", "explore", "join_backfill", "--output", output],
+        env=env,
+        check=True,
+    )
+    with open(output) as f:
+        results = json.load(f)["results"]
+    assert sorted(results) == ["explore", "join_backfill", "validator"]
+    # 2 staging queries, 4 group_bys, 1 chained group_by and 5 joins per team.
+    assert results["validator"]["items"] == 2 * (2 + 5 + 5)
+    assert results["join_backfill"]["items"] == 2 * 5
+    assert os.path.isfile(os.path.join(root, "production", "joins", "team_001", "chained_0.v1"))
@@ -17,9 +17,15 @@ Basic tests for namespace and breaking changes in run.py
 #     limitations under the License.
 
 import argparse
+import functools
+import hashlib
+import http.server
 import json
 import os
+import subprocess
+import threading
 import time
+import urllib.error
 
 import pytest
 from ai.chronon.repo import run
@@ -79,6 +85,107 @@ def test_download_jar(monkeypatch, sleepless):
         run.download_jar("version", jar_type="uber", release_tag=None, spark_version="2.1.0")
 
 
+@pytest.fixture
+def maven_server(tmp_path):
+    """Serves the files of a folder over http, recording the requested paths."""
+    remote = tmp_path / "remote"
+    remote.mkdir()
+    requests = []
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(remote)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(server.server_address[1]), remote, requests
+    server.shutdown()
+    server.server_close()
+
+
+def publish(remote, name, content, checksum=None):
+    (remote / name).write_bytes(content)
+    (remote / (name + ".sha1")).write_text((checksum or hashlib.sha1(content).hexdigest()) + "  " + name)
+
+
+def test_download_only_once(maven_server, tmp_path, monkeypatch):
+    url, remote, requests = maven_server
+    jar_url, jar_path = url + "/chronon.jar", str(tmp_path / "cache" / "chronon.jar")
+    publish(remote, "chronon.jar", b"v1")
+
+    run.download_only_once(jar_url, jar_path)
+    assert open(jar_path, "rb").read() == b"v1"
+    assert requests == ["/chronon.jar.sha1", "/chronon.jar"]
+
+    # verified recently, the remote is not contacted.
+    requests.clear()
+    run.download_only_once(jar_url, jar_path)
+    assert requests == []
+
+    # past the check interval only the checksum is fetched, and a jar of the same size but another content is
+    # downloaded again.
+    monkeypatch.setenv("CHRONON_JAR_CHECK_INTERVAL", "0")
+    run.download_only_once(jar_url, jar_path)
+    assert requests == ["/chronon.jar.sha1"]
+    publish(remote, "chronon.jar", b"v2")
+    run.download_only_once(jar_url, jar_path)
+    assert open(jar_path, "rb").read() == b"v2"
+
+    # a corrupted download leaves the verified jar in place.
+    publish(remote, "chronon.jar", b"v3", checksum=hashlib.sha1(b"v4").hexdigest())
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        run.download_only_once(jar_url, jar_path)
+    assert sorted(os.listdir(tmp_path / "cache")) == ["chronon.jar", "chronon.jar.cache.json", "chronon.jar.lock"]
+    assert open(jar_path, "rb").read() == b"v2"
+
+    # the verified jar is used when the repository can't be reached.
+    def unreachable(url, timeout=None):
+        raise urllib.error.URLError("connection refused")
+
+    monkeypatch.setattr(run, "_read_url", unreachable)
+    run.download_only_once(jar_url, jar_path)
+    assert open(jar_path, "rb").read() == b"v2"
+    os.remove(jar_path)
+    with pytest.raises(urllib.error.URLError):
+        run.download_only_once(jar_url, jar_path)
+
+
+METADATA = """<metadata><versioning><versions>
+<version>0.0.1</version>{}
+</versions></versioning></metadata>"""
+
+
+def test_resolve_latest_version(maven_server, tmp_path, monkeypatch, capsys):
+    url, remote, requests = maven_server
+    monkeypatch.setenv("CHRONON_JAR_CACHE_DIR", str(tmp_path / "cache"))
+    (remote / "maven-metadata.xml").write_text(METADATA.format("<version>0.0.2</version><version>0.0.2_rc1</version>"))
+
+    assert run.resolve_latest_version(url) == "0.0.2"
+    assert run.resolve_latest_version(url, release_tag="rc") == "0.0.2_rc1"
+    assert "source: network" in capsys.readouterr().out
+    assert requests == ["/maven-metadata.xml", "/maven-metadata.xml"]
+
+    # cached per release tag.
+    (remote / "maven-metadata.xml").write_text(METADATA.format("<version>0.0.3</version>"))
+    assert run.resolve_latest_version(url) == "0.0.2"
+    assert "source: cache" in capsys.readouterr().out
+    assert len(requests) == 2
+
+    monkeypatch.setenv("CHRONON_VERSION_CACHE_TTL", "0")
+    assert run.resolve_latest_version(url) == "0.0.3"
+    # past the TTL, the cached version is used when the repository can't be reached.
+    (remote / "maven-metadata.xml").unlink()
+    assert run.resolve_latest_version(url) == "0.0.3"
+    assert "Could not resolve" in capsys.readouterr().out
+    with pytest.raises(urllib.error.HTTPError):
+        run.resolve_latest_version(url, release_tag="other")
+
+
 def test_environment(teams_json, repo, parser, test_conf_location):
     default_environment = DEFAULT_ENVIRONMENT.copy()
     # If nothing is passed.
@@ -307,3 +414,312 @@ def test_split_date_range():
 
     result = run.split_date_range(start_date, end_date, parallelism)
     assert result == expected_result
+
+
+def test_split_date_range_by_days():
+    assert run.split_date_range_by_days("2022-01-01", "2022-01-08", 3) == [
+        ("2022-01-01", "2022-01-03"),
+        ("2022-01-04", "2022-01-06"),
+        ("2022-01-07", "2022-01-08"),
+    ]
+    assert run.collapse_days(["2022-01-05", "2022-01-01", "2022-01-02", "2022-01-04"]) == [
+        ("2022-01-01", "2022-01-02"),
+        ("2022-01-04", "2022-01-05"),
+    ]
+
+
+def backfill_args(tmp_path, **kwargs):
+    args = dict(
+        repo=".",
+        conf="production/joins/sample_team/sample_online_join.v1",
+        sub_help=False,
+        mode="backfill",
+        online_jar=None,
+        online_class=None,
+        app_name=None,
+        args="",
+        ds="2022-01-10",
+        start_ds="2022-01-01",
+        end_ds=None,
+        parallelism="2",
+        chunk_days="3",
+        retries="1",
+        retry_backoff="0",
+        ledger=str(tmp_path / "ledger.jsonl"),
+        spark_submit_path="spark_submit.sh",
+        list_apps=None,
+    )
+    args.update(kwargs)
+    return argparse.Namespace(**args)
+
+
+def test_chunked_backfill(tmp_path, monkeypatch):
+    calls = []
+    failing = {"2022-01-04": 2}
+
+    def mock_check_call(cmd):
+        start_ds = cmd.split("--start-partition-override=")[1].split()[0]
+        calls.append(start_ds)
+        if failing.get(start_ds):
+            failing[start_ds] -= 1
+            raise subprocess.CalledProcessError(1, cmd)
+
+    monkeypatch.setattr(run, "check_call", mock_check_call)
+    # the chunk failing twice exhausts its retry, the other chunks complete.
+    with pytest.raises(RuntimeError, match="2022-01-04 to 2022-01-06"):
+        run.Runner(backfill_args(tmp_path), "some.jar").run()
+    assert sorted(calls) == ["2022-01-01", "2022-01-04", "2022-01-04", "2022-01-07", "2022-01-10"]
+
+    # a new run, with a new jar, only backfills the missing range, failing once and succeeding on retry.
+    calls.clear()
+    failing["2022-01-04"] = 1
+    run.Runner(backfill_args(tmp_path, chunk_days="2"), "other.jar").run()
+    assert sorted(calls) == ["2022-01-04", "2022-01-04", "2022-01-06"]
+
+    calls.clear()
+    run.Runner(backfill_args(tmp_path), "other.jar").run()
+    assert calls == []
+    # other arguments make for another backfill.
+    run.Runner(backfill_args(tmp_path, args="--step-days 1"), "other.jar").run()
+    assert len(calls) == 4
+
+
+def test_mode_output_tables(repo, test_conf_location):
+    from ai.chronon.api.ttypes import Join
+    from ai.chronon.repo.serializer import file2thrift
+    from ai.chronon.utils import get_modes_tables
+
+    path = os.path.join(repo, test_conf_location)
+    with open(path) as f:
+        conf = json.load(f)
+    modes_tables = get_modes_tables(file2thrift(path, Join))
+    for mode in ["backfill", "stats-summary", "consistency-metrics-compute", "log-flattener"]:
+        assert run.mode_output_tables(conf, mode) == modes_tables[mode]
+    with pytest.raises(ValueError):
+        run.mode_output_tables(conf, "upload")
+    del conf["metaData"]["outputNamespace"]
+    with pytest.raises(ValueError, match="no outputNamespace"):
+        run.mode_output_tables(conf, "backfill")
+
+
+def test_missing_only_backfill(repo, test_conf_location, tmp_path, monkeypatch):
+    warehouse = tmp_path / "warehouse"
+    table_path = warehouse / "chronon_db.db" / "sample_team_sample_online_join_v1"
+    for ds in ["2022-01-01", "2022-01-02", "2022-01-05", "2022-01-09", "2022-01-10"]:
+        (table_path / "ds={}".format(ds)).mkdir(parents=True)
+    calls = []
+
+    def mock_check_call(cmd):
+        start_ds = cmd.split("--start-partition-override=")[1].split()[0]
+        calls.append(start_ds + " " + cmd.split("--end-date=")[1].split()[0])
+
+    monkeypatch.setattr(run, "check_call", mock_check_call)
+    args = backfill_args(
+        tmp_path,
+        repo=repo,
+        conf=test_conf_location,
+        chunk_days=None,
+        missing_only=True,
+        partition_provider="local:{}".format(warehouse),
+    )
+    run.Runner(args, "some.jar").run()
+    assert sorted(calls) == ["2022-01-03 2022-01-04", "2022-01-06 2022-01-08"]
+
+    # listed partitions, in chunks.
+    calls.clear()
+    with open(warehouse / "chronon_db.sample_team_sample_online_join_v1.partitions", "w") as f:
+        f.write("2022-01-01\n2022-01-10\n")
+    args.chunk_days = "4"
+    run.Runner(args, "some.jar").run()
+    assert sorted(calls) == ["2022-01-02 2022-01-05", "2022-01-06 2022-01-09"]
+
+
+def test_runner_env(repo, test_conf_location, tmp_path, monkeypatch):
+    environment = os.environ.copy()
+    warehouse = tmp_path / "warehouse"
+    for ds in ["2022-01-01", "2022-01-02", "2022-01-03", "2022-01-04", "2022-01-05", "2022-01-06"]:
+        (warehouse / "chronon_db.db" / "sample_team_sample_online_join_v1" / "ds={}".format(ds)).mkdir(parents=True)
+    env = {"CHRONON_WAREHOUSE_PATH": str(warehouse), "APP_NAME": "from_env"}
+    calls = []
+    monkeypatch.setattr(run, "check_call", lambda cmd, env=None: calls.append((cmd.split()[0], env["APP_NAME"])))
+    args = backfill_args(tmp_path, repo=repo, conf=test_conf_location, chunk_days=None, missing_only=True)
+    # the warehouse of the local partition provider is the one of the conf's environment.
+    run.Runner(args, "some.jar", env).run()
+    assert calls == [("bash", "from_env")]
+
+    # the online jar fetch and the listing of the running streaming apps get the environment as well.
+    outputs = []
+
+    def mock_check_output(cmd, env=None):
+        outputs.append((cmd, env["APP_NAME"]))
+        return b"online.jar" if cmd == "fetch_jar" else b'{"app_name": "streaming_app"}'
+
+    monkeypatch.setattr(run, "check_output", mock_check_output)
+    args = backfill_args(
+        tmp_path,
+        repo=repo,
+        conf="production/group_bys/sample_team/event_sample_group_by.v1",
+        mode="streaming",
+        app_name="streaming_app",
+        online_jar_fetch="fetch_jar",
+        list_apps="list_apps",
+        spark_streaming_submit_path="spark_streaming_submit.sh",
+    )
+    run.Runner(args, "some.jar", env).run()
+    assert outputs == [("fetch_jar", "from_env"), ("list_apps", "from_env")]
+    assert env["CHRONON_ONLINE_JAR"] == "online.jar"
+    assert os.environ == environment
+
+
+def test_split_date_range_weighted():
+    days = run.days_in_range("2022-01-01", "2022-01-08")
+    # growing volume, the equal split gives the second half 3 times the load of the first.
+    weights = [1, 1, 1, 1, 2, 2, 4, 4]
+    expected = [("2022-01-01", "2022-01-06"), ("2022-01-07", "2022-01-08")]
+    assert run.split_date_range_weighted(days, weights, 2) == expected
+    assert run.split_date_range_weighted(days, [1] * 8, 4) == run.split_date_range("2022-01-01", "2022-01-08", 4)
+    # all the parallelism is used even when a day outweighs the others.
+    assert len(run.split_date_range_weighted(days, [100, 1, 1, 1, 1, 1, 1, 1], 4)) == 4
+    with pytest.raises(ValueError):
+        run.split_date_range_weighted(days, weights, 9)
+    # days without estimates weigh as the average day with one.
+    provider = run.JsonVolumeProvider.__new__(run.JsonVolumeProvider)
+    provider.volumes = {"a.b": {"2022-01-01": 2, "2022-01-02": 4}, "a.c": {"2022-01-01": 1}}
+    assert run.estimate_day_volumes(["a.b", "a.c"], days[:3], provider) == [3.0, 4.0, 3.5]
+
+
+def test_weighted_backfill(repo, test_conf_location, tmp_path, monkeypatch, capsys):
+    calls = []
+    monkeypatch.setattr(run, "check_call", lambda cmd: calls.append(cmd.split("--start-partition-override=")[1][:10]))
+    volumes = tmp_path / "volumes.json"
+    with open(volumes, "w") as f:
+        json.dump({day: 10 if day < "2022-01-09" else 50 for day in run.days_in_range("2022-01-01", "2022-01-10")}, f)
+    args = backfill_args(
+        tmp_path,
+        repo=repo,
+        conf=test_conf_location,
+        chunk_days=None,
+        weighted_split=True,
+        volume_estimates="json:{}".format(volumes),
+    )
+    run.Runner(args, "some.jar").run()
+    assert sorted(calls) == ["2022-01-01", "2022-01-09"]
+    # {ds: volume} applies to each of the 4 input tables.
+    assert "2022-01-01 to 2022-01-08:    8 days, load              320 ( 44.4%)" in capsys.readouterr().out
+
+    # stats stand-in, summed over the input tables.
+    calls.clear()
+    for table in ["sample_namespace.sample_table_group_by", "sample_table.sample_entity_snapshot"]:
+        with open(tmp_path / "{}.stats.jsonl".format(table), "w") as f:
+            for day in run.days_in_range("2022-01-01", "2022-01-10"):
+                f.write(json.dumps({"ds": day, "row_count": 10 if day < "2022-01-07" else 30}) + "\n")
+    args.volume_estimates = "stats:{}".format(tmp_path)
+    args.parallelism = "3"
+    run.Runner(args, "some.jar").run()
+    assert sorted(calls) == ["2022-01-01", "2022-01-07", "2022-01-09"]
+
+    # the weighting doesn't apply to chunks or missing days.
+    calls.clear()
+    for chunk_days, missing_only in [("2", False), (None, True)]:
+        args.chunk_days = chunk_days
+        args.missing_only = missing_only
+        with pytest.raises(AssertionError, match="can't be combined with --chunk-days or --missing-only"):
+            run.Runner(args, "some.jar").run()
+    assert not calls
+
+
+def test_batch(repo, tmp_path, monkeypatch, capsys):
+    calls = []
+    downloads = []
+
+    def mock_check_call(cmd, env=None):
+        calls.append((cmd.split("--conf-path=")[1].split()[0], env["APP_NAME"]))
+        if "sample_join.v1" in cmd:
+            raise subprocess.CalledProcessError(1, cmd)
+
+    def mock_download_jar(version, jar_type="uber", release_tag=None, spark_version="2.4.0"):
+        downloads.append((version, jar_type))
+        return "some.jar"
+
+    monkeypatch.setattr(run, "check_call", mock_check_call)
+    monkeypatch.setattr(run, "download_jar", mock_download_jar)
+    with open(tmp_path / "confs.txt", "w") as f:
+        f.write("production/joins/sample_team/sample_join.v1\n\nproduction/joins/sample_team/missing.v1\n")
+    patterns = ["production/joins/sample_team/sample_join_[bd]*.v1", "@{}".format(tmp_path / "confs.txt")]
+    confs = run.expand_confs(repo, patterns)
+    assert confs == [
+        "production/joins/sample_team/sample_join_bootstrap.v1",
+        "production/joins/sample_team/sample_join_derivation.v1",
+        "production/joins/sample_team/sample_join.v1",
+        "production/joins/sample_team/missing.v1",
+    ]
+    environment = os.environ.copy()
+    argv = ["--confs", "production/joins/*", "--repo", repo, "--mode", "backfill", "--ds", "2022-01-01"]
+    results = run.run_batch(run.build_parser(), argv, confs, 2)
+    assert os.environ == environment
+    assert downloads == [("latest", "uber")]
+    assert [status for _, status, _, _ in results] == ["ok", "ok", "failed", "failed"]
+    # each conf runs with its own environment.
+    assert sorted(calls) == [
+        ("production/joins/sample_team/{}".format(name), "chronon_joins_backfill_dev_sample_team.{}".format(name))
+        for name in ["sample_join.v1", "sample_join_bootstrap.v1", "sample_join_derivation.v1"]
+    ]
+    out = capsys.readouterr().out
+    assert "2 succeeded, 2 failed out of 4 confs" in out
+    assert "CalledProcessError" in out
+    assert "No conf at" in out
+
+
+def test_fetch_server(repo, test_conf_location, tmp_path, monkeypatch, capsys):
+    kv = {
+        "joins/sample_team/sample_online_join.v1": [
+            {"keys": {"user_id": "1"}, "values": {"feature": 1.5}},
+            {"keys": {"user_id": "2"}, "values": {"feature": 2.5}},
+        ],
+        "sample_team.other": [{"keys": {"user_id": "1"}, "values": {"other": "a"}}],
+    }
+    with open(tmp_path / "kv.json", "w") as f:
+        json.dump(kv, f)
+    with open(tmp_path / "requests.jsonl", "w") as f:
+        f.write('{"user_id": 1}\n{"user_id": "2"}\n{"user_id": 3}\n[{"user_id": 2}, {"user_id": 1}]\n')
+    monkeypatch.setattr(run, "check_output", lambda cmd, env=None: pytest.fail("the online jar is not needed"))
+    args = backfill_args(
+        tmp_path,
+        repo=repo,
+        conf=test_conf_location,
+        mode="fetch",
+        fetch_server=True,
+        fetch_requests=str(tmp_path / "requests.jsonl"),
+        fetch_batch_size=2,
+        local_kv=str(tmp_path / "kv.json"),
+    )
+    run.Runner(args, "some.jar").run()
+    lines = capsys.readouterr().out.splitlines()
+    responses = [json.loads(line) for line in lines if line.startswith("{")]
+    # key lines batched by 2, the list as a request of its own.
+    assert [[r["values"] for r in response["responses"]] for response in responses] == [
+        [{"feature": 1.5}, {"feature": 2.5}],
+        [None],
+        [{"feature": 2.5}, {"feature": 1.5}],
+    ]
+    assert lines[-1].startswith("Fetched 5 keys in 3 requests, 0 with errors. Latency ms: p50 ")
+    assert "p99" in lines[-1]
+
+    # requests named after --name, a single process serving all of them.
+    with open(tmp_path / "requests.jsonl", "w") as f:
+        f.write('{"user_id": 1}\n{"user_id": 2}\n')
+    args.args = "--name sample_team.other"
+    args.fetch_batch_size = 1
+    run.Runner(args, "some.jar").run()
+    lines = capsys.readouterr().out.splitlines()
+    assert sum(line.startswith("Running command") for line in lines) == 1
+    assert [json.loads(line)["responses"][0]["values"] for line in lines if line.startswith("{")] == [
+        {"other": "a"},
+        None,
+    ]
+
+
+def test_latency_percentiles():
+    assert run.latency_percentiles([]) == {}
+    assert run.latency_percentiles(list(range(100, 0, -1))) == {"p50": 50, "p90": 90, "p99": 99, "max": 100}
+    assert run.latency_percentiles([3.0]) == {"p50": 3.0, "p90": 3.0, "p99": 3.0, "max": 3.0}
@@ -0,0 +1,81 @@
+"""
+Test the extraction of conf objects in separate processes.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import os
+
+from ai.chronon.api.ttypes import GroupBy
+from ai.chronon.repo.sandbox import SandboxedExtractor, SandboxLimits, _rss_mb
+
+CONFS = {
+    "ok.py": "from ai.chronon.api.ttypes import GroupBy, MetaData\nv1 = GroupBy(metaData=MetaData(online=True))\n",
+    "slow.py": "import time\ntime.sleep(30)\n",
+    "hog.py": "import time\nhog = b'x' * (400 << 20)\ntime.sleep(30)\n",
+    "broken.py": "raise ValueError('boom')\n",
+}
+
+
+def test_sandboxed_extraction(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    team_path = os.path.join(root, "sandbox_confs", "team")
+    os.makedirs(team_path)
+    for name, content in CONFS.items():
+        with open(os.path.join(team_path, name), "w") as f:
+            f.write(content)
+    monkeypatch.syspath_prepend(root)
+
+    extractor = SandboxedExtractor(root, GroupBy, SandboxLimits(timeout=2, max_rss_mb=100, workers=4))
+    python_files = [os.path.join(team_path, name) for name in sorted(CONFS)]
+    results = extractor.extract(python_files)
+
+    assert list(results) == ["team.ok.v1"]
+    assert results["team.ok.v1"].metaData.online is True
+    failures = {os.path.basename(failure.file_path): failure for failure in extractor.failures}
+    assert failures["broken.py"].reason == "error"
+    assert "boom" in failures["broken.py"].message
+    assert failures["slow.py"].reason == "timeout"
+    assert failures["slow.py"].elapsed >= 2
+    if _rss_mb(os.getpid()) is not None:
+        assert failures["hog.py"].reason == "memory"
+        assert failures["hog.py"].rss_mb > 100
+    assert sorted(extractor.timings) == python_files
+
+
+def test_sandboxed_extraction_keeps_values(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    team_path = os.path.join(root, "sandbox_confs", "team")
+    os.makedirs(team_path)
+    with open(os.path.join(team_path, "invalid.py"), "w") as f:
+        f.write(
+            "from ai.chronon.api.ttypes import Aggregation, GroupBy, MetaData, Query, Source, EventSource\n"
+            "v1 = GroupBy(\n"
+            "    metaData=MetaData(samplePercent=100),\n"
+            "    sources=[Source(events=EventSource(query=Query(selects={'a': None})))],\n"
+            "    aggregations={'a': Aggregation(inputColumn='a')}.values(),\n"
+            ")\n"
+        )
+    monkeypatch.syspath_prepend(root)
+
+    extractor = SandboxedExtractor(root, GroupBy, SandboxLimits(timeout=10))
+    results = extractor.extract([os.path.join(team_path, "invalid.py")])
+
+    # invalid values are left for compile to reject, like it does for the objects it extracts itself.
+    group_by = results["team.invalid.v1"]
+    assert group_by.sources[0].events.query.selects == {"a": None}
+    assert group_by.metaData.samplePercent == 100 and isinstance(group_by.metaData.samplePercent, int)
+    assert [agg.inputColumn for agg in group_by.aggregations] == ["a"]
+    assert not extractor.failures
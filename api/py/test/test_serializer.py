@@ -0,0 +1,119 @@
+"""
+Test the thrift json serialization helpers.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import json
+import os
+
+import ai.chronon.api.ttypes as api
+import pytest
+from ai.chronon.repo.serializer import (
+    ThriftJSONDecoder,
+    file2thrift,
+    thrift_simple_json,
+    thrift_simple_json_protected,
+    thrift_to_dict,
+)
+from ai.chronon.repo.validator import extract_json_confs
+from thrift import TSerialization
+from thrift.Thrift import TType
+from thrift.protocol.TJSONProtocol import TSimpleJSONProtocolFactory
+
+
+def _protocol_simple_json(obj):
+    simple = TSerialization.serialize(obj, protocol_factory=TSimpleJSONProtocolFactory())
+    return json.dumps(json.loads(simple), indent=2)
+
+
+def test_thrift_simple_json_matches_protocol_output(repo):
+    production = os.path.join(repo, "production")
+    confs = (
+        extract_json_confs(api.GroupBy, os.path.join(production, "group_bys"))
+        + extract_json_confs(api.Join, os.path.join(production, "joins"))
+        + extract_json_confs(api.StagingQuery, os.path.join(production, "staging_queries"))
+    )
+    assert confs
+    for conf in confs:
+        assert thrift_simple_json(conf) == _protocol_simple_json(conf), conf.metaData.name
+
+
+def test_protected_serialization_catches_type_drift():
+    # an int given for a double field is decoded back as a float.
+    with pytest.raises(AssertionError, match="Serialization can't be reversed"):
+        thrift_simple_json_protected(api.MetaData(samplePercent=100), api.MetaData)
+
+
+def test_thrift_to_dict_edge_cases():
+    meta_data = api.MetaData(
+        name="team.confé",
+        online=True,
+        production=False,
+        samplePercent=1,
+        tableProperties={"quote": 'a"b\\c\n'},
+        customJson=json.dumps({"a": 1}),
+    )
+    agg = api.Aggregation(inputColumn="x", operation=api.Operation.COUNT, argMap={"k": "1"})
+    group_by = api.GroupBy(metaData=meta_data, aggregations=[agg], keyColumns=["a", "b"])
+    assert thrift_simple_json(group_by) == _protocol_simple_json(group_by)
+    encoded = thrift_to_dict(group_by)
+    assert encoded["metaData"]["online"] == 1
+    assert encoded["metaData"]["production"] == 0
+    assert "sources" not in encoded
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        api.Query(selects={"a": None}),
+        api.Query(selects={None: "b"}),
+        api.Query(selects={"a": 1}),
+        api.Query(setups=[None]),
+        api.MetaData(name=1),
+        api.Aggregation(windows=[None]),
+    ],
+)
+def test_thrift_to_dict_rejects_values_the_protocol_rejects(obj):
+    with pytest.raises((TypeError, AttributeError)):
+        _protocol_simple_json(obj)
+    with pytest.raises(TypeError):
+        thrift_to_dict(obj)
+
+
+def test_generated_decoders_match_interpreted_conversion(repo):
+    production = os.path.join(repo, "production")
+    for obj_class, folder in [(api.GroupBy, "group_bys"), (api.Join, "joins"), (api.StagingQuery, "staging_queries")]:
+        for sub_root, _, sub_files in os.walk(os.path.join(production, folder)):
+            for f in sub_files:
+                path = os.path.join(sub_root, f)
+                with open(path) as conf_file:
+                    dct = json.load(conf_file)
+                decoder = ThriftJSONDecoder(thrift_class=obj_class)
+                expected = decoder._convert(dct, TType.STRUCT, (obj_class, obj_class.thrift_spec))
+                assert file2thrift(path, obj_class) == expected, path
+
+
+def test_generated_decoders_edge_cases():
+    schema = api.TDataType(
+        kind=api.DataKind.STRUCT,
+        params=[api.DataField(name="inner", dataType=api.TDataType(kind=api.DataKind.LIST))],
+    )
+    agg = api.Aggregation(inputColumn="x", operation=api.Operation.COUNT, argMap={"k": "1"})
+    meta_data = api.MetaData(name="team.conf", online=True, production=False, samplePercent=1)
+    for obj in [schema, api.GroupBy(metaData=meta_data, aggregations=[agg], keyColumns=["a"])]:
+        decoded = json.loads(thrift_simple_json(obj), cls=ThriftJSONDecoder, thrift_class=type(obj))
+        assert decoded == obj
+    assert json.loads("{}", cls=ThriftJSONDecoder, thrift_class=api.Join) == api.Join()
@@ -0,0 +1,116 @@
+"""
+Test the feature service client against the local stub server.
+"""
+
+#     Copyright (C) 2023 The Chronon Authors.
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import asyncio
+
+import pytest
+from ai.chronon.service_client import (
+    AsyncFeatureClient,
+    FeatureClient,
+    FeatureServiceError,
+    FeatureServiceTimeout,
+    LatencyHistogram,
+    StubFeatureServer,
+)
+
+FEATURES = {
+    "sample_team/sample_join.v1": [
+        {"keys": {"user_id": str(i)}, "features": {"feature": i * 10}} for i in range(10)
+    ],
+    "sample_team.sample_group_by.v1": [{"keys": {"user_id": "1"}, "features": {"count": 3}}],
+}
+
+
+@pytest.fixture
+def server():
+    with StubFeatureServer(FEATURES) as server:
+        yield server
+
+
+def test_fetch_join(server):
+    keys = [{"user_id": i} for i in [3, 1, 42, 7, 5]]
+    with FeatureClient(server.url, pool_size=2, batch_size=2, concurrency=2) as client:
+        results = client.fetch_join("sample_team/sample_join.v1", keys)
+        # results in the order of the keys, over 3 batches.
+        assert [r.features for r in results] == [
+            {"feature": 30},
+            {"feature": 10},
+            None,
+            {"feature": 70},
+            {"feature": 50},
+        ]
+        assert [r.ok for r in results] == [True, True, False, True, True]
+        assert "no features for keys" in results[2].error
+        assert server.requests == 3
+
+        assert client.fetch_group_by("sample_team.sample_group_by.v1", [{"user_id": "1"}])[0].features == {"count": 3}
+        for _ in range(5):
+            client.fetch_join("sample_team/sample_join.v1", keys)
+        # kept alive connections, at most the pool size.
+        assert server.connections <= 2
+        assert client.call_latency.count == 7
+        assert client.request_latency.count == server.requests == 19
+        summary = client.request_latency.summary()
+        assert summary["p50_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+
+
+def test_fetch_errors(server):
+    with FeatureClient(server.url) as client:
+        # a missing conf fails the lookups, not the call.
+        assert client.fetch_join("sample_team/missing.v1", [{"user_id": 1}])[0].ok is False
+    with pytest.raises(FeatureServiceError) as error:
+        with FeatureClient(server.url + "/missing") as client:
+            client.fetch_join("sample_team/sample_join.v1", [{"user_id": 1}])
+    assert error.value.status == 404
+
+
+def test_deadline():
+    with StubFeatureServer(FEATURES, delay=0.5) as server:
+        with FeatureClient(server.url) as client:
+            with pytest.raises(FeatureServiceTimeout):
+                client.fetch_join("sample_team/sample_join.v1", [{"user_id": 1}], timeout=0.1)
+            assert client.fetch_join("sample_team/sample_join.v1", [{"user_id": 1}], timeout=2)[0].ok
+
+
+def test_async_fetch(server):
+    async def fetch_all():
+        async with AsyncFeatureClient(server.url, batch_size=3, concurrency=4) as client:
+            calls = [
+                client.fetch_join("sample_team/sample_join.v1", [{"user_id": i} for i in range(n)]) for n in [1, 5, 10]
+            ]
+            results = await asyncio.gather(*calls)
+            return results, client.call_latency.count
+
+    results, calls = asyncio.run(fetch_all())
+    assert [[r.features["feature"] for r in call] for call in results] == [
+        [0],
+        [0, 10, 20, 30, 40],
+        [i * 10 for i in range(10)],
+    ]
+    assert calls == 3
+    # 1 + 2 + 4 batches.
+    assert server.requests == 7
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram([1, 10, 100])
+    assert histogram.percentile(50) is None
+    for latency in [0.5] * 50 + [5] * 40 + [50] * 9 + [500]:
+        histogram.record(latency)
+    assert [histogram.percentile(p) for p in [50, 90, 99, 100]] == [1, 10, 100, 500]
+    assert histogram.summary()["count"] == 100
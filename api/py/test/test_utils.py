@@ -390,3 +390,37 @@ def test_get_dependencies_with_events(query_with_partition_column: Query):
     partition_col = query_with_partition_column.partitionColumn or "ds"
     expected_spec = f"event_table/{partition_col}={{{{ macros.ds_add(ds, -2) }}}}"
     assert dep["spec"] == expected_spec
+
+
+def test_get_mod_name_from_import_registry():
+    import ai.chronon.repo.extract_objects as eo
+    from group_bys.sample_team import sample_group_by
+    from joins.sample_team import sample_join
+
+    assert eo.get_mod_name(sample_group_by.v1, "group_bys") == "group_bys.sample_team.sample_group_by"
+    assert eo.get_mod_name(sample_group_by.v1, "joins") is None
+    assert eo.get_mod_name(sample_join.v1, "joins") == "joins.sample_team.sample_join"
+    assert utils.get_join_output_table_name(sample_join.v1) == "sample_team_sample_join_v1"
+
+
+def test_json_differ():
+    differ = utils.JsonDiffer()
+    old = json.dumps({"name": "a", "online": True, "keys": ["x"]})
+    assert differ.diff(old, old) == ""
+    assert differ.diff(json.dumps({"online": True, "name": "a", "keys": ["x"]}), old) == ""
+    new = json.dumps({"name": "b", "online": True, "keys": ["x"], "team": "t"})
+    assert differ.diff(new, old) == (
+        "5,6c5,7\n"
+        '<   "name": "a",\n'
+        '<   "online": true\n'
+        "---\n"
+        '>   "name": "b",\n'
+        '>   "online": true,\n'
+        '>   "team": "t"\n'
+    )
+    assert differ.diff(new, old, skipped_keys=["name", "team"]) == ""
+    # types which compare equal in python are still different json.
+    assert differ.diff(json.dumps({"samplePercent": 100.0}), json.dumps({"samplePercent": 100})) == (
+        '2c2\n<   "samplePercent": 100\n---\n>   "samplePercent": 100.0\n'
+    )
+    assert differ.diff(json.dumps({"online": 1}), json.dumps({"online": True})) != ""
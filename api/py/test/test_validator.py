@@ -16,8 +16,13 @@ Forcing validator to fail some tests
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import copy
+import os
+
 import pytest
+from ai.chronon.api.ttypes import Join
 from ai.chronon.repo import validator
+from ai.chronon.repo.serializer import thrift_simple_json
 
 
 @pytest.fixture
@@ -165,3 +170,18 @@ def test_validate_derivation_on_keys(zvalidator):
 
     errors = zvalidator._validate_join(v2)
     assert len(errors) == 0, f"Failed on: {errors}"
+
+
+def test_added_objs_are_indexed(zvalidator, valid_online_group_by, valid_online_join):
+    join = copy.deepcopy(valid_online_join)
+    join.metaData.name = "sample_team.added_join.v1"
+    output_file = os.path.join(zvalidator.manifest.output_root_path, "joins", "sample_team", "added_join.v1")
+    zvalidator.manifest.update(join, output_file, thrift_simple_json(join))
+    zvalidator.add_obj(join)
+    assert zvalidator._get_old_obj(Join, join.metaData.name) is join
+    assert join in zvalidator._get_old_joins_with_group_by(valid_online_group_by)
+
+    join.joinParts = []
+    zvalidator.manifest.update(join, output_file, thrift_simple_json(join))
+    zvalidator.add_obj(join)
+    assert join not in zvalidator._get_old_joins_with_group_by(valid_online_group_by)
@@ -39,16 +39,19 @@ import org.apache.thrift.TBase
 import org.rogach.scallop.{ScallopConf, ScallopOption, Subcommand}
 import org.slf4j.LoggerFactory
 
-import java.io.{File, IOException}
+import java.io.{BufferedReader, File, FileDescriptor, FileOutputStream, IOException, InputStreamReader, PrintStream}
 import java.net.URI
+import java.nio.charset.StandardCharsets
 import java.nio.file.{Files, Paths}
+import java.util.concurrent.TimeUnit
 import scala.collection.JavaConverters._
 import scala.collection.mutable
 import scala.concurrent.{Await, ExecutionContext, Future}
-import scala.concurrent.duration.DurationInt
+import scala.concurrent.duration.{Duration, DurationInt}
 import scala.io.Source
 import scala.reflect.ClassTag
 import scala.reflect.internal.util.ScalaClassLoader
+import scala.util.control.NonFatal
 import scala.util.{Failure, Success, Try}
 
 // useful to override spark.sql.extensions args - there is no good way to unset that conf apparently
@@ -742,6 +745,18 @@ object Driver {
         descr = "flag - loop over the requests until manually killed",
         default = Some(false)
       )
+      val serve: ScallopOption[Boolean] = opt[Boolean](
+        required = false,
+        descr = "flag - keep running and answer newline delimited json requests read from stdin, " +
+          "each like {\"id\": 1, \"keys\": [{...}], \"name\": optional, \"type\": optional, " +
+          "\"atMillis\": optional}, with one json line per request on stdout",
+        default = Some(false)
+      )
+      val timeoutMillis: ScallopOption[Long] = opt[Long](
+        required = false,
+        descr = "timeout of a request when serving",
+        default = Some(5000L)
+      )
     }
 
     def fetchStats(args: Args, objectMapper: ObjectMapper, keyMap: Map[String, AnyRef], fetcher: Fetcher): Unit = {
@@ -764,7 +779,64 @@ object Driver {
         s"--- [FETCHED RESULT] ---\n${objectMapper.writerWithDefaultPrettyPrinter().writeValueAsString(toPrint)}")
     }
 
+    def serve(args: Args, objectMapper: ObjectMapper, fetcher: Fetcher): Unit = {
+      lazy val joinConfOption: Option[api.Join] =
+        args.confPath.toOption.map(confPath => parseConf[api.Join](confPath))
+      val reader = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8))
+      // responses go to the process stdout, whatever logging does with System.out.
+      val out = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8")
+      logger.info("Serving fetch requests from stdin")
+      Iterator.continually(reader.readLine()).takeWhile(_ != null).filter(_.trim.nonEmpty).foreach { line =>
+        val startNs = System.nanoTime
+        val response = new java.util.LinkedHashMap[String, AnyRef]()
+        try {
+          val request = objectMapper.readValue(line, classOf[java.util.Map[String, AnyRef]]).asScala
+          response.put("id", request.getOrElse("id", null))
+          val name = request
+            .get("name")
+            .map(_.toString)
+            .orElse(args.name.toOption)
+            .getOrElse(args.confPath().confPathToKey)
+          val fetchType = request.get("type").map(_.toString).getOrElse(args.`type`())
+          val atMillis = request.get("atMillis").map(_.toString.toLong).orElse(args.atMillis.toOption)
+          val requests = request("keys")
+            .asInstanceOf[java.util.List[java.util.Map[String, AnyRef]]]
+            .asScala
+            .map(keyMap => Fetcher.Request(name, keyMap.asScala.toMap, atMillis))
+          val resultFuture = if (fetchType == "join") {
+            fetcher.fetchJoin(requests, if (request.contains("name")) None else joinConfOption)
+          } else {
+            fetcher.fetchGroupBys(requests)
+          }
+          val results = Await.result(resultFuture, Duration(args.timeoutMillis(), TimeUnit.MILLISECONDS))
+          response.put(
+            "responses",
+            results.map { result =>
+              val keyResponse = new java.util.LinkedHashMap[String, AnyRef]()
+              keyResponse.put("keys", result.request.keys.asJava)
+              result.values match {
+                case Success(valMap) =>
+                  keyResponse.put("values", Option(valMap).map(values => new java.util.TreeMap(values.asJava)).orNull)
+                case Failure(exception) => keyResponse.put("error", exception.toString)
+              }
+              keyResponse
+            }.asJava
+          )
+        } catch {
+          case NonFatal(e) => response.put("error", e.toString)
+        }
+        response.put("latencyMs", Double.box((System.nanoTime - startNs) / 1e6d))
+        out.println(objectMapper.writeValueAsString(response))
+      }
+    }
+
     def run(args: Args): Unit = {
+      if (args.serve()) {
+        require(!args.confPath.isEmpty || !args.name.isEmpty, "--conf-path or --name should be specified!")
+        val objectMapper = new ObjectMapper().registerModule(DefaultScalaModule)
+        serve(args, objectMapper, args.impl(args.serializableProps).buildFetcher(true, "FetcherCLI"))
+        System.exit(0)
+      }
       if (args.keyJson.isEmpty && args.keyJsonFile.isEmpty) {
         throw new Exception("At least one of keyJson and keyJsonFile should be specified!")
       }